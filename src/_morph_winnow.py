@@ -8,14 +8,14 @@ try:
 	from . import nuthouse01_core as core
 	from . import nuthouse01_pmx_parser as pmxlib
 	from . import nuthouse01_pmx_struct as pmxstruct
-	from ._prune_unused_vertices import newval_from_range_map, delme_list_to_rangemap
+	from ._prune_unused_vertices import newval_from_range_map, delme_list_to_rangemap, delme_list_to_lookup, filter_and_remap
 except ImportError as eee:
 	try:
 		# these imports work if running from double-click on THIS script
 		import nuthouse01_core as core
 		import nuthouse01_pmx_parser as pmxlib
 		import nuthouse01_pmx_struct as pmxstruct
-		from _prune_unused_vertices import newval_from_range_map, delme_list_to_rangemap
+		from _prune_unused_vertices import newval_from_range_map, delme_list_to_rangemap, delme_list_to_lookup, filter_and_remap
 	except ImportError as eee:
 		print(eee.__class__.__name__, eee)
 		print("ERROR: failed to import some of the necessary files, all my scripts must be together in the same folder!")
@@ -24,6 +24,7 @@ except ImportError as eee:
 		exit()
 		core = pmxlib = pmxstruct = None
 		newval_from_range_map = delme_list_to_rangemap = None
+		delme_list_to_lookup = filter_and_remap = None
 
 
 # when debug=True, disable the catchall try-except block. this means the full stack trace gets printed when it crashes,
@@ -55,38 +56,22 @@ iotext = '''Inputs:  PMX file "[model].pmx"\nOutputs: PMX file "[model]_winnow.p
 '''
 
 def apply_morph_remapping(pmx: pmxstruct.Pmx, morph_dellist, morph_shiftmap):
-	# actually delete the morphs from the list
-	for f in reversed(morph_dellist):
-		pmx.morphs.pop(f)
+	# morph_shiftmap is no longer needed, the lookup is built straight from the dellist. the arg stays so that
+	# existing callers don't break.
+	# build the old->new lookup while the morphs still exist, then actually delete the morphs from the list
+	morph_lookup = delme_list_to_lookup(morph_dellist, len(pmx.morphs))
+	core.delete_sorted_indices(pmx.morphs, morph_dellist)
 	
 	# frames:
-	for d, frame in enumerate(pmx.frames):
-		i = 0
-		while i < len(frame.items):
-			item = frame.items[i]
-			# if this item is a bone, skip it
-			if not item[0]:
-				i += 1
-			else:
-				# if this is one of the morphs being deleted, delete it here too. otherwise remap.
-				if core.binary_search_isin(item[1], morph_dellist):
-					frame.items.pop(i)
-				else:
-					item[1] = newval_from_range_map(item[1], morph_shiftmap)
-					i += 1
+	for frame in pmx.frames:
+		# only touch the morph items (item[0] = is_morph), drop the ones being deleted, remap the rest
+		filter_and_remap(frame.items, morph_lookup, 1, where=lambda item: item[0])
 	
 	# group/flip morphs:
-	for d, morph in enumerate(pmx.morphs):
+	for morph in pmx.morphs:
 		# group/flip = 0/9
 		if morph.morphtype not in (0, 9): continue
-		i = 0
-		while i < len(morph.items):
-			# if this is one of the morphs being deleted, delete it here too. otherwise remap.
-			if core.binary_search_isin(morph.items[i].morph_idx, morph_dellist):
-				morph.items.pop(i)
-			else:
-				morph.items[i].morph_idx = newval_from_range_map(morph.items[i].morph_idx, morph_shiftmap)
-				i += 1
+		filter_and_remap(morph.items, morph_lookup, "morph_idx")
 	return pmx
 
 
@@ -115,20 +100,12 @@ def morph_winnow(pmx: pmxstruct.Pmx, moreinfo=False):
 		# if not a vertex morph, skip it
 		if morph.morphtype != 1: continue
 		# for each vert in this vertex morph:
-		i = 0
-		this_vert_dropped = 0  # lines dropped from this morph
 		total_num_verts += len(morph.items)
-		while i < len(morph.items):
-			vert = morph.items[i]
-			vert:pmxstruct.PmxMorphItemVertex
-			# determine if it is worth keeping or deleting
-			# first, calculate euclidian distance
-			length = core.my_euclidian_distance(vert.move)
-			if length < WINNOW_THRESHOLD:
-				morph.items.pop(i)
-				this_vert_dropped += 1
-			else:
-				i += 1
+		# determine if it is worth keeping or deleting: keep the ones whose euclidian distance is big enough
+		# (filter into a new list instead of popping, popping from the middle is slow on big morphs)
+		kept = [vert for vert in morph.items if core.my_euclidian_distance(vert.move) >= WINNOW_THRESHOLD]
+		this_vert_dropped = len(morph.items) - len(kept)  # lines dropped from this morph
+		morph.items[:] = kept
 		if len(morph.items) == 0:
 			# mark newly-emptied vertex morphs for later removal
 			morphs_now_empty.append(d)
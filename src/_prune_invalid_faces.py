@@ -73,9 +73,8 @@ def delete_faces(pmx: pmxstruct.Pmx, faces_to_remove):
 		# update the start idx for next material
 		start_del_face_idx = end_del_face_idx
 	
-	# now, delete the acutal faces
-	for f in reversed(faces_to_remove):
-		pmx.faces.pop(f)
+	# now, delete the acutal faces, in one pass if there are many of them
+	core.delete_sorted_indices(pmx.faces, faces_to_remove)
 
 
 def prune_invalid_faces(pmx: pmxstruct.Pmx, moreinfo=False):
@@ -165,8 +164,7 @@ def prune_invalid_faces(pmx: pmxstruct.Pmx, moreinfo=False):
 		
 	# now find how many duplicates there are spanning material units
 	# first delete the dupes we know about from the hash-list
-	for f in reversed(all_dupefaces):
-		hashfaces.pop(f)
+	core.delete_sorted_indices(hashfaces, all_dupefaces)
 	# then cast hash-list as a set to eliminate dupes and compare sizes to count how many remain
 	otherdupes = len(hashfaces) - len(set(hashfaces))
 	if otherdupes != 0:
@@ -27,14 +27,14 @@ try:
 	from . import nuthouse01_core as core
 	from . import nuthouse01_pmx_parser as pmxlib
 	from . import nuthouse01_pmx_struct as pmxstruct
-	from ._prune_unused_vertices import newval_from_range_map, delme_list_to_rangemap
+	from ._prune_unused_vertices import newval_from_range_map, delme_list_to_rangemap, delme_list_to_lookup, rangemap_to_lookup, filter_and_remap
 except ImportError as eee:
 	try:
 		# these imports work if running from double-click on THIS script
 		import nuthouse01_core as core
 		import nuthouse01_pmx_parser as pmxlib
 		import nuthouse01_pmx_struct as pmxstruct
-		from _prune_unused_vertices import newval_from_range_map, delme_list_to_rangemap
+		from _prune_unused_vertices import newval_from_range_map, delme_list_to_rangemap, delme_list_to_lookup, rangemap_to_lookup, filter_and_remap
 	except ImportError as eee:
 		print(eee.__class__.__name__, eee)
 		print("ERROR: failed to import some of the necessary files, all my scripts must be together in the same folder!")
@@ -43,6 +43,7 @@ except ImportError as eee:
 		exit()
 		core = pmxlib = pmxstruct = None
 		newval_from_range_map = delme_list_to_rangemap = None
+		delme_list_to_lookup = rangemap_to_lookup = filter_and_remap = None
 
 
 # when debug=True, disable the catchall try-except block. this means the full stack trace gets printed when it crashes,
@@ -131,13 +132,12 @@ def delete_multiple_bones(pmx: pmxstruct.Pmx, bone_dellist: List[int]):
 	"""
 	# force it to be sorted, just to be safe
 	bone_dellist2 = sorted(bone_dellist)
-	# build the rangemap to determine how index references will be modified from this deletion
-	bone_shiftmap = delme_list_to_rangemap(bone_dellist2)
+	# build the lookup to determine how index references will be modified from this deletion
+	bone_lookup = delme_list_to_lookup(bone_dellist2, len(pmx.bones))
 	# acutally delete the bones
-	for f in reversed(bone_dellist):
-		pmx.bones.pop(f)
+	core.delete_sorted_indices(pmx.bones, bone_dellist2)
 	# apply remapping scheme to all remaining bones
-	apply_bone_remapping(pmx, bone_dellist2, bone_shiftmap)
+	apply_bone_lookup(pmx, bone_lookup)
 	return
 
 
@@ -299,111 +299,113 @@ def apply_bone_remapping(pmx: pmxstruct.Pmx, bone_dellist: List[int], bone_shift
 	apply_bone_remapping_dyn(pmx, bone_dellist, bone_shiftmap, newval_from_range_map)
 
 def apply_bone_remapping_dyn(pmx: pmxstruct.Pmx, bone_dellist: List[int], bone_shiftmap: Tuple[List[int],List[int]], range_map_func):
+	# the bones are already deleted (or inserted) at this point, so the number of bones that existed before the change
+	# is unknown... but it is never bigger than this, and a few extra lookup entries don't hurt
+	length = len(pmx.bones) + len(bone_dellist)
+	bone_lookup = rangemap_to_lookup(bone_shiftmap, length, bone_dellist, range_map_func)
+	apply_bone_lookup(pmx, bone_lookup)
+apply_bone_remapping_dyn.__doc__ = apply_bone_remapping.__doc__
+
+def apply_bone_lookup(pmx: pmxstruct.Pmx, bone_lookup: List[int]):
+	"""
+	Update the indices for all references to bones, using a lookup from delme_list_to_lookup().
+	References to deleted bones are dropped where possible, see apply_bone_remapping().
+	
+	:param pmx: PMX object
+	:param bone_lookup: lookup list, old index -> new index or -1 if deleted
+	"""
 	core.print_progress_oneline(0 / 5)
 	# VERTICES:
 	# just remap the bones that have weight
 	# any references to bones being deleted will definitely have 0 weight, and therefore it doesn't matter what they reference afterwards
-	for d, vert in enumerate(pmx.verts):
-		weighttype = vert.weighttype
-		weights = vert.weight
-		if weighttype == 0:
-			# just remap, this cannot have 0 weight
-			weights[0] = range_map_func(weights[0], bone_shiftmap)
-		elif weighttype == 1 or weighttype == 3:
-			# b1, b2, b1w
-			# if b1w == 0, zero out b1
-			if weights[2] == 0:
-				weights[0] = 0
-			else:
-				weights[0] = range_map_func(weights[0], bone_shiftmap)
-			# if b1w == 1, then b2w == 0 so zero out b2
-			if weights[2] == 1:
-				weights[1] = 0
-			else:
-				weights[1] = range_map_func(weights[1], bone_shiftmap)
-		elif weighttype == 2 or weighttype == 4:
-			for i in range(4):
-				# if weight == 0, then change its bone to 0. otherwise, remap
-				if weights[i + 4] == 0:
-					weights[i] = 0
+	if hasattr(pmx.verts, "remap_bones"):
+		# columnar vertex storage can do it all at once
+		pmx.verts.remap_bones(bone_lookup)
+	else:
+		for vert in pmx.verts:
+			weighttype = vert.weighttype
+			weights = vert.weight
+			if weighttype == 0:
+				# just remap, this cannot have 0 weight
+				weights[0] = bone_lookup[weights[0]]
+			elif weighttype == 1 or weighttype == 3:
+				# b1, b2, b1w
+				# if b1w == 0, zero out b1
+				if weights[2] == 0:
+					weights[0] = 0
+				else:
+					weights[0] = bone_lookup[weights[0]]
+				# if b1w == 1, then b2w == 0 so zero out b2
+				if weights[2] == 1:
+					weights[1] = 0
 				else:
-					weights[i] = range_map_func(weights[i], bone_shiftmap)
+					weights[1] = bone_lookup[weights[1]]
+			elif weighttype == 2 or weighttype == 4:
+				for i in range(4):
+					# if weight == 0, then change its bone to 0. otherwise, remap
+					if weights[i + 4] == 0:
+						weights[i] = 0
+					else:
+						weights[i] = bone_lookup[weights[i]]
 	# done with verts
 	
 	core.print_progress_oneline(1 / 5)
 	# MORPHS:
-	for d, morph in enumerate(pmx.morphs):
+	for morph in pmx.morphs:
 		# only operate on bone morphs
 		if morph.morphtype != 2: continue
-		# first, it is plausible that bone morphs could reference otherwise unused bones, so I should check for and delete those
-		i = 0
-		while i < len(morph.items):
-			# if the bone being manipulated is in the list of bones being deleted, delete it here too. otherwise remap.
-			if core.binary_search_isin(morph.items[i].bone_idx, bone_dellist):
-				morph.items.pop(i)
-			else:
-				morph.items[i].bone_idx = range_map_func(morph.items[i].bone_idx, bone_shiftmap)
-				i += 1
+		# it is plausible that bone morphs could reference otherwise unused bones, so those get dropped, the rest remapped
+		filter_and_remap(morph.items, bone_lookup, "bone_idx")
 	# done with morphs
 	
 	core.print_progress_oneline(2 / 5)
 	# DISPLAY FRAMES
-	for d, frame in enumerate(pmx.frames):
-		i = 0
-		while i < len(frame.items):
-			item = frame.items[i]
-			# if this item is a morph, skip it
-			if item[0]:
-				i += 1
-			else:
-				# if this is one of the bones being deleted, delete it here too. otherwise remap.
-				if core.binary_search_isin(item[1], bone_dellist):
-					frame.items.pop(i)
-				else:
-					item[1] = range_map_func(item[1], bone_shiftmap)
-					i += 1
+	for frame in pmx.frames:
+		# only touch the bone items (item[0] = is_morph), drop the ones being deleted, remap the rest
+		filter_and_remap(frame.items, bone_lookup, 1, where=lambda item: not item[0])
 	# done with frames
 	
 	core.print_progress_oneline(3 / 5)
 	# RIGIDBODY
-	for d, body in enumerate(pmx.rigidbodies):
+	for body in pmx.rigidbodies:
 		# only remap, no possibility of one of these bones being deleted
-		body.bone_idx = range_map_func(body.bone_idx, bone_shiftmap)
+		body.bone_idx = bone_lookup[body.bone_idx]
 	# done with bodies
 	
 	core.print_progress_oneline(4 / 5)
 	# BONES: point-at target, true parent, external parent, partial append, ik stuff
-	for d, bone in enumerate(pmx.bones):
+	for bone in pmx.bones:
 		# point-at link:
 		if bone.tail_usebonelink:
-			if core.binary_search_isin(bone.tail, bone_dellist):
+			newval = bone_lookup[bone.tail]
+			if newval == -1 and bone.tail >= 0:
 				# if pointing at a bone that will be deleted, instead change to offset with offset 0,0,0
 				bone.tail_usebonelink = False
 				bone.tail = [0, 0, 0]
 			else:
 				# otherwise, remap
-				bone.tail = range_map_func(bone.tail, bone_shiftmap)
+				bone.tail = newval
 		# other 4 categories only need remapping
 		# true parent:
-		bone.parent_idx = range_map_func(bone.parent_idx, bone_shiftmap)
+		bone.parent_idx = bone_lookup[bone.parent_idx]
 		# partial append:
 		if (bone.inherit_rot or bone.inherit_trans) and bone.inherit_parent_idx != -1:
-			if core.binary_search_isin(bone.inherit_parent_idx, bone_dellist):
+			newval = bone_lookup[bone.inherit_parent_idx]
+			if newval == -1:
 				# if a bone is getting partial append from a bone getting deleted, break that relationship
 				# shouldn't be possible but whatever i'll support the case
 				bone.inherit_rot = False
 				bone.inherit_trans = False
 				bone.inherit_parent_idx = -1
 			else:
-				bone.inherit_parent_idx = range_map_func(bone.inherit_parent_idx, bone_shiftmap)
+				bone.inherit_parent_idx = newval
 		# ik stuff:
 		if bone.has_ik:
-			bone.ik_target_idx = range_map_func(bone.ik_target_idx, bone_shiftmap)
+			bone.ik_target_idx = bone_lookup[bone.ik_target_idx]
 			for link in bone.ik_links:
-				link.idx = range_map_func(link.idx, bone_shiftmap)
+				link.idx = bone_lookup[link.idx]
 	# done with bones
 	return
-apply_bone_remapping_dyn.__doc__ = apply_bone_remapping.__doc__
 
 def prune_unused_bones(pmx: pmxstruct.Pmx, moreinfo=False):
 	# first build the list of bones to delete
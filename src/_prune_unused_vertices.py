@@ -3,7 +3,7 @@
 #####################
 
 # first, system imports
-from typing import List, Tuple, TypeVar
+from typing import List, Tuple, TypeVar, Sequence, Callable, Union
 
 # second, wrap custom imports with a try-except to catch it if files are missing
 try:
@@ -112,6 +112,92 @@ def delme_list_to_rangemap(delme_verts: List[int]) -> Tuple[List[int],List[int]]
 	a,b = zip(*delme_range)
 	return a,b
 
+########################################################################################################################
+# remapping engine: instead of doing a bisect for every single reference, build a dense "old index -> new index"
+# lookup list ONCE, then every reference is just "lookup[v]". deleted indices map to -1.
+# the lookup has one extra entry at the end that is also -1, so "lookup[-1]" maps the usual "no reference" value to
+# itself and does not need to be special-cased. to tell "deleted" apart from "was already -1", check "v >= 0" as well.
+########################################################################################################################
+
+def delme_list_to_lookup(delme_list: Sequence[int], length: int) -> List[int]:
+	"""
+	Given a list of indices that will be deleted from a list of [length] items, build the lookup list that says where
+	every item will end up after the deletion. delme_list does not need to be sorted.
+	
+	:param delme_list: list of ints, the indices being deleted
+	:param length: length of the list BEFORE the deletion
+	:return: list of ints, length+1 long, lookup[old] = new or -1 if old is deleted
+	"""
+	is_deleted = bytearray(length + 1)
+	for f in delme_list:
+		is_deleted[f] = 1
+	lookup = []
+	newidx = 0
+	for i in range(length):
+		if is_deleted[i]:
+			lookup.append(-1)
+		else:
+			lookup.append(newidx)
+			newidx += 1
+	lookup.append(-1)
+	return lookup
+
+def rangemap_to_lookup(range_map: Tuple[List[int], List[int]], length: int, delme_list: Sequence[int]=(),
+					   range_map_func: Callable=newval_from_range_map) -> List[int]:
+	"""
+	Convert a rangemap from delme_list_to_rangemap() (or a hand-made shiftmap, like the ones used for insertion) into
+	a lookup list. range_map_func is called once per index instead of once per reference.
+	
+	:param range_map: result from delme_list_to_rangemap()
+	:param length: number of indices that can be referenced BEFORE the change
+	:param delme_list: indices that are being deleted, these map to -1
+	:param range_map_func: function used to evaluate the rangemap
+	:return: list of ints, length+1 long, same format as delme_list_to_lookup()
+	"""
+	lookup = [range_map_func(i, range_map) for i in range(length)]
+	for f in delme_list:
+		lookup[f] = -1
+	lookup.append(-1)
+	return lookup
+
+def filter_and_remap(items: list, lookup: List[int], key: Union[None, int, str]=None, where: Callable=None) -> int:
+	"""
+	Remap the index held by each item of a list through a lookup, and drop all items that refer to a deleted index.
+	Modifies the list in-place, in a single pass, instead of popping items out of it one at a time.
+	
+	:param items: list to modify
+	:param lookup: result from delme_list_to_lookup()
+	:param key: None if the items are ints, an int if each item is a list with the index at that position, or a str
+	 if each item is an object with the index in that attribute
+	:param where: optional, only items where where(item) is true are touched, all others are kept as-is
+	:return: number of items that were dropped
+	"""
+	kept = []
+	for x in items:
+		if where is not None and not where(x):
+			kept.append(x)
+			continue
+		if key is None:
+			v = x
+		elif isinstance(key, int):
+			v = x[key]
+		else:
+			v = getattr(x, key)
+		newval = lookup[v]
+		# deleted = maps to -1 but wasn't -1 before
+		if newval == -1 and v >= 0:
+			continue
+		if key is None:
+			x = newval
+		elif isinstance(key, int):
+			x[key] = newval
+		else:
+			setattr(x, key, newval)
+		kept.append(x)
+	dropped = len(items) - len(kept)
+	items[:] = kept
+	return dropped
+
 
 def showhelp():
 	# print info to explain the purpose of this file
@@ -165,20 +251,22 @@ def prune_unused_vertices(pmx: pmxstruct.Pmx, moreinfo=False):
 	if moreinfo:
 		core.MY_PRINT_FUNC("Detected %d orphan vertices arranged in %d contiguous blocks" % (len(delme_verts), len(delme_range[0])))
 	
+	# build the old->new lookup once, then every reference below is a single list index
+	vert_lookup = delme_list_to_lookup(delme_verts, prevtotal)
+	
 	# need to update places that reference vertices: faces, morphs, softbody
 	# first get the total # of iterations I need to do, for progress purposes: #faces + sum of len of all UV and vert morphs
 	totalwork = len(pmx.faces) + sum([len(m.items) for m in pmx.morphs if (m.morphtype in (1,3,4,5,6,7))])
 	
 	# faces:
-	d = 0
-	for d,face in enumerate(pmx.faces):
-		# vertices in a face are not guaranteed sorted, and sorting them is a Very Bad Idea
-		# therefore they must be remapped individually
-		face[0] = newval_from_range_map(face[0], delme_range)
-		face[1] = newval_from_range_map(face[1], delme_range)
-		face[2] = newval_from_range_map(face[2], delme_range)
-		# display progress printouts
-		core.print_progress_oneline(d / totalwork)
+	# vertices in a face are not guaranteed sorted, and sorting them is a Very Bad Idea
+	# therefore they must be remapped individually. faces only use non-orphan vertices, by definition.
+	for face in pmx.faces:
+		face[0] = vert_lookup[face[0]]
+		face[1] = vert_lookup[face[1]]
+		face[2] = vert_lookup[face[2]]
+	d = len(pmx.faces)
+	core.print_progress_oneline(d / totalwork)
 		
 	# core.MY_PRINT_FUNC("Done updating vertex references in faces")
 	
@@ -188,29 +276,10 @@ def prune_unused_vertices(pmx: pmxstruct.Pmx, moreinfo=False):
 		# if not a vertex morph or UV morph, skip it
 		if not morph.morphtype in (1,3,4,5,6,7): continue
 		lenbefore = len(morph.items)
-		# it is plausible that vertex/uv morphs could reference orphan vertices, so I should check for and delete those
-		i = 0
-		while i < len(morph.items):
-			# if the vertex being manipulated is in the list of verts being deleted,
-			if core.binary_search_isin(morph.items[i].vert_idx, delme_verts):
-				# delete it here too
-				morph.items.pop(i)
-				orphan_vertex_references += 1
-			else:
-				# otherwise, remap it
-				# but don't remap it here, wait until I'm done deleting vertices and then tackle them all at once
-				i += 1
-		
+		# it is plausible that vertex/uv morphs could reference orphan vertices, so those get dropped, the rest remapped
+		orphan_vertex_references += filter_and_remap(morph.items, vert_lookup, "vert_idx")
 		# morphs usually contain vertexes in sorted order, but not guaranteed!!! MAKE it sorted, nobody will mind
 		morph.items.sort(key=lambda x: x.vert_idx)
-		
-		# separate the vertices from the morph entries into a list of their own, for more efficient remapping
-		vertlist = [x.vert_idx for x in morph.items]
-		# remap
-		remappedlist = newval_from_range_map(vertlist, delme_range)
-		# write the remapped values back into where they came from
-		for x, newval in zip(morph.items, remappedlist):
-			x.vert_idx = newval
 		# display progress printouts
 		d += lenbefore
 		core.print_progress_oneline(d / totalwork)
@@ -219,51 +288,14 @@ def prune_unused_vertices(pmx: pmxstruct.Pmx, moreinfo=False):
 	
 	# softbody: probably not relevant but eh
 	for soft in pmx.softbodies:
-		# anchors
-		# first, delete any references to delme verts in the anchors
-		i = 0
-		while i < len(soft.anchors_list):
-			# if the vertex referenced is in the list of verts being deleted,
-			if core.binary_search_isin(soft.anchors_list[i][1], delme_verts):
-				# delete it here too
-				soft.anchors_list.pop(i)
-			else:
-				# otherwise, remap it
-				# but don't remap it here, wait until I'm done deleting vertices and then tackle them all at once
-				i += 1
-		
-		#  MAKE it sorted, nobody will mind
-		soft.anchors_list.sort(key=lambda x: x[1])
-		# extract the vert indices into a list of their town
-		anchorlist = [x[1] for x in soft.anchors_list]
-		# remap
-		newanchorlist = newval_from_range_map(anchorlist, delme_range)
-		# write the remapped values back into where they came from
-		for x, newval in zip(soft.anchors_list, newanchorlist):
-			x[1] = newval
-		
-		# vertex pins
-		# first, delete any references to delme verts
-		i = 0
-		while i < len(soft.vertex_pin_list):
-			# if the vertex referenced is in the list of verts being deleted,
-			if core.binary_search_isin(soft.vertex_pin_list[i], delme_verts):
-				# delete it here too
-				soft.vertex_pin_list.pop(i)
-			else:
-				# otherwise, remap it
-				# but don't remap it here, wait until I'm done deleting vertices and then tackle them all at once
-				i += 1
-		#  MAKE it sorted, nobody will mind
-		soft.anchors_list.sort()
-		# remap
-		soft.vertex_pin_list = newval_from_range_map(soft.vertex_pin_list, delme_range)
+		# anchors: drop any references to delme verts, remap the rest
+		filter_and_remap(soft.anchors_list, vert_lookup, 1)
+		# vertex pins: same
+		filter_and_remap(soft.vertex_pin_list, vert_lookup)
 		# done with softbodies!
 		
 	# now, finally, actually delete the vertices from the vertex list
-	delme_verts.reverse()
-	for f in delme_verts:
-		pmx.verts.pop(f)
+	core.delete_sorted_indices(pmx.verts, delme_verts)
 	
 	core.MY_PRINT_FUNC("Identified and deleted {} / {} = {:.1%} vertices for being unused".format(
 		numdeleted, prevtotal, numdeleted/prevtotal))
@@ -3,7 +3,12 @@
 #####################
 
 # first, system imports
-from time import time
+import csv
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from time import time, sleep, perf_counter
 from typing import List, Tuple, TypeVar
 
 # second, wrap custom imports with a try-except to catch it if files are missing
@@ -77,6 +82,23 @@ TRANSLATE_BUDGET_MAX_REQUESTS = 80
 # how long (hours) is the timeframe to protect
 # true timeframe is ~1 hr so enforce limit of ~1.2hr just to be safe
 TRANSLATE_BUDGET_TIMEFRAME = 1.0
+# the budget is a token bucket: up to BURST requests can be made at once, and it refills continuously with the rest
+# (MAX_REQUESTS - BURST per TIMEFRAME), so no single timeframe can ever see more than MAX_REQUESTS
+TRANSLATE_BUDGET_BURST = 40
+TRANSLATE_BUDGET_FILE = "translate_budget.json"
+# how many requests may be sent at the same time
+TRANSLATE_WORKERS = 4
+# how often a request that failed because of a connection problem is tried again, and how long (sec) to wait before
+# the first retry (doubled for each further retry)
+TRANSLATE_RETRIES = 3
+TRANSLATE_RETRY_DELAY = 1.0
+
+
+# remember every local/Google translation in a file in the persistent storage, keyed by JP name + category, and look
+# names up there before translating them again. KK models share most of their names, so after a few models almost
+# nothing needs to be sent to Google anymore.
+USE_TRANSLATION_MEMORY = True
+TRANSLATION_MEMORY_FILE = "translate_memory.json"
 
 
 
@@ -93,6 +115,19 @@ except ImportError as eee:
 		print("Please install this library with 'pip install googletrans'")
 		googletrans = None
 		DISABLE_INTERNET_TRANSLATE = True
+# network errors of the HTTP client under googletrans don't subclass the builtin ConnectionError/TimeoutError,
+# so GoogleBackend turns these into ConnectionError to get them retried
+_GOOGLE_NETWORK_ERRORS = (ConnectionError, TimeoutError)
+try:
+	import httpx  # googletrans 3.x & 4.x
+	_GOOGLE_NETWORK_ERRORS += (httpx.TransportError,)  # ConnectError, TimeoutException, ...
+except ImportError:
+	pass
+try:
+	import requests  # googletrans 2.x
+	_GOOGLE_NETWORK_ERRORS += (requests.ConnectionError, requests.Timeout)
+except ImportError:
+	pass
 
 
 category_dict = {0: "header", 4: "mat", 5: "bone", 6: "morph", 7: "frame"}
@@ -131,60 +166,413 @@ def init_googletrans():
 
 ################################################################################################################
 
-def check_translate_budget(num_proposed: int) -> bool:
+class TokenBucket:
+	"""
+	Request budget that refills continuously: it holds up to [capacity] tokens, gains [rate] tokens per second, and each
+	request takes one. If [path] is given, the state is kept in that JSON file so that the budget holds across runs.
+	Safe to use from several threads.
+	"""
+	def __init__(self, capacity: float, rate: float, path: str = None):
+		self.capacity = capacity
+		self.rate = rate
+		self.path = path
+		self.tokens = capacity
+		self.stamp = time()
+		self._lock = threading.Lock()
+	
+	def _load(self):
+		if self.path is None: return
+		try:
+			with open(self.path, "r", encoding="utf-8") as f:
+				state = json.load(f)
+			self.tokens, self.stamp = float(state["tokens"]), float(state["time"])
+		except (OSError, ValueError, KeyError, TypeError):
+			pass  # missing or broken file: start full
+	
+	def _save(self):
+		if self.path is None: return
+		tmp = self.path + ".tmp"
+		with open(tmp, "w", encoding="utf-8") as f:
+			json.dump({"tokens": self.tokens, "time": self.stamp}, f)
+		os.replace(tmp, self.path)
+	
+	def _refill(self):
+		now = time()
+		self.tokens = min(self.capacity, self.tokens + max(0.0, now - self.stamp) * self.rate)
+		self.stamp = now
+	
+	def take(self, num: int, partial: bool = False) -> int:
+		"""
+		Take tokens for [num] requests.
+		
+		:param num: number of requests I want to make
+		:param partial: if true, take as many as there are (up to num), otherwise take all of them or none
+		:return: number of requests that may be made now
+		"""
+		with self._lock:
+			self._load()
+			self._refill()
+			if partial: granted = min(num, int(self.tokens))
+			else:       granted = num if num <= self.tokens else 0
+			self.tokens -= granted
+			self._save()
+			return granted
+	
+	def available(self) -> int:
+		with self._lock:
+			self._load()
+			self._refill()
+			return int(self.tokens)
+	
+	def wait_time(self, num: int) -> float:
+		""" Seconds until there are tokens for [num] requests, or None if there never will be """
+		if num > self.capacity: return None
+		with self._lock:
+			self._load()
+			self._refill()
+			return max(0.0, (num - self.tokens) / self.rate) if self.rate > 0 else (0.0 if num <= self.tokens else None)
+
+def google_budget() -> TokenBucket:
+	"""
+	The persistent request budget for Google, from TRANSLATE_BUDGET_BURST, TRANSLATE_BUDGET_MAX_REQUESTS & TRANSLATE_BUDGET_TIMEFRAME.
+	"""
+	rate = (TRANSLATE_BUDGET_MAX_REQUESTS - TRANSLATE_BUDGET_BURST) / (TRANSLATE_BUDGET_TIMEFRAME * 60 * 60)
+	return TokenBucket(TRANSLATE_BUDGET_BURST, rate, core.get_persistient_storage_path(TRANSLATE_BUDGET_FILE))
+
+def take_translate_budget(backend: "TranslateBackend", num_proposed: int, partial: bool = True) -> int:
 	"""
 	Goal: block translations that would trigger the lockout.
-	Create & maintain a persistient file that contains timestamps and # of requests, to know if my proposed number will
-	exceed the budget. If it would still be under budget, then update the log assuming that the proposed requests will
-	happen. options: TRANSLATE_BUDGET_MAX_REQUESTS, TRANSLATE_BUDGET_TIMEFRAME
+	Take [num_proposed] requests from the budget of this backend (if it has one) and report how much is left.
+	
+	:param backend: the backend that will make the requests
+	:param num_proposed: number of times I want to contact the backend
+	:param partial: if true, allow fewer requests than proposed if the budget is low
+	:return: number of requests that may be made now
+	"""
+	if backend.budget is None: return num_proposed
+	granted = backend.budget.take(num_proposed, partial)
+	core.MY_PRINT_FUNC("... %d / %d translation requests are left in the budget (refills %d per %.4g hrs)..." % (
+		backend.budget.available(), int(backend.budget.capacity), TRANSLATE_BUDGET_MAX_REQUESTS - TRANSLATE_BUDGET_BURST, TRANSLATE_BUDGET_TIMEFRAME))
+	if granted < num_proposed:
+		rest = num_proposed - granted
+		waittime = backend.budget.wait_time(rest)
+		if waittime is None:
+			core.MY_PRINT_FUNC("BUDGET: you cannot make this many requests all at once")
+		else:
+			core.MY_PRINT_FUNC("BUDGET: you must wait %d minutes before you can do %d more translation requests with %s" % (
+				round(waittime / 60), rest, backend.name))
+	return granted
+
+def check_translate_budget(num_proposed: int) -> bool:
+	"""
+	Same as take_translate_budget for the current backend, but all-or-nothing.
 	
-	:param num_proposed: number of times I want to contact the google API
+	:param num_proposed: number of times I want to contact the backend
 	:return: bool True = go ahead, False = stop
 	"""
-	# first, get path to persistient storage file, also creates an empty file if it doesn't exist
-	recordpath = core.get_persistient_storage_path("translate_record.txt")
-	# then read the file into memory, quietly
-	record = core.read_file_to_csvlist(recordpath, quiet=True)
-	# discard all request records that are older than <timeframe>
-	now = time()
-	i = 0
-	while i < len(record):
-		if (now - record[i][0]) > (TRANSLATE_BUDGET_TIMEFRAME * 60 * 60):
-			# print("debug: discard", record[i])
-			record.pop(i)
+	backend = get_translate_backend()
+	return backend is None or take_translate_budget(backend, num_proposed, partial=False) == num_proposed
+
+################################################################################################################
+
+class TranslateError(RuntimeError):
+	""" A backend gave up, [lines] say why. translate_packets prints them once, no matter how many requests failed. """
+	def __init__(self, *lines: str):
+		super().__init__("\n".join(lines))
+		self.lines = lines
+
+class TranslateBackend:
+	"""
+	Something that can translate text, used by google_translate. A request is one string which may contain many names
+	separated by newlines, and the answer must have the translated names in the same lines.
+	- name   :: for messages
+	- budget :: TokenBucket that limits the requests, or None for no limit
+	translate() may raise ConnectionError or TimeoutError for problems that might go away when asked again,
+	anything else (preferably TranslateError) means giving up.
+	"""
+	name = "translator"
+	budget = None
+	def translate(self, text: str) -> str:
+		raise NotImplementedError()
+
+class GoogleBackend(TranslateBackend):
+	""" Google Translate web API thru googletrans. Options: GOOGLE_AUTODETECT_LANGUAGE. """
+	name = "Google Translate web API"
+	def __init__(self, translator, budget: TokenBucket = None):
+		self.translator = translator
+		self.budget = budget
+	
+	def translate(self, text: str) -> str:
+		try:
+			# acutally send a single string to Google for translation
+			if GOOGLE_AUTODETECT_LANGUAGE:
+				r = self.translator.translate(text, dest="en")  # auto
+			else:
+				r = self.translator.translate(text, dest="en", src="ja")  # jap
+			return r.text
+		except _GOOGLE_NETWORK_ERRORS as e:
+			# maybe try again
+			raise ConnectionError("%s: %s" % (e.__class__.__name__, e)) from e
+		except Exception as e:
+			lines = ["%s %s" % (e.__class__.__name__, e)]
+			if hasattr(e, "doc"):
+				lines += ["Response from Google:", e.doc.split("\n")[7], e.doc.split("\n")[9]]
+			raise TranslateError(*lines,
+				"Google API has rejected the translate request",
+				"This is probably due to too many translate requests too quickly",
+				"Strangely, this lockout does NOT prevent you from using Google Translate thru your web browser. So go use that instead.",
+				"Get a VPN or try again in about 1 day (TODO: CONFIRM LOCKOUT TIME)") from e
+
+class DictionaryBackend(TranslateBackend):
+	"""
+	Offline stand-in for Google: translates each line with a fixed JP->EN dict, either as exact match or piecewise.
+	Lines it cannot translate come back unchanged. Use it to test the whole translate path without internet, or to
+	translate with your own word list.
+	
+	:param mapping: dict of JP -> EN
+	:param budget: optional TokenBucket, to test the budget handling
+	:param latency: seconds each request pretends to take
+	"""
+	name = "dictionary"
+	def __init__(self, mapping: dict, budget: TokenBucket = None, latency: float = 0.0):
+		self.mapping = dict(mapping)
+		# sort the longest keys first, VERY CRITICAL for piecewise_translate so things don't get undershadowed!!!
+		self.words = dict(sorted(self.mapping.items(), reverse=True, key=lambda x: len(x[0])))
+		self.trie = translation_tools.DictTrie(self.words)
+		self.budget = budget
+		self.latency = latency
+	
+	@staticmethod
+	def from_file(src_path: str, **kwargs) -> "DictionaryBackend":
+		"""
+		Load the dict from a JSON file ({"JP": "EN", ...}) or a CSV file with JP and EN in the first two columns.
+		"""
+		with open(src_path, "r", encoding="utf-8-sig", newline="") as f:
+			if src_path.lower().endswith(".json"):
+				mapping = json.load(f)
+			else:
+				mapping = {row[0]: row[1] for row in csv.reader(f) if len(row) >= 2 and row[0]}
+		return DictionaryBackend(mapping, **kwargs)
+	
+	def _translate_line(self, line: str) -> str:
+		if not line or line.isspace(): return line
+		if line in self.mapping: return self.mapping[line]
+		# same as piecewise_translate(line, self.words), but with the trie compiled only once
+		out = []
+		i = 0
+		while i < len(line):
+			found = self.trie.match(line, i)
+			if found is None:
+				out.append(line[i])
+				i += 1
+			else:
+				out.append(found[1])
+				i += len(found[0])
+		return "".join(out)
+	
+	def translate(self, text: str) -> str:
+		if self.latency: sleep(self.latency)
+		return "\n".join(self._translate_line(line) for line in text.split("\n"))
+
+# backend used by google_translate, see set_translate_backend
+_translate_backend = None
+_google_backend = None
+
+def set_translate_backend(backend: TranslateBackend = None) -> None:
+	"""
+	Use this backend for all further online translations. None = Google, if DISABLE_INTERNET_TRANSLATE allows it.
+	"""
+	global _translate_backend
+	_translate_backend = backend
+
+def get_translate_backend() -> TranslateBackend:
+	"""
+	:return: the backend set with set_translate_backend, else Google if it is enabled & installed, else None
+	"""
+	global _google_backend
+	if _translate_backend is not None: return _translate_backend
+	if _DISABLE_INTERNET_TRANSLATE or jp_to_en_google is None: return None
+	if _google_backend is None or _google_backend.translator is not jp_to_en_google:
+		_google_backend = GoogleBackend(jp_to_en_google, google_budget())
+	return _google_backend
+
+def translate_packets(packets: List[str], backend: TranslateBackend, workers: int = None) -> List[str]:
+	"""
+	Send each packet to the backend as one request, up to [workers] at the same time (default TRANSLATE_WORKERS).
+	Requests that fail with ConnectionError/TimeoutError are retried up to TRANSLATE_RETRIES times, waiting
+	TRANSLATE_RETRY_DELAY seconds before the first retry and twice as long before each further one. Retries also take
+	from the budget of the backend. Prints how long the requests took.
+	If a request fails for good, the ones that did not start yet are dropped and the reason is printed once.
+	
+	:param packets: strings to translate, usually from packetize_translate_requests()
+	:param backend: where to send them
+	:param workers: max number of requests at the same time
+	:return: results in the same order as packets
+	:raises RuntimeError: if a request still fails, or the backend gave up
+	"""
+	if not packets: return []
+	workers = max(1, min(len(packets), workers or TRANSLATE_WORKERS))
+	latencies = [0.0] * len(packets)
+	retries = [0] * len(packets)
+	
+	def send(idx: int) -> str:
+		delay = TRANSLATE_RETRY_DELAY
+		while True:
+			start = perf_counter()
+			try:
+				result = backend.translate(packets[idx])
+				latencies[idx] = perf_counter() - start
+				return result
+			except (ConnectionError, TimeoutError) as e:
+				if retries[idx] >= TRANSLATE_RETRIES or (backend.budget is not None and not backend.budget.take(1)):
+					raise TranslateError("%s %s" % (e.__class__.__name__, e), "Check your internet connection?") from e
+				retries[idx] += 1
+				sleep(delay)
+				delay *= 2
+	
+	start = perf_counter()
+	results = [None] * len(packets)
+	error = None
+	with ThreadPoolExecutor(max_workers=workers) as pool:
+		futures = {pool.submit(send, d): d for d in range(len(packets))}
+		for done, future in enumerate(as_completed(futures)):
+			core.print_progress_oneline(done / len(packets))
+			try:
+				results[futures[future]] = future.result()
+			except Exception as e:
+				# stop sending, the requests that are already out can't be stopped but they won't print anything
+				for f in futures: f.cancel()
+				error = e
+				break
+	if error is not None:
+		if isinstance(error, TranslateError):
+			for line in error.lines: core.MY_PRINT_FUNC(line)
 		else:
-			i += 1
-	# then interpret the file: how many requests happened in the past <timeframe>
-	requests_in_timeframe = sum([entry[1] for entry in record])
-	core.MY_PRINT_FUNC("... you have used {} / {} translation requests within the last {:.4} hrs...".format(
-		int(requests_in_timeframe), int(TRANSLATE_BUDGET_MAX_REQUESTS), TRANSLATE_BUDGET_TIMEFRAME))
-	# make the decision
-	if (requests_in_timeframe + num_proposed) <= TRANSLATE_BUDGET_MAX_REQUESTS:
-		# this many translations is OK! go ahead!
-		# write this transaction into the record
-		record.append([now, num_proposed])
-		core.write_csvlist_to_file(recordpath, record, quiet=True)
+			core.MY_PRINT_FUNC(error.__class__.__name__, error)
+		raise RuntimeError()
+	total = perf_counter() - start
+	core.MY_PRINT_FUNC("... %d requests to %s took %.2f sec with %d at once, latency min/avg/max = %d / %d / %d ms, %d retries" % (
+		len(packets), backend.name, total, workers, min(latencies) * 1000, sum(latencies) / len(latencies) * 1000,
+		max(latencies) * 1000, sum(retries)))
+	return results
+
+################################################################################################################
+
+class TranslationMemory:
+	"""
+	Persistent store of earlier translations: (JP name, category) -> (EN name, translation type).
+	Only local piecewise (3) and Google (4) results are kept, everything else is cheap to redo.
+	The file is JSON of the form {"entries": {category name: {JP name: [EN name, type]}}}.
+	"""
+	SOURCES = (3, 4)
+	def __init__(self, path: str = None):
+		# if no path is given, use the file in the persistent storage (which creates it empty if it doesn't exist)
+		self.path = path if path is not None else core.get_persistient_storage_path(TRANSLATION_MEMORY_FILE)
+		self.entries = {}
+		self.changed = False
+		try:
+			with open(self.path, "r", encoding="utf-8") as f:
+				self.entries = json.load(f).get("entries", {})
+		except (OSError, ValueError):
+			pass  # missing, empty or broken file: start over
+	
+	def __len__(self) -> int:
+		return sum(len(v) for v in self.entries.values())
+	
+	def get(self, jp: str, cat_id: int) -> Tuple[str, int]:
+		"""
+		:param jp: JP name
+		:param cat_id: category as in category_dict
+		:return: tuple(EN name, translation type), or None if this name was never translated in this category
+		"""
+		found = self.entries.get(category_dict[cat_id], {}).get(jp)
+		return None if found is None else (found[0], found[1])
+	
+	def put(self, jp: str, cat_id: int, en: str, source: int) -> bool:
+		"""
+		Remember a translation. Ignored if source is not local or Google, or if en still needs translating.
+		
+		:return: True if this added or changed an entry
+		"""
+		if source not in self.SOURCES or not jp or translation_tools.needs_translate(en): return False
+		cat = self.entries.setdefault(category_dict[cat_id], {})
+		if cat.get(jp) == [en, source]: return False
+		cat[jp] = [en, source]
+		self.changed = True
 		return True
-	else:
-		# cannot do the translate, this would exceed the budget
-		# bonus value: how long until enough records expire that i can do this?
-		if num_proposed >= TRANSLATE_BUDGET_MAX_REQUESTS:
-			core.MY_PRINT_FUNC("BUDGET: you cannot make this many requests all at once")
-		else:
-			to_be_popped = 0
-			idx = 0
-			for idx in range(len(record)):
-				to_be_popped += record[idx][1]
-				if (requests_in_timeframe + num_proposed - to_be_popped) <= TRANSLATE_BUDGET_MAX_REQUESTS:
-					break
-			# when record[idx] becomes too old, then the current proposed number will be okay
-			waittime = record[idx][0] + (TRANSLATE_BUDGET_TIMEFRAME * 60 * 60) - now
-			# convert seconds to minutes
-			waittime = round(waittime / 60)
-			core.MY_PRINT_FUNC("BUDGET: you must wait %d minutes before you can do %d more translation requests with Google" % (waittime, num_proposed))
+	
+	def save(self) -> None:
+		""" Write the memory back to disk, if anything was added """
+		if not self.changed: return
+		tmp = self.path + ".tmp"
+		with open(tmp, "w", encoding="utf-8") as f:
+			json.dump({"entries": self.entries}, f, ensure_ascii=False, indent=0)
+		os.replace(tmp, self.path)
+		self.changed = False
+	
+	def export_csv(self, dest_path: str) -> int:
+		"""
+		Write all entries to a CSV file with columns category, JP, EN, type (e.g. "bone,右腕,arm_R,google").
 		
-		return False
+		:param dest_path: CSV file to create or overwrite
+		:return: number of entries written
+		"""
+		with open(dest_path, "w", encoding="utf-8", newline="") as f:
+			writer = csv.writer(f)
+			writer.writerow(["category", "jp", "en", "type"])
+			for cat, names in self.entries.items():
+				for jp, (en, source) in names.items():
+					writer.writerow([cat, jp, en, type_dict[source]])
+		return len(self)
 	
+	def import_csv(self, src_path: str) -> int:
+		"""
+		Read entries from a CSV file in the format of export_csv, replacing existing ones with the same JP name & category.
+		Rows with an unknown category or an EN name that still needs translating are skipped. The type can be left
+		empty, then it counts as local translation.
+		
+		:param src_path: CSV file to read
+		:return: number of entries that were added or changed
+		"""
+		cat_ids = {v: k for k, v in category_dict.items()}
+		source_ids = {type_dict[s]: s for s in self.SOURCES}
+		count = 0
+		with open(src_path, "r", encoding="utf-8-sig", newline="") as f:
+			for row in csv.reader(f):
+				if len(row) < 3 or row[0] not in cat_ids: continue  # header or garbage
+				source = source_ids.get(row[3].strip() if len(row) > 3 else "", 3)
+				count += self.put(row[1], cat_ids[row[0]], row[2], source)
+		return count
+
+def recall_translations(memory: TranslationMemory, items: list, sources=TranslationMemory.SOURCES) -> int:
+	"""
+	Fill in en_new & trans_type of each translate_entry in items whose JP name is in the translation memory with one
+	of these translation types.
+	
+	:return: number of items that were found
+	"""
+	found = 0
+	for item in items:
+		result = memory.get(item.jp_old, item.cat_id)
+		if result is not None and result[1] in sources:
+			item.en_new, item.trans_type = result
+			found += 1
+	return found
+
+def translation_memory_command(argv: List[str]) -> None:
+	"""
+	Bulk import/export of the translation memory from the command line:
+	"--export-memory FILE.csv" writes all entries to FILE.csv, "--import-memory FILE.csv" adds the entries in it.
+	"""
+	memory = TranslationMemory()
+	if argv[0] == "--export-memory":
+		count = memory.export_csv(argv[1])
+		core.MY_PRINT_FUNC("Exported %d translations to '%s'" % (count, argv[1]))
+	else:
+		count = memory.import_csv(argv[1])
+		memory.save()
+		core.MY_PRINT_FUNC("Imported %d translations from '%s', the memory now holds %d" % (count, argv[1], len(memory)))
+
 ################################################################################################################
 
 def packetize_translate_requests(jp_list: List[str]) -> List[str]:
@@ -219,36 +607,16 @@ def unpacketize_translate_requests(list_after: List[str]) -> List[str]:
 
 def _single_google_translate(jp_str: str) -> str:
 	"""
-	Actually send a single string to Google API for translation, unless internet trans is disabled.
-	Options: _DISABLE_INTERNET_TRANSLATE and GOOGLE_AUTODETECT_LANGUAGE.
+	Send a single string to the current backend for translation, unless there is none (internet trans is disabled).
+	Does not touch the budget, see check_translate_budget.
 	
 	:param jp_str: JP string to be translated
 	:return: usually english-translated result
 	"""
-	if _DISABLE_INTERNET_TRANSLATE:
+	backend = get_translate_backend()
+	if backend is None:
 		return jp_str
-	try:
-		# acutally send a single string to Google for translation
-		if GOOGLE_AUTODETECT_LANGUAGE:
-			r = jp_to_en_google.translate(jp_str, dest="en")  # auto
-		else:
-			r = jp_to_en_google.translate(jp_str, dest="en", src="ja")  # jap
-		return r.text
-	except ConnectionError as e:
-		core.MY_PRINT_FUNC(e.__class__.__name__, e)
-		core.MY_PRINT_FUNC("Check your internet connection?")
-		raise RuntimeError()
-	except Exception as e:
-		core.MY_PRINT_FUNC(e.__class__.__name__, e)
-		if hasattr(e, "doc"):
-			core.MY_PRINT_FUNC("Response from Google:")
-			core.MY_PRINT_FUNC(e.doc.split("\n")[7])
-			core.MY_PRINT_FUNC(e.doc.split("\n")[9])
-		core.MY_PRINT_FUNC("Google API has rejected the translate request")
-		core.MY_PRINT_FUNC("This is probably due to too many translate requests too quickly")
-		core.MY_PRINT_FUNC("Strangely, this lockout does NOT prevent you from using Google Translate thru your web browser. So go use that instead.")
-		core.MY_PRINT_FUNC("Get a VPN or try again in about 1 day (TODO: CONFIRM LOCKOUT TIME)")
-		raise RuntimeError()
+	return translate_packets([jp_str], backend)[0]
 
 ################################################################################################################
 
@@ -350,26 +718,24 @@ def google_translate(in_list: STR_OR_STRLIST, strategy=1) -> STR_OR_STRLIST:
 	if strategy == 2:    use_chunk_strat = (len(jp_chunks_packets) < len(jp_bodies_packets))
 	
 	# 5. check the translate budget to see if I can afford this
-	if use_chunk_strat: num_calls = len(jp_chunks_packets)
-	else:               num_calls = len(jp_bodies_packets)
+	if use_chunk_strat: packets = jp_chunks_packets
+	else:               packets = jp_bodies_packets
+	num_calls = len(packets)
 	
-	global _DISABLE_INTERNET_TRANSLATE
-	if check_translate_budget(num_calls) and not _DISABLE_INTERNET_TRANSLATE:
-		core.MY_PRINT_FUNC("... making %d requests to Google Translate web API..." % num_calls)
-	else:
+	# if the budget is too low for all of them, send what it allows & copy the rest, they can be done next time
+	backend = get_translate_backend()
+	granted = take_translate_budget(backend, num_calls) if backend is not None else 0
+	if granted:
+		core.MY_PRINT_FUNC("... making %d requests to %s..." % (granted, backend.name))
+	if granted < num_calls:
 		# no need to print failing statement, the function already does
 		# don't quit early, run thru the same full structure & eventually return a copy of the JP names
-		core.MY_PRINT_FUNC("Just copying JP -> EN while Google Translate is disabled")
-		_DISABLE_INTERNET_TRANSLATE = True
+		if granted: core.MY_PRINT_FUNC("... copying JP -> EN for the other %d requests" % (num_calls - granted))
+		else:       core.MY_PRINT_FUNC("Just copying JP -> EN while Google Translate is disabled")
 	
-	# 6. send chunks to Google
-	results_packets = []
+	# 6. send chunks to Google, several at once
+	results_packets = translate_packets(packets[:granted], backend) + packets[granted:]
 	if use_chunk_strat:
-		for d, packet in enumerate(jp_chunks_packets):
-			core.print_progress_oneline(d / len(jp_chunks_packets))
-			r = _single_google_translate(packet)
-			results_packets.append(r)
-		
 		# 7. assemble Google responses & re-associate with the chunks
 		# order of inputs "jp_chunks" matches order of outputs "results"
 		results = unpacketize_translate_requests(results_packets)  # unpack
@@ -387,16 +753,12 @@ def google_translate(in_list: STR_OR_STRLIST, strategy=1) -> STR_OR_STRLIST:
 		outlist = translation_tools.piecewise_translate(bodies, google_dict)
 	else:
 		# old style: just translate the strings directly and return their results
-		for d, packet in enumerate(jp_bodies_packets):
-			core.print_progress_oneline(d / len(jp_bodies_packets))
-			r = _single_google_translate(packet)
-			results_packets.append(r)
 		outlist = unpacketize_translate_requests(results_packets)
 	
 	# last, reattach the indents and suffixes
 	outlist_final = [i + b + s for i, b, s in zip(indents, outlist, suffixes)]
 	
-	if not _DISABLE_INTERNET_TRANSLATE:
+	if granted:
 		# if i did use internet translate, print this line when done
 		core.MY_PRINT_FUNC("... done!")
 	
@@ -414,6 +776,8 @@ It tries to do some intelligent piecewise translation using a local dictionary b
 Machine translation is never 100% reliable, so this is only a stopgap measure to eliminate all the 'Null_##'s and wrongly-encoded garbage and make it easier to use in MMD. A bad translation is better than none at all!
 Also, Google Translate only permits ~100 requests per hour, if you exceed this rate you will be locked out for 24 hours (TODO: CONFIRM LOCKOUT TIME)
 But my script has a built in limiter that will prevent you from translating if you would exceed the 100-per-hr limit.
+Every local/Google translation is also remembered in a translation memory, so names that were seen before are never sent to Google again.
+Run with "--export-memory FILE.csv" or "--import-memory FILE.csv" to edit or share the translation memory in bulk.
 '''
 
 iotext = '''Inputs:  PMX file "[model].pmx"\nOutputs: PMX file "[model]_translate.pmx"
@@ -516,6 +880,14 @@ def translate_to_english(pmx: pmxstruct.Pmx, moreinfo=False):
 	# partition the list into done and notdone
 	translate_maps, translate_notdone = core.my_list_partition(translate_maps, lambda x: x.trans_type != -1)
 	########
+	# look up everything that was translated locally before in the translation memory
+	# (Google results only after the local pass, so that new entries in the local dicts always win over them)
+	memory = TranslationMemory() if USE_TRANSLATION_MEMORY else None
+	if memory is not None:
+		num_found = recall_translations(memory, translate_notdone, (3,))
+		translate_done2, translate_notdone = core.my_list_partition(translate_notdone, lambda x: x.trans_type != -1)
+		translate_maps.extend(translate_done2)
+	########
 	# actually do local translate
 	local_results = translation_tools.local_translate([item.jp_old for item in translate_notdone])
 	# determine if each item passed or not, update the en_new and trans_type fields
@@ -523,9 +895,15 @@ def translate_to_english(pmx: pmxstruct.Pmx, moreinfo=False):
 		if not translation_tools.needs_translate(result):
 			item.en_new = result
 			item.trans_type = 3
+			if memory is not None: memory.put(item.jp_old, item.cat_id, item.en_new, 3)
 	# grab the newly-done items and move them to the done list
 	translate_done2, translate_notdone = core.my_list_partition(translate_notdone, lambda x: x.trans_type != -1)
 	translate_maps.extend(translate_done2)
+	if memory is not None and PREFER_EXISTING_ENGLISH_NAME:
+		# now the Google results from the translation memory can be used for the rest
+		num_found += recall_translations(memory, translate_notdone, (4,))
+		translate_done2, translate_notdone = core.my_list_partition(translate_notdone, lambda x: x.trans_type != -1)
+		translate_maps.extend(translate_done2)
 	########
 	if not PREFER_EXISTING_ENGLISH_NAME:
 		# if i chose to anti-prefer the existing EN name, then it is still preferred over google and should be checked here
@@ -535,9 +913,13 @@ def translate_to_english(pmx: pmxstruct.Pmx, moreinfo=False):
 					and not translation_tools.needs_translate(item.en_old):
 				item.en_new = item.en_old
 				item.trans_type = 0
+		# now the Google results from the translation memory can be used for the rest
+		if memory is not None: num_found += recall_translations(memory, translate_notdone, (4,))
 		# transfer the newly-done things over to the translate_maps list
 		translate_done2, translate_notdone = core.my_list_partition(translate_notdone, lambda x: x.trans_type != -1)
 		translate_maps.extend(translate_done2)
+	if memory is not None and num_found:
+		core.MY_PRINT_FUNC("... found %d names in the translation memory" % num_found)
 	
 	########
 	# actually do google translate
@@ -556,6 +938,7 @@ def translate_to_english(pmx: pmxstruct.Pmx, moreinfo=False):
 					item.trans_type = -1
 				else:
 					item.trans_type = 4
+					if memory is not None: memory.put(item.jp_old, item.cat_id, item.en_new, 4)
 			# grab the newly-done items and move them to the done list
 			translate_maps.extend(translate_notdone)
 			# comment!
@@ -587,6 +970,12 @@ def translate_to_english(pmx: pmxstruct.Pmx, moreinfo=False):
 	###########################################
 	# done translating!!!!!
 	###########################################
+	if memory is not None:
+		try:
+			memory.save()
+		except OSError as e:
+			core.MY_PRINT_FUNC(e.__class__.__name__, e)
+			core.MY_PRINT_FUNC("WARNING: unable to update the translation memory")
 	
 	# sanity check: if old result matches new result, then force type to be nochange
 	# only relevant if PREFER_EXISTING_ENGLISH_NAME = False
@@ -699,7 +1088,10 @@ def main():
 
 if __name__ == '__main__':
 	core.MY_PRINT_FUNC("Nuthouse01 - 10/10/2020 - v5.03")
-	if DEBUG:
+	import sys
+	if len(sys.argv) == 3 and sys.argv[1] in ("--import-memory", "--export-memory"):
+		translation_memory_command(sys.argv[1:])
+	elif DEBUG:
 		main()
 	else:
 		try:
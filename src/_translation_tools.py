@@ -961,12 +961,61 @@ def pre_translate(in_list: STR_OR_STRLIST) -> Tuple[STR_OR_STRLIST, STR_OR_STRLI
 	else:			return indent_list, body_list, suffix_list	# otherwise return as a list
 
 
+class DictTrie:
+	"""
+	Prefix tree over the keys of a mapping dict, so that piecewise_translate can find the matching key at each position
+	by walking the string once instead of trying every key.
+	Each node is a dict of {char: node}. If a key ends at a node, the node also has (rank, key, val) under the None key,
+	where rank is the position of the key in the dict: when several keys match, the one that comes first in the dict wins,
+	exactly like checking the keys in order. For dicts sorted longest-first (like words_dict) that is the longest match.
+	"""
+	def __init__(self, in_dict: dict):
+		self.root = {}
+		self.size = len(in_dict)
+		for rank, (key, val) in enumerate(in_dict.items()):
+			if not key: continue  # an empty key would "match" forever
+			node = self.root
+			for c in key:
+				node = node.setdefault(c, {})
+			if None not in node: node[None] = (rank, key, val)
+	
+	def match(self, s: str, i: int):
+		"""
+		Find the key that piecewise_translate should replace at position i of s.
+		
+		:param s: string to search in
+		:param i: position in s where the key must begin
+		:return: tuple (key, val) of the first matching key in dict order, or None if no key matches
+		"""
+		node = self.root
+		best = None
+		for j in range(i, len(s)):
+			node = node.get(s[j])
+			if node is None: break
+			found = node.get(None)
+			if found is not None and (best is None or found[0] < best[0]):
+				best = found
+		return None if best is None else best[1:]
+
+# compiled once for the builtin dict, since nearly every call uses it
+_words_trie = DictTrie(words_dict)
+
+def get_dict_trie(in_dict: dict) -> DictTrie:
+	"""
+	Return the DictTrie of in_dict. The one for words_dict is kept (and rebuilt if words_dict changes size), any other
+	dict is compiled on each call, since those are usually one-off results from Google Translate.
+	"""
+	global _words_trie
+	if in_dict is not words_dict: return DictTrie(in_dict)
+	if _words_trie.size != len(words_dict): _words_trie = DictTrie(words_dict)
+	return _words_trie
+
 def piecewise_translate(in_list: STR_OR_STRLIST, in_dict: dict) -> STR_OR_STRLIST:
 	"""
 	Apply piecewise translation to inputs when given a mapping dict.
 	Mapping dict will usually be the builtin comprehensive 'words_dict' or some results found from Google Translate.
-	From each position in the string(ordered), check each map entry(ordered). Dict should have keys ordered from longest
-	to shortest to avoid "undershadowing" problem.
+	From each position in the string(ordered), find the first map entry(ordered) that matches there. Dict should have
+	keys ordered from longest to shortest to avoid "undershadowing" problem.
 	Always returns what it produces, even if not a complete translation. Outer layers are responsible for checking if
 	the translation is "complete" before using it.
 	
@@ -978,14 +1027,57 @@ def piecewise_translate(in_list: STR_OR_STRLIST, in_dict: dict) -> STR_OR_STRLIS
 	if input_is_str: in_list = [in_list]  # force it to be a list anyway so I don't have to change my structure
 	outlist = []  # list to build & return
 	
-	dictitems = list(in_dict.items())
+	trie = get_dict_trie(in_dict)
 	
 	for out in in_list:
 		if (not out) or out.isspace():  # support bad/missing data
 			outlist.append("JP_NULL")
 			continue
 		# goal: substrings that match keys of "words_dict" get replaced
-		# NEW ARCHITECTURE: starting from each char, try to match against the contents of the dict. longest items are first!
+		# walk thru the original string once, and collect the pieces of the result in a list instead of rebuilding it
+		# after each replacement. "last" is the last char that was added to the result so far.
+		pieces = []
+		last = ""
+		i = 0
+		while i < len(out):  # starting from each char of the string,
+			found = trie.match(out, i)  # find the first thing in the dict that matches starting from 'i',
+			if found is None:
+				last = out[i]
+				pieces.append(last)
+				i += 1
+				continue
+			key, val = found
+			# i am going to replace it key->val, but first maybe insert space before or after or both.
+			# note: letter/number are the ONLY things that use joinchar. all punctuation and all JP stuff do not use joinchar.
+			# if the result so far ends with a letter/number, then PREPEND a space
+			before_space = " " if last.isalnum() else ""
+			# if "i+len(key)" is a valid index and the char at that index is letter/number, then APPEND a space
+			after_space = " " if i+len(key) < len(out) and out[i+len(key)].isalnum() else ""
+			piece = before_space + val + after_space
+			pieces.append(piece)
+			if piece: last = piece[-1]
+			# i don't need to examine or try to replace on any of these chars, so skip ahead
+			i += len(key)
+		# once all uses of all keys have been replaced, then append the result
+		outlist.append("".join(pieces))
+	
+	if input_is_str:	return outlist[0]	# if original input was a single string, then de-listify
+	else:				return outlist		# otherwise return as a list
+
+
+def _piecewise_translate_by_scan(in_list: STR_OR_STRLIST, in_dict: dict) -> STR_OR_STRLIST:
+	# the old piecewise_translate, which tries every key at every position. only kept to check & time the new one against
+	# in benchmark_piecewise_translate.
+	input_is_str = isinstance(in_list, str)
+	if input_is_str: in_list = [in_list]
+	outlist = []
+	
+	dictitems = list(in_dict.items())
+	
+	for out in in_list:
+		if (not out) or out.isspace():  # support bad/missing data
+			outlist.append("JP_NULL")
+			continue
 		i = 0
 		while i < len(out):  # starting from each char of the string,
 			found_match = False
@@ -1013,6 +1105,33 @@ def piecewise_translate(in_list: STR_OR_STRLIST, in_dict: dict) -> STR_OR_STRLIS
 	else:				return outlist		# otherwise return as a list
 
 
+def benchmark_piecewise_translate(repeat: int = 5) -> None:
+	"""
+	Microbenchmark: check that piecewise_translate gives the same results as the old way of trying every key at every
+	position, then time both. The inputs are every key of the builtin dicts on their own, plus names glued together
+	from them with some latin letters & numbers mixed in, so the space-insertion rules get tested too.
+	
+	:param repeat: how often to translate all inputs with each version
+	"""
+	import random
+	import time
+	rand = random.Random(0)
+	names = [k for d in (words_dict, bone_dict, morph_dict, frame_dict) for k in d]
+	filler = ["", "", "L", "R", "2", "_", " ", "ab", ".", "x1"]
+	names += ["".join(rand.choice(names) + rand.choice(filler) for _ in range(rand.randint(1, 4))) for _ in range(2000)]
+	names += ["", " "]
+	for in_dict in (words_dict, dict(reversed(list(words_dict.items())))):
+		new = piecewise_translate(names, in_dict)
+		old = _piecewise_translate_by_scan(names, in_dict)
+		bad = [(n, a, b) for n, a, b in zip(names, old, new) if a != b]
+		assert not bad, "piecewise_translate differs for %d inputs, first: %s" % (len(bad), bad[0])
+	print("same results for %d inputs, %d dict keys" % (len(names), len(words_dict)))
+	for func in (_piecewise_translate_by_scan, piecewise_translate):
+		start = time.perf_counter()
+		for _ in range(repeat): func(names, words_dict)
+		print("%-30s %.3f sec" % (func.__name__, (time.perf_counter() - start) / repeat))
+
+
 def local_translate(in_list: STR_OR_STRLIST) -> STR_OR_STRLIST:
 	"""
 	Simple wrapper func to run both pre_translate and local_translate using words_dict.
@@ -1098,3 +1217,6 @@ def local_translate(in_list: STR_OR_STRLIST) -> STR_OR_STRLIST:
 # 	core.MY_PRINT_FUNC("Nuthouse01 - 10/10/2020 - v5.03")
 # 	main()
 #
+
+if __name__ == '__main__':
+	benchmark_piecewise_translate()
@@ -16,131 +16,170 @@ todos="""
 -- Find a use for the third layer (probably as *.fx in combination with NormalMask)
 """
 
-#-------------
-imgMain = sys.argv[1] ## MainTex.png
-imgMask = sys.argv[2] ## LineMask.png
-#-------------
-data    = {}
-if (len(sys.argv) > 3): data = imglib.TryLoadJson(sys.argv[3])
-verbose  = data.get("showinfo", False)
-mainSize = data.get("mainSize", True)
-mode     = data.get("mode", "overlay")
-#-------------
-# value  = (Checkbox) of "body".tex__Line.Green
-linetexon    = data.get("linetexon", 1)
-#-------------
-args = sys.argv[1:]
-if verbose: print(("\n=== Running LineMask Script with arguments:" + "\n-- %s" * len(args)) % tuple(args))
-else: print("\n === Running LineMask Script ")
-
-
-### Apply Transparency of 30% ( = 64 of 255)
-alpha   = 32 / 255    ## For mask
-beta    = 1.0 - alpha ## For main
-show    = False       ## Do cv2.imshow
-opt = imglib.makeOptions(locals())
-
-### Read in pics
-raw_image = imglib.TryLoadImage(imgMain, "MainTex")
-mask = imglib.TryLoadImage(imgMask, "LineMask")
-DisplayWithAspectRatio(opt, 'Org', raw_image, 256)
-
-## Pull out the alpha for later
-if raw_image.shape[2] >= 4: # @todo_add:: extract_alpha(raw_image) --> (image, imgAlpha, has_alpha)
-	imgAlpha = raw_image[:,:,3]
-	image = raw_image[:,:,:3]
-else:
-	imgAlpha = np.ones(raw_image.shape[:2], dtype='uint8') * 255
-	image = raw_image
-
-def extractChannel(src, chIdx):
-    ### Extract channels and invert them
-    maskCh = 255 - src[:,:,chIdx]
+class LineMapArgs:
+	"""
+	:param main [str]  : Path to MainTex
+	:param mask [str]  : Path to LineMask
+	:param data [dict] : Options, see below
+	"""
+	def __init__(self, main: str, mask: str, data: dict = None):
+		self.main = main
+		self.mask = mask
+		self.data = data if data is not None else {}
+
+	@staticmethod
+	def from_argv(argv):
+		""" Parse the command line of this script, incl. the path to this file """
+		data = imglib.TryLoadJson(argv[3]) if len(argv) > 3 else {}
+		return LineMapArgs(argv[1], argv[2], data)
+
+	def as_argv(self): return [self.main, self.mask, json.dumps(self.data)]
+
+	def output_path(self) -> str:
+		""" Where [apply_line_map] writes its result """
+		return self.main[:-4] + "_pyLin.png"
+
+	def inputs(self) -> list:
+		""" All images that [apply_line_map] reads """
+		return [x for x in [self.main, self.mask] if len(x) > 0]
+
+def apply_line_map(params: LineMapArgs) -> str:
+	""" Overlay the LineMask onto the MainTex and write it next to it. Returns the path of the new image """
+	#-------------
+	imgMain = params.main ## MainTex.png
+	imgMask = params.mask ## LineMask.png
+	#-------------
+	data    = params.data
+	verbose  = data.get("showinfo", False)
+	mainSize = data.get("mainSize", True)
+	mode     = data.get("mode", "overlay")
+	#-------------
+	# value  = (Checkbox) of "body".tex__Line.Green
+	linetexon    = data.get("linetexon", 1)
+	#-------------
+	args = params.as_argv()
+	if verbose: print(("\n=== Running LineMask Script with arguments:" + "\n-- %s" * len(args)) % tuple(args))
+	else: print("\n === Running LineMask Script ")
+
+
+	### Apply Transparency of 30% ( = 64 of 255)
+	alpha   = 32 / 255    ## For mask
+	beta    = 1.0 - alpha ## For main
+	show    = False       ## Do cv2.imshow
+	opt = imglib.makeOptions(locals())
+
+	### Read in pics
+	raw_image = imglib.TryLoadImage(imgMain, "MainTex")
+	mask = imglib.TryLoadImage(imgMask, "LineMask")
+	DisplayWithAspectRatio(opt, 'Org', raw_image, 256)
+
+	## Pull out the alpha for later
+	if raw_image.shape[2] >= 4: # @todo_add:: extract_alpha(raw_image) --> (image, imgAlpha, has_alpha)
+		imgAlpha = raw_image[:,:,3]
+		image = raw_image[:,:,:3]
+	else:
+		imgAlpha = np.ones(raw_image.shape[:2], dtype='uint8') * 255
+		image = raw_image
+
+	def extractChannel(src, chIdx):
+	    ### Extract channels and invert them
+	    maskCh = 255 - src[:,:,chIdx]
     
-    ### Stretch to same shape as imgMain
-    if (maskCh.shape[:2] != image.shape[:2]) and mainSize:
-        target = image.shape
-        source = maskCh.shape
-        width  = int(source[1] * (target[1] / source[1]))
-        height = int(source[0] * (target[0] / source[0]))
-        #print("{} * ({} / {} = {}) == {}".format(source[1], target[1], source[1], target[1] / source[1], width))
-        #print("{} * ({} / {} = {}) == {}".format(source[0], target[0], source[0], target[0] / source[0], height))
-        maskCh = cv2.resize(maskCh, (width, height), interpolation=cv2.INTER_NEAREST)
-    ### Widen into 3-Channel image again
-    maskChX = imglib.extendChannel(maskCh, maskCh)
-    DisplayWithAspectRatio(opt, 'Channel '+str(chIdx)+ ': ', maskChX, 256)
-
-    return maskChX
-#-----
-cv2.destroyAllWindows()
-maskB = extractChannel(mask, 0) ## NormalMask.Y (?)
-maskG = extractChannel(mask, 1) ## Smoothness
-#maskR = extractChannel(mask, 2) ## Specularity
-
-if (mask.shape[:2] != image.shape[:2]) and (not mainSize): # @todo_add:: resize_image(img, target, source)
-	target = mask.shape
-	source = image.shape
-	width  = int(source[1] * (target[1] / source[1]))
-	height = int(source[0] * (target[0] / source[0]))
-	#print("{} * ({} / {} = {}) == {}".format(source[1], target[1], source[1], target[1] / source[1], width))
-	#print("{} * ({} / {} = {}) == {}".format(source[0], target[0], source[0], target[0] / source[0], height))
-	image = cv2.resize(image, (width, height), interpolation=cv2.INTER_NEAREST)
-
-### Make colors stronger before being toned down again
-#hsv = cv2.cvtColor(image, cv2.COLOR_BGR2HSV)
-#hsv[:,:,1] = hsv[:,:,1] + 10
-#image = cv2.cvtColor(hsv, cv2.COLOR_HSV2BGR)
-#if show: cv2.imshow('Stronger', image)
-
-colArr = image[0,0,:]
-#colImg = imglib.getColorMask(opt, maskB[:,:,3], colArr, useKKOrder=False)
-#colImg[:,:,3] = maskB[:,:,3]
-#DisplayWithAspectRatio(opt, 'ColImg+Alpha', colImg, 256)
-_colImg = imglib.getColorImg(opt, maskB, colArr)
-
-colImg = _colImg#imglib.invert(_colImg)
-#imglib.testOutModes_wrap(image, maskB, opt)
-#imglib.testOutModes_wrap(image, colImg, opt)
-isOld = False
-#imglib.testOutModes(opt, image, maskB, _standardize=True)
-#imglib.testOutModes(opt, image, colImg, _standardize=True)
-if (isOld):
-	image = imglib.blend_segmented("multiply", image, colImg, alpha)#.astype("uint8")
-else:
-	image = imglib.blend_segmented(mode, image, maskB, alpha)#.astype("uint8")
-
-DisplayWithAspectRatio(opt, 'After B', image, 256)
-
-#####
-# [Adds Grey]: Not, Mul, GExtract, Darken \\ (Light): HardLight, GMerge
-# [Decent]: Ovl > Lighten, SoftLight, Screen, Div
-#imglib.testOutModes_wrap(image, maskB)
-#
-#image = imglib.blend_segmented("overlay", image, maskB, alpha)#.astype("uint8")
-
-#imglib.testOutModes_wrap(image, maskG, opt)
-#maskG = imglib.invert(maskG)
-#imglib.testOutModes_wrap(image, maskG, opt)
-#imglib.testOutModes(opt, image, maskG, _standardize=True)
-image = imglib.blend_segmented("overlay", image, maskG, linetexon).astype("uint8")
-
-
-##if (flag): ## Add Top -> Bottom \\ Unknown why it should have been controlable
-#mixMask = cv2.addWeighted(maskG, 0.5, maskB, 0.5, 0)
-#DisplayWithAspectRatio(opt, 'MixMask', mixMask, 256)
-#imglib.testOutModes_wrap(image, mixMask)
-
-#image = imglib.blend_segmented(mode, image, mixMask, alpha).astype("uint8")
-#image = cv2.addWeighted(image, beta, mixMask, alpha, 0)
-#DisplayWithAspectRatio(opt, 'With MixMask', image, 256)
-
-### Remerge Alpha
-#image = cv2.merge([image[:,:,0], image[:,:,1], image[:,:,2], imgAlpha])
-
-DisplayWithAspectRatio(opt, 'Final', image.astype("uint8"), 256)
-if show: k = cv2.waitKey(0) & 0xFF
-
-### Write out final image
-outName = imgMain[:-4] + "_pyLin.png"
-imglib.TryWriteImage(outName, image)
-print("Wrote output image at\n" + outName)
+	    ### Stretch to same shape as imgMain
+	    if (maskCh.shape[:2] != image.shape[:2]) and mainSize:
+	        target = image.shape
+	        source = maskCh.shape
+	        width  = int(source[1] * (target[1] / source[1]))
+	        height = int(source[0] * (target[0] / source[0]))
+	        #print("{} * ({} / {} = {}) == {}".format(source[1], target[1], source[1], target[1] / source[1], width))
+	        #print("{} * ({} / {} = {}) == {}".format(source[0], target[0], source[0], target[0] / source[0], height))
+	        maskCh = cv2.resize(maskCh, (width, height), interpolation=cv2.INTER_NEAREST)
+	    ### Widen into 3-Channel image again
+	    maskChX = imglib.extendChannel(maskCh, maskCh)
+	    DisplayWithAspectRatio(opt, 'Channel '+str(chIdx)+ ': ', maskChX, 256)
+
+	    return maskChX
+	#-----
+	cv2.destroyAllWindows()
+	maskB = extractChannel(mask, 0) ## NormalMask.Y (?)
+	maskG = extractChannel(mask, 1) ## Smoothness
+	#maskR = extractChannel(mask, 2) ## Specularity
+
+	if (mask.shape[:2] != image.shape[:2]) and (not mainSize): # @todo_add:: resize_image(img, target, source)
+		target = mask.shape
+		source = image.shape
+		width  = int(source[1] * (target[1] / source[1]))
+		height = int(source[0] * (target[0] / source[0]))
+		#print("{} * ({} / {} = {}) == {}".format(source[1], target[1], source[1], target[1] / source[1], width))
+		#print("{} * ({} / {} = {}) == {}".format(source[0], target[0], source[0], target[0] / source[0], height))
+		image = cv2.resize(image, (width, height), interpolation=cv2.INTER_NEAREST)
+
+	### Make colors stronger before being toned down again
+	#hsv = cv2.cvtColor(image, cv2.COLOR_BGR2HSV)
+	#hsv[:,:,1] = hsv[:,:,1] + 10
+	#image = cv2.cvtColor(hsv, cv2.COLOR_HSV2BGR)
+	#if show: cv2.imshow('Stronger', image)
+
+	colArr = image[0,0,:]
+	#colImg = imglib.getColorMask(opt, maskB[:,:,3], colArr, useKKOrder=False)
+	#colImg[:,:,3] = maskB[:,:,3]
+	#DisplayWithAspectRatio(opt, 'ColImg+Alpha', colImg, 256)
+	_colImg = imglib.getColorImg(opt, maskB, colArr)
+
+	colImg = _colImg#imglib.invert(_colImg)
+	#imglib.testOutModes_wrap(image, maskB, opt)
+	#imglib.testOutModes_wrap(image, colImg, opt)
+	isOld = False
+	#imglib.testOutModes(opt, image, maskB, _standardize=True)
+	#imglib.testOutModes(opt, image, colImg, _standardize=True)
+	if (isOld):
+		image = imglib.blend_segmented("multiply", image, colImg, alpha)#.astype("uint8")
+	else:
+		image = imglib.blend_segmented(mode, image, maskB, alpha)#.astype("uint8")
+
+	DisplayWithAspectRatio(opt, 'After B', image, 256)
+
+	#####
+	# [Adds Grey]: Not, Mul, GExtract, Darken \\ (Light): HardLight, GMerge
+	# [Decent]: Ovl > Lighten, SoftLight, Screen, Div
+	#imglib.testOutModes_wrap(image, maskB)
+	#
+	#image = imglib.blend_segmented("overlay", image, maskB, alpha)#.astype("uint8")
+
+	#imglib.testOutModes_wrap(image, maskG, opt)
+	#maskG = imglib.invert(maskG)
+	#imglib.testOutModes_wrap(image, maskG, opt)
+	#imglib.testOutModes(opt, image, maskG, _standardize=True)
+	image = imglib.blend_segmented("overlay", image, maskG, linetexon, dtype="uint8")
+
+
+	##if (flag): ## Add Top -> Bottom \\ Unknown why it should have been controlable
+	#mixMask = cv2.addWeighted(maskG, 0.5, maskB, 0.5, 0)
+	#DisplayWithAspectRatio(opt, 'MixMask', mixMask, 256)
+	#imglib.testOutModes_wrap(image, mixMask)
+
+	#image = imglib.blend_segmented(mode, image, mixMask, alpha).astype("uint8")
+	#image = cv2.addWeighted(image, beta, mixMask, alpha, 0)
+	#DisplayWithAspectRatio(opt, 'With MixMask', image, 256)
+
+	### Remerge Alpha
+	#image = cv2.merge([image[:,:,0], image[:,:,1], image[:,:,2], imgAlpha])
+
+	DisplayWithAspectRatio(opt, 'Final', image.astype("uint8"), 256)
+	if show: k = cv2.waitKey(0) & 0xFF
+
+	### Write out final image
+	outName = params.output_path()
+	imglib.TryWriteImage(outName, image)
+	print("Wrote output image at\n" + outName)
+	return outName
+
+def parse_argv(argv) -> LineMapArgs:
+	""" Same as [LineMapArgs.from_argv] """
+	return LineMapArgs.from_argv(argv)
+
+def main(argv):
+	""" Run this script with the command line [argv], incl. the path to this file """
+	return apply_line_map(parse_argv(argv))
+
+if __name__ == '__main__': main(sys.argv)
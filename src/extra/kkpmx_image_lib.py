@@ -6,6 +6,21 @@ import cv2
 import numpy as np
 import blend_modes
 import gc, os
+import threading
+from collections import OrderedDict
+
+## Decoded images stay in memory up to this many bytes, so running several scripts in a row does not read the same file again
+IMAGE_CACHE_BYTES = 256 * 1024 * 1024
+_image_cache = OrderedDict() ## (path, mtime_ns, size) -> np.ndarray (read-only)
+_image_cache_bytes = 0
+_image_cache_lock = threading.Lock()
+
+## [blend_segmented] works on tiles of this many pixels in each direction
+BLEND_TILE = 1024
+## Threads that blend tiles at the same time (numpy does most of the work without the GIL), None for one per CPU
+BLEND_WORKERS = None
+## uint8 outputs of [blend_segmented] with at least this many pixels are backed by a temporary file instead of RAM
+BLEND_MEMMAP_PIXELS = 8192 * 8192
 
 def makeOptions(_opt):
 	return {
@@ -44,6 +59,45 @@ def TryLoadImage(path, name="image file"):
 	if not path:
 		print(f"[!] Cannot load {name} from empty path!")
 		return None
+	## Callers modify the image in-place, so always hand out a copy
+	try: st = os.stat(path)
+	except OSError: return _load_image(path, name)
+	key = (os.path.normcase(os.path.abspath(path)), st.st_mtime_ns, st.st_size)
+	with _image_cache_lock:
+		img = _image_cache.get(key)
+		if img is not None: _image_cache.move_to_end(key)
+	if img is None:
+		img = _load_image(path, name)
+		if img is None: return None
+		_cache_image(key, img)
+	return img.copy()
+
+def _cache_image(key, img):
+	global _image_cache_bytes
+	if img.nbytes > IMAGE_CACHE_BYTES: return
+	img.setflags(write=False)
+	with _image_cache_lock:
+		old = _image_cache.pop(key, None)
+		if old is not None: _image_cache_bytes -= old.nbytes
+		_image_cache[key] = img
+		_image_cache_bytes += img.nbytes
+		while _image_cache_bytes > IMAGE_CACHE_BYTES:
+			_, old = _image_cache.popitem(last=False)
+			_image_cache_bytes -= old.nbytes
+
+def forget_image(path):
+	""" Drop all cached versions of [path], or everything if None """
+	global _image_cache_bytes
+	with _image_cache_lock:
+		if path is None:
+			_image_cache.clear()
+			_image_cache_bytes = 0
+			return
+		path = os.path.normcase(os.path.abspath(path))
+		for key in [k for k in _image_cache if k[0] == path]:
+			_image_cache_bytes -= _image_cache.pop(key).nbytes
+
+def _load_image(path, name):
 	try:
 		if is_ascii(path):
 			img = cv2.imread(path, cv2.IMREAD_UNCHANGED)
@@ -64,6 +118,7 @@ def TryLoadImage(path, name="image file"):
 
 def TryWriteImage(path, img, name="image file"):
 	import os
+	forget_image(path)
 	if is_ascii(path):
 		cv2.imwrite(path, img)
 	else:
@@ -213,36 +268,55 @@ def get_blend_mode(blend_mode):
 	if blend_mode not in blendDict: raise Exception("Unknown blend_mode " + blend_mode)
 	return blendDict[blend_mode]
 
-def blend_segmented(blend_mode, main, mask, alpha):
+def _tile_rgba(img, y, x):
+	## float32 RGBA copy of one tile, same values as [converter(img, addAlpha=True)] would have there
+	tile = img[y, x]
+	rgba = np.empty(tile.shape[:2] + (4,), dtype=np.float32)
+	if tile.shape[2] == 4: rgba[...] = tile
+	else:
+		rgba[:,:,:3] = tile[:,:,:3]
+		rgba[:,:,3] = 255
+	return rgba
+
+def new_blend_output(shape, dtype="uint8"):
+	""" Empty (H, W, 4) image of [dtype] for [blend_segmented] -- uint8 images with at least [BLEND_MEMMAP_PIXELS] pixels live in a temporary file """
+	shape = (shape[0], shape[1], 4)
+	if np.dtype(dtype) == np.uint8 and shape[0] * shape[1] >= BLEND_MEMMAP_PIXELS:
+		import tempfile
+		return np.memmap(tempfile.TemporaryFile(), dtype=np.uint8, mode="w+", shape=shape)
+	return np.empty(shape, dtype=dtype)
+
+def blend_segmented(blend_mode, main, mask, alpha, dtype=float, out=None, workers=None):
 	"""
 	@param :blend_mode: str or Func
 	@param :main:       -- Background image
 	@param :mask:       -- Foreground image
 	@param :alpha:      -- Opacity
+	@param :dtype:      -- Type of the result; "uint8" is clipped to 0..255 & cut off like .astype("uint8")
+	@param :out:        -- (H, W, 4) array to write the result into instead (e.g. from [new_blend_output])
+	@param :workers:    -- Threads to blend with, default is [BLEND_WORKERS]
 	
 	Applies the given blend_mode to @main and @mask, using @alpha as opacity.
-	To save resources, images are processed in chunks of 1024x1024 
+	To save resources, images are processed in tiles of [BLEND_TILE]: Each tile is converted to float32, blended
+	and written into the result right away, so only a few tiles exist as float at the same time.
 	"""
 	if type(blend_mode) == str: blend_mode = get_blend_mode(blend_mode)
-	gc.collect()
-	_main = converter(main, addAlpha=True)
-	_mask = converter(mask, addAlpha=True)
-	def buildRange(axis, size):
-		ret = []
-		arr = [x for x in range(0, axis, size)]
-		while len(arr) > 1:
-			val = arr.pop(0)
-			ret.append(slice(val, arr[0]))
-		## we want the end + last is always omitted
-		ret.append(slice(arr[0], axis))
-		return ret
-	height = buildRange(_main.shape[0], 1024)
-	width = buildRange(_main.shape[1], 1024)
-	image = np.zeros(_main.shape, dtype='float')
-	for y in height:
-		for x in width:
-			image[y,x,:] = blend_mode(_main[y,x,:], _mask[y,x,:], alpha)
-	return image
+	if out is None: out = new_blend_output(main.shape, dtype)
+	is_int = out.dtype.kind in "ui"
+	def blend_tile(y, x):
+		tile = blend_mode(_tile_rgba(main, y, x), _tile_rgba(mask, y, x), alpha)
+		if is_int: np.clip(tile, 0, 255, out=tile)
+		out[y, x] = tile
+	tiles = [(slice(y, y + BLEND_TILE), slice(x, x + BLEND_TILE))
+		for y in range(0, main.shape[0], BLEND_TILE) for x in range(0, main.shape[1], BLEND_TILE)]
+	workers = min(len(tiles), workers or BLEND_WORKERS or os.cpu_count() or 1)
+	if workers < 2:
+		for (y, x) in tiles: blend_tile(y, x)
+	else:
+		from concurrent.futures import ThreadPoolExecutor
+		with ThreadPoolExecutor(max_workers=workers) as pool:
+			for _ in pool.map(lambda t: blend_tile(*t), tiles): pass
+	return out
 
 def ensureAlpha(img, imgAlpha=None):
 	if len(img.shape) == 2: return extendChannel(img, imgAlpha)
@@ -5,11 +5,14 @@ from typing import List
 import re
 import os
 import copy
+import multiprocessing
 from datetime import datetime ### used in [end]
 
 import kkpmx_property_parser as PropParser ## parseMatComments
 import kkpmx_utils as util
 from kkpmx_utils import find_bone, find_mat, find_disp, find_morph, find_rigid
+import kkpmx_index as kkindex
+import kkpmx_pipeline as kkpipe
 import kkpmx_rigging as kkrig
 from kkpmx_handle_overhang import run as runOverhang
 from kkpmx_json_generator import GenerateJsonFile
@@ -34,6 +37,13 @@ except ImportError as eee:
 DEBUG = util.DEBUG or False
 ## Certain things which are only useful when developing
 DEVDEBUG = False
+## [kk_quick_convert] without per-step models: Sections (by their title) after which a snapshot file is written anyway
+## -- e.g. ["Rigging"] writes [model_rigging.pmx] in the background once the rigging is done
+QUICK_CONVERT_CHECKPOINTS = []
+## [end]: Encode & write the model in a background thread instead of waiting for it
+END_WRITES_IN_BACKGROUND = True
+## [delete_invisible_faces]: Threads that decode & sample textures at the same time, None for one per CPU
+INVISIBLE_SCAN_WORKERS = None
 
 #############
 ### Start ###
@@ -657,7 +667,7 @@ There are some additional steps that cannot be done by a script; They will be me
 -- [Edit(E)] -> Plugin(P) -> User -> Semi-Standard Bone Plugin -> Semi-Standard Bones (PMX) -> default or all (except [Camera Bone])
 """
 	secNum = {"s": -1}
-	def section(msg): secNum["s"] += 1; print(f"------\n> [{secNum['s']}] {msg}\n------")
+	def section(msg): secNum["s"] += 1; print(f"------\n> [{secNum['s']}] {msg}\n------"); pipe.begin_stage(msg)
 	## ask if doing new model per step or only one at the end
 	print("Press 'y'+Enter if you have no clue or don't care about options, else press 'n'")
 	speed_yes = util.ask_yes_no("Write your choice","n")
@@ -673,6 +683,8 @@ There are some additional steps that cannot be done by a script; They will be me
 		has_univrm  = util.is_univrm();
 		all_yes     = util.ask_yes_no("Do most as yes","y")
 	util.global_state["all_yes"] = all_yes
+	## Without per-step models, the model stays in memory and is only written at checkpoints & once at the end
+	pipe = kkpipe.Pipeline(pmx, input_filename_pmx, in_memory=not write_model, checkpoints=QUICK_CONVERT_CHECKPOINTS, moreinfo=moreinfo)
 	util.global_state[util.OPT_INFO] = moreinfo
 	
 	## rename input_filename_pmx to "_org"
@@ -684,6 +696,7 @@ There are some additional steps that cannot be done by a script; They will be me
 			util.move_unused_from_folder(pmx, orgPath)
 			util.copy_file(orgPath, input_filename_pmx)
 			pmx = pmxlib.read_pmx(input_filename_pmx, moreinfo=False)
+			pipe.pmx = pmx
 	else:
 		end(None, input_filename_pmx, "_org", "Created Backup file")
 		util.copy_file(input_filename_pmx, orgPath)
@@ -716,8 +729,7 @@ There are some additional steps that cannot be done by a script; They will be me
 			_opt["delDisp"] = True
 			if not write_model:
 				print("Creating backup before deleting disabled materials because we don't keep intermediate stages")
-				path = core.get_unused_file_name(input_filename_pmx[0:-4] + "_mat_backup.pmx")
-				pmxlib.write_pmx(path, pmx, moreinfo=moreinfo)
+				pipe.snapshot("mat_backup", "_mat_backup")
 		delete_invisible_faces(pmx, input_filename_pmx, write_model=write_model, moreinfo=moreinfo, opt=_opt)
 		if write_model: util.copy_file(path, input_filename_pmx)
 	#-------------#
@@ -749,13 +761,15 @@ There are some additional steps that cannot be done by a script; They will be me
 		pmxTL.end(pmx, input_filename_pmx)
 		path = input_filename_pmx[0:-4] + "_translate.pmx"
 		util.copy_file(path, input_filename_pmx)
+		pipe.finish()
 		return ## Cleanup will remove all of the original Render anchors
 	section("General Cleanup")
 	## run [core] general cleanup
 	import model_overall_cleanup
-	model_overall_cleanup.__main(pmx, input_filename_pmx, moreinfo)
-	path = input_filename_pmx[0:-4] + "_better.pmx"
-	util.copy_file(path, input_filename_pmx)
+	model_overall_cleanup.__main(pmx, input_filename_pmx, moreinfo, make_extra_file=write_model)
+	if write_model:
+		path = input_filename_pmx[0:-4] + "_better.pmx"
+		util.copy_file(path, input_filename_pmx)
 	section("Final Cleanup over the whole model")
 	#-- Do some post-processing cleanup
 	_opt = { "fullClean": all_yes if all_yes else None }
@@ -770,8 +784,14 @@ There are some additional steps that cannot be done by a script; They will be me
 		sort_bones_into_frames(pmx)
 	except KeyboardInterrupt as ki: print(ki)
 	
-	path = end(pmx, input_filename_pmx, "_better2", "Cleaned up Physics")
-	util.copy_file(path, input_filename_pmx)
+	if write_model:
+		path = end(pmx, input_filename_pmx, "_better2", "Cleaned up Physics")
+		util.copy_file(path, input_filename_pmx)
+		pipe.finish()
+	else:
+		## Everything so far only happened in memory, so this is the one and only full write
+		end(None, input_filename_pmx, "_better2", "Cleaned up Physics")
+		pipe.finish(input_filename_pmx)
 	#-------------#
 	if has_univrm: return ## Never makes sense in this mode
 	if not speed_yes:
@@ -1297,6 +1317,74 @@ Note: Unless there is an explicit need to keep them separate, Step [3] and [5] c
 	log_line = [f"Cut along '{vert_file}'",f"Added two morphs '{oldName}' and '{newName}'"]
 	end(pmx, input_filename_pmx, "_cut", log_line)
 
+def _vertex_uvs(pmx, vert_idx):
+	""" (N, 2) array of the UV of each vertex in [vert_idx] """
+	import numpy as np
+	if isinstance(pmx.verts, pmxstruct.PmxVertexStore): return pmx.verts.uv[vert_idx]
+	return np.array([pmx.verts[i].uv for i in vert_idx], dtype=np.float64).reshape(-1, 2)
+
+def _uv_to_pixels(uv, w, h):
+	"""
+	(N, 2) array of the pixel [row, column] that each UV of [uv] lands on in a texture of [w] x [h].
+	UV can be bigger than 1, but this only repeats the texture inbetween.
+	"""
+	import numpy as np
+	rows = np.floor(h * np.mod(uv[:, 1], 1)).astype(np.int64)
+	cols = np.floor(w * np.mod(uv[:, 0], 1)).astype(np.int64)
+	## A tiny negative UV can wrap around to exactly 1
+	return np.stack([np.minimum(rows, h - 1), np.minimum(cols, w - 1)], axis=1)
+
+def _edge_has_alpha(alpha, vA, vB):
+	"""
+	For each edge from pixel vA[k] to vB[k]: True if its center or the center of either half is not fully transparent.
+	Centers are rounded down like [util.arrAvg(vA, vB, True)].
+	"""
+	coord  = (vA + vB) // 2
+	coordA = (vA + coord) // 2
+	coordB = (coord + vB) // 2
+	return (alpha[coord[:, 0], coord[:, 1]] != 0) | (alpha[coordA[:, 0], coordA[:, 1]] != 0) | (alpha[coordB[:, 0], coordB[:, 1]] != 0)
+
+def _scan_texture_alpha(pmx, face_arr, offsets, textures):
+	"""
+	Checks which vertices of each material land on a fully transparent pixel of its texture.
+	Every texture is decoded only once (see [util.get_texture_alpha]), and they are all handled at the same time.
+	:param face_arr [np.ndarray] (F, 3) All faces
+	:param offsets  [np.ndarray] Face range of each material, see [kkindex.get_material_offsets]
+	:param textures [dict]       { path: [mat_idx, ...] }
+	Returns: dict { mat_idx: scan } -- with [scan] being
+	-- OSError  :: The texture could not be read
+	-- None     :: The texture has no alpha channel
+	-- dict     :: { verts: sorted vertex indices, pixels: (N, 2) [row, column] of each, transparent: np.ndarray[bool] }
+	"""
+	import numpy as np
+	from concurrent.futures import ThreadPoolExecutor
+	if len(textures) == 0: return {}
+	uvs = _vertex_uvs(pmx, np.arange(len(pmx.verts)))
+	def scan(path, mats):
+		try: alpha = util.get_texture_alpha(path)
+		except OSError as err: return { mat_idx: err for mat_idx in mats }
+		if alpha is None: return { mat_idx: None for mat_idx in mats }
+		(h, w) = alpha.shape
+		result = {}
+		for mat_idx in mats:
+			verts = np.unique(face_arr[offsets[mat_idx]:offsets[mat_idx + 1]])
+			pixels = _uv_to_pixels(uvs[verts], w, h)
+			result[mat_idx] = { "verts": verts, "pixels": pixels, "transparent": alpha[pixels[:, 0], pixels[:, 1]] == 0 }
+		return result
+	## cv2 and numpy let go of the GIL while decoding / sampling, so threads are enough
+	scans = {}
+	with ThreadPoolExecutor(max_workers=min(len(textures), INVISIBLE_SCAN_WORKERS or os.cpu_count() or 1)) as pool:
+		for result in pool.map(scan, textures.keys(), textures.values()): scans.update(result)
+	return scans
+
+def _faces_within(pmx, face_arr, alive, vert_arr):
+	""" Indices of all faces in [alive] (of any material) that are fully defined by [vert_arr] """
+	import numpy as np
+	found = np.asarray(kkindex.get_face_index(pmx).faces_of_vertices(vert_arr), dtype=np.int64)
+	inside = np.zeros(max(len(pmx.verts), int(face_arr.max()) + 1), dtype=bool)
+	inside[vert_arr] = True
+	return found[alive[found] & inside[face_arr[found]].all(axis=1)]
+
 def delete_invisible_faces(pmx, input_filename_pmx, write_model=True, moreinfo=True, opt={}): ## [15]
 	"""
 Detects unused vertices and invisible faces and removes them accordingly, as well as associated VertexMorph entries.
@@ -1312,7 +1400,8 @@ If all faces of a given material are considered invisible, it will be ignored an
 
 [Logging]: Logs which materials have been skipped and which were too small
 """
-	import cv2, os, re
+	import os, re
+	import numpy as np
 	from _prune_invalid_faces import delete_faces
 	from _prune_unused_vertices import prune_unused_vertices
 	moreinfo = moreinfo or DEBUG
@@ -1341,21 +1430,36 @@ If all faces of a given material are considered invisible, it will be ignored an
 	breakin_name = '|'.join(["acs_m_necklace_"])
 	def get_uv(w,h,v): return [int(h * (v.uv[1] % 1)), int(w * (v.uv[0] % 1)), 3]
 	
+	## Nothing below changes the model until every material is decided, so all faces keep their index until then.
+	## -- Instead, deleted faces are only marked in [alive] and removed in one go at the end.
+	offsets = kkindex.get_material_offsets(pmx)
+	face_arr = np.array(pmx.faces, dtype=np.int64).reshape(-1, 3)
+	alive = np.ones(len(face_arr), dtype=bool)
+	def remaining_faces(mat_idx): return offsets[mat_idx] + np.flatnonzero(alive[offsets[mat_idx]:offsets[mat_idx + 1]])
+	
+#> Read all textures and check which vertices are transparent, for all materials at once
+	textures = {}
+	for mat_idx in materials:
+		tex_idx = pmx.materials[mat_idx].tex_idx
+		if tex_idx == -1 or tex_idx >= len(pmx.textures): continue
+		textures.setdefault(os.path.join(root, pmx.textures[tex_idx]), []).append(mat_idx)
+	scans = _scan_texture_alpha(pmx, face_arr, offsets, {path: mats for (path, mats) in textures.items() if os.path.exists(path)})
+	
 #> foreach in materials
 	for mat_idx in materials: ## Index because materials can have the same name, and find_mat will only return the first
 		mat = pmx.materials[mat_idx]
-		print(f"\n=== Scanning [{mat_idx:2}]({mat.faces_ct:5}) " + mat.name_jp)
+		old_faces = remaining_faces(mat_idx)
+		print(f"\n=== Scanning [{mat_idx:2}]({len(old_faces):5}) " + mat.name_jp)
 		isPrim = util.is_primmat(mat)
 		delME = False
 		
-		if mat.faces_ct == 0:
+		if len(old_faces) == 0:
 			print(f"> Material has no faces, skipping...")
 			continue
 		## Remove Bonelyfans, c_m_shadowcast if they have any vertices
 		if any([x in mat.name_jp for x in ["Bonelyfans", "shadowcast"]]):
 			print(f"> Deleting useless material...")
-			faces = from_material_get_faces(pmx, mat_idx, True, moreinfo=False)
-			delete_faces(pmx, faces);processed.append(mat_idx)
+			alive[old_faces] = False;processed.append(mat_idx)
 			changed = True
 			continue
 		
@@ -1370,7 +1474,7 @@ If all faces of a given material are considered invisible, it will be ignored an
 				if not mePIdx in processed:
 					print(f">[!] Skipping extras of previous skipped material...")
 					continue ## TODO: Add same list adjustment for Skipping as for Disabled
-				if (meBase.faces_ct == 0):
+				if (len(remaining_faces(mePIdx)) == 0):
 					print(f">[!] Deleting extras of previous disabled material...")
 					delME = True
 			## Todo: Add "Skipping because base was skipped" using the [processed] list
@@ -1378,8 +1482,7 @@ If all faces of a given material are considered invisible, it will be ignored an
 		## If deleting disabled materials, do them here too
 		if delDisp and (util.isDisabled(mat) or delME):
 			if not delME: print(f">[!] Deleting disabled material...")
-			faces = from_material_get_faces(pmx, mat_idx, True, moreinfo=False)
-			delete_faces(pmx, faces);processed.append(mat_idx)
+			alive[old_faces] = False;processed.append(mat_idx)
 			if not delME: disabled.append(mat_idx) ## Change "Disabled" Entry to be a range
 			else: disabled[-1] = re.sub(r"(\d+)(-\d+)?", f"$1-{mat_idx}", f"{disabled[-1]}")
 			changed = True
@@ -1403,53 +1506,33 @@ If all faces of a given material are considered invisible, it will be ignored an
 		isCareful = isCareful or isPrim or isFragile
 		recCareful = False
 		## Everything is filtered now
-		img = None
-		if util.is_ascii(path): img = cv2.imread(path, cv2.IMREAD_UNCHANGED)
-		if img is None:
-			try:
-				from numpy import fromfile, uint8
-				img = cv2.imdecode(fromfile(path, dtype=uint8), cv2.IMREAD_UNCHANGED)
-			except Exception as err2:
-				print(err2)
-		if img is None:
+		scan = scans[mat_idx]
+		if isinstance(scan, OSError):
+			print(scan)
 			print("Unable to read Texture, please fix")
 			continue
 		
-		if img.shape[2] < 4:
+		if scan is None:
 			if isPrim: print(f"> Primitive mesh without alpha layer, ignored")
 			else: print("> Texture has no alpha, cannot determine invisibility")
 			continue
-	#>	get width / height
-		w = img.shape[:2][1]
-		h = img.shape[:2][0]
 	#>	vertices = get_vertices_for_material
-		old_faces = from_material_get_faces(pmx, mat_idx, False, moreinfo=False)
 		if len(old_faces) < 50:
 			if isPrim: print(f"> Skipping because 2D image mesh")
 			else: print(f"> Face count too small, no need to reduce (also could cut away too much). Skipped")
 			small.append(mat_idx)
 			continue
 		
-		vert_idx = from_faces_get_vertices(pmx, old_faces, True, moreinfo=moreinfo)
-		old_verts = [pmx.verts[vert] for vert in vert_idx]
-		new_verts = []
-		vert_uv = {} ## Store UV for use in careful calc
-	#>	foreach in vertices
-		from math import floor
-		for idx,vert in enumerate(old_verts):
-		#>	coord = (w * UV.x, h * UV.y) -- UV can be bigger than 1, but this only repeats the texture inbetween
-			coord = [floor(h * (vert.uv[1] % 1)), floor(w * (vert.uv[0] % 1)), 3]
-			#print(f"[{vert_idx[idx]}] w:{w}, h:{h} -- UV.x: {w * vert.uv[0]}, UV.y: {h * vert.uv[1]}")
-		#>	if [img(coord).Alpha == 0]: add idx to list
-			if coord[0] == h: coord[0] -= 1
-			if coord[1] == w: coord[1] -= 1
-			if (img[coord[0], coord[1], coord[2]] == 0):
-				new_verts.append(vert_idx[idx])
-				vert_uv[vert_idx[idx]] = coord
+		if moreinfo: print("Faces({}) go from {} to {}".format(len(old_faces), face_arr[old_faces[0]].tolist(), face_arr[old_faces[-1]].tolist()))
+		## Only the vertices of the faces that are left -- always a subset of those that were scanned
+		vert_idx = np.unique(face_arr[old_faces])
+		found = np.searchsorted(scan["verts"], vert_idx)
+	#>	if [img(coord).Alpha == 0]: add idx to list
+		new_verts = vert_idx[scan["transparent"][found]]
 		#>	#if any in list:
 		if len(new_verts) > 0:
-			#>	Collect Faces that contain at least one of the vertices
-			faces = from_vertices_get_faces(pmx, new_verts, -1, True, full=True)
+			#>	Collect Faces that are fully defined by these vertices, in any material
+			faces = _faces_within(pmx, face_arr, alive, new_verts)
 			lenFaces = len(faces)
 			#> Bail out when none of them are connected
 			if lenFaces == 0: continue
@@ -1471,32 +1554,16 @@ If all faces of a given material are considered invisible, it will be ignored an
 			if abs(cnt) < 20: print(">* Less than 20 faces will remain of this material.")
 			### Special treatment for certain texture types
 			if isCareful:
-				new_faces = []
-				def avgCheck(vA, vB): return avgCheck1(vA, vB)
-				def avgCheck1(vA, vB):
-					coord = util.arrAvg(vA, vB, True)
-					coordA = util.arrAvg(vA, coord, True)
-					coordB = util.arrAvg(coord, vB, True)
-					#print(coord)
-					_flag = img[coord[0], coord[1], coord[2]] != 0
-					_flag |= img[coordA[0], coordA[1], coordA[2]] != 0
-					_flag |= img[coordB[0], coordB[1], coordB[2]] != 0
-					return _flag
-				def avgCheck2(vA, vB):
-					coord = util.arrAvg(vA, vB, True)
-					coordA = util.arrAvg(vA, coord, True)
-					coordB = util.arrAvg(coord, vB, True)
-					return avgCheck1(coord, coordA) and avgCheck1(coordA, coordB) and avgCheck1(coordB, coord)
-					
 				if not recCareful:
 					if isFragile: print(f"> Delicate texture detected, doing detailed search on all {len(faces) * 3} edges.")
 					else: print(f"> Slot with careful texture, doing detailed search on all {len(faces) * 3} edges.")
-				for face_idx in faces:
-					face = pmx.faces[face_idx]
-					# Fetch the UV to check the center of each
-					[v1,v2,v3] = [vert_uv[face[0]], vert_uv[face[1]], vert_uv[face[2]]]
-					if avgCheck(v1, v2) or avgCheck(v1, v3) or avgCheck(v2, v3): continue
-					new_faces.append(face_idx)
+				## Fetch the pixel of each corner to check the center of each edge -- all of them are in [new_verts]
+				alpha = util.get_texture_alpha(path)
+				corners = scan["pixels"][np.searchsorted(scan["verts"], face_arr[faces])]
+				keep = _edge_has_alpha(alpha, corners[:, 0], corners[:, 1])
+				keep |= _edge_has_alpha(alpha, corners[:, 0], corners[:, 2])
+				keep |= _edge_has_alpha(alpha, corners[:, 1], corners[:, 2])
+				new_faces = faces[~keep]
 				## Swap the list
 				if (len(faces) != len(new_faces)):
 					print(f">> Reduced delete count from {len(faces)} to {len(new_faces)}")
@@ -1504,10 +1571,11 @@ If all faces of a given material are considered invisible, it will be ignored an
 				#(Idea): Could additionally smooth it out <Add lonely "Keep Face", remove lonely "Remove Face">
 				faces = new_faces
 			else: print(f">>> Deleting {len(faces)}...")
-			#>	push list to **.delete_faces(pmx, faces)
-			delete_faces(pmx, faces);processed.append(mat_idx)
-			#>	call **.prune_unused_vertices(pmx, moreinfo)
+			#>	mark them for **.delete_faces(pmx, faces)
+			alive[faces] = False;processed.append(mat_idx)
 			changed = True
+#> Now actually delete everything in one go
+	if changed: delete_faces(pmx, np.flatnonzero(~alive).tolist())
 	log_line = []
 	if not changed: log_line += "> No changes detected."; print(log_line[-1])
 	else:
@@ -1548,13 +1616,8 @@ def from_material_get_bones(pmx, mat_idx, returnIdx=False):
 	print("Printing " + mat.name_jp)
 
 	### Find Faces
-	start = 0
-	if mat_idx != 0: ## calc start based of sum of (previous mat.faces_ct) + 1
-		for tmp in range(0, mat_idx):
-			start = start + pmx.materials[tmp].faces_ct
-	
-	stop = start + mat.faces_ct
-	faces = pmx.faces[start:stop]
+	area = kkindex.material_face_range(pmx, mat_idx)
+	faces = pmx.faces[area.start:area.stop]
 	
 	### Collect Vertex
 	vert_idx = list(set(core.flatten(faces))) ## Insert into set already discards dupe
@@ -1579,11 +1642,9 @@ def from_material_get_bones(pmx, mat_idx, returnIdx=False):
 	return [pmx.bones[bone] for bone in bone_idx]
 
 def from_material_get_faces(pmx, mat_idx, returnIdx=False, moreinfo=False):
-	start = 0
-	if mat_idx != 0: ## calc start based of sum of (previous mat.faces_ct) + 1
-		for tmp in range(0, mat_idx):
-			start = start + pmx.materials[tmp].faces_ct
-	stop = start + pmx.materials[mat_idx].faces_ct
+	area = kkindex.material_face_range(pmx, mat_idx)
+	start = area.start
+	stop = area.stop
 	if moreinfo: print(f"[{mat_idx}]: Contains {pmx.materials[mat_idx].faces_ct} faces: {start} -> {stop}")
 	if returnIdx: return range(start, stop)
 	return pmx.faces[start:stop]
@@ -1650,14 +1711,14 @@ def from_vertices_get_faces(pmx, vert_arr, mat_idx=-1, returnIdx=False, debug=No
 			print("Affected Vertices: {}...{} (total: {})".format(vert_arr[:5], vert_arr[-5:], len(vert_arr)))
 		else: print("Affected Vertices: " + str(vert_arr))
 	#else: print("Affected Vertices(Len): " + str(len(vert_arr)))
-	if mat_idx < 0: area = enumerate(pmx.faces)
-	else:
-		area = from_material_get_faces(pmx, mat_idx, returnIdx=True)
-		area = list(enumerate(pmx.faces))[slice(area[0], area[-1])]
+	## Only look at faces that touch [vert_arr] at all, instead of scanning every face of the model
+	vert_set = set(vert_arr)
+	area = kkindex.get_face_index(pmx).faces_of_vertices(vert_set, mat_idx)
 
-	for idx, face in area:
+	for idx in area:
+		face = pmx.faces[idx]
 		## Check if there is an overlap between [face] and [vert_arr]
-		tmp = [i for i in face if i in vert_arr]
+		tmp = [i for i in face if i in vert_set]
 		if len(tmp) == 0: continue
 		#arr = [i in vert_arr for i in face]		#print(f"{tmp} vs {arr}")		#if not any(arr): continue
 
@@ -1667,7 +1728,7 @@ def from_vertices_get_faces(pmx, vert_arr, mat_idx=-1, returnIdx=False, debug=No
 		#** If cutting on a line, only two vertices will ever be affected, so always an free one.
 		#** For overlap calc, there is always at least one affected, so there could be 2, 1, or 0 free ones.
 		
-		tmp = [i for i in face if i not in vert_arr]
+		tmp = [i for i in face if i not in vert_set]
 		if    trace:   faces[idx] = face ## Always add the face
 		elif  point:   faces[idx] = [ pmx.verts[face[0]], pmx.verts[face[1]], pmx.verts[face[2]] ] ## add it as arr of [PmxVertex]
 		elif  line:    faces[idx] = [ pmx.verts[x] for x in tmp ]
@@ -1780,13 +1841,8 @@ def move_weights_to_new_bone__loop(pmx,mat_idx,target_idx,parent):
 	newBone.has_translate = True
 	
 	### Find Faces
-	start = 0
-	if mat_idx != 0: ## calc start based of sum of (previous mat.faces_ct) + 1
-		for tmp in range(0,mat_idx):
-			start = start + pmx.materials[tmp].faces_ct
-	
-	stop = start + mat.faces_ct
-	faces = pmx.faces[start:stop]
+	area = kkindex.material_face_range(pmx, mat_idx)
+	faces = pmx.faces[area.start:area.stop]
 	
 	### Collect Vertex
 	vert_idx = list(set(core.flatten(faces))) ## Insert into set already discards dupe
@@ -1982,17 +2038,21 @@ def end(pmx, input_filename_pmx: str, suffix: str, log_line=None):
 	:param log_line           [str] : (default: None) If not None, will be appended to [editlog.log]
 	
 	Returns: The file path of the new file, or None if not changed.
+	-- With [END_WRITES_IN_BACKGROUND], the path is a [kkpipe.PendingPath]: A snapshot of [pmx] is taken right away,
+	---- and the file is written by a background thread. [util.copy_file] waits for it, [path.wait()] does as well.
 	"""
 	# write out
 	has_model = pmx is not None
 	if DEVDEBUG and (pmx is None and log_line is None): print("[!] Called end() without doing anything!")
 	print("----------------")
 	suffix = "" if suffix is None else str(suffix)
-	output_filename_pmx = input_filename_pmx[0:-4] + suffix + ".pmx"
-	if suffix and util.is_number(suffix[-1]) and os.path.exists(output_filename_pmx):
+	output_filename_pmx = os.path.abspath(input_filename_pmx[0:-4] + suffix + ".pmx")
+	## Files that are still being written in the background don't exist yet, but their names are taken already
+	taken = kkpipe.pending_paths()
+	if suffix and util.is_number(suffix[-1]) and (os.path.exists(output_filename_pmx) or kkpipe.is_pending(output_filename_pmx)):
 		arr = [output_filename_pmx[0:-4] + "_.pmx"]
-		output_filename_pmx = core.get_unused_file_name(arr[0], arr)
-	else: output_filename_pmx = core.get_unused_file_name(output_filename_pmx)
+		output_filename_pmx = core.get_unused_file_name(arr[0], arr + taken)
+	else: output_filename_pmx = core.get_unused_file_name(output_filename_pmx, taken)
 	if log_line:
 		paths = os.path.split(output_filename_pmx)
 		path = os.path.join(paths[0], "editlog.log")
@@ -2020,12 +2080,17 @@ def end(pmx, input_filename_pmx: str, suffix: str, log_line=None):
 				print(err)
 				print("-[end]------------------")
 	if has_model:
+		if END_WRITES_IN_BACKGROUND:
+			print(f"> Writing '{os.path.basename(output_filename_pmx)}' in the background...")
+			return kkpipe.write_in_background(pmx, output_filename_pmx, moreinfo=True)
 		pmxlib.write_pmx(output_filename_pmx, pmx, moreinfo=True)
 		return output_filename_pmx
 	return None
 
 
 if __name__ == '__main__':
+	## Must come first: In the frozen .exe, every worker process of a pool starts here again
+	multiprocessing.freeze_support()
 	print(f"Cazoo - {util.VERSION_DATE} - v.{util.VERSION_TAG}")
 	try:
 		if DEBUG or DEVDEBUG:
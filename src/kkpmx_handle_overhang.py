@@ -3,14 +3,17 @@
 #####################
 import re     ## re.sub
 import os     ## 
+import sys    ## sys.frozen
 import copy   ## copy.deepcopy
 import datetime
+import time
 import numpy as np
 
 try:
 	import nuthouse01_core as core
 	import nuthouse01_pmx_parser as pmxlib
 	import nuthouse01_pmx_struct as pmxstruct
+	import kkpmx_index as kkindex
 except ImportError as eee:
 	print(eee.__class__.__name__, eee)
 	print("ERROR: failed to import some of the necessary files, all my scripts must be together in the same folder!")
@@ -33,6 +36,9 @@ There are three options to define the coordinates of a bounding box. All vertice
 -- Full scan (== full box of target against full box of base)
 The smaller it is, the less calculations are performed and it will complete faster.
 
+-- Ray-cast scan: Shoots a short ray both ways along the normal of every vertex and looks which side the base surface is on
+---- Works for any direction, needs no bounding box, and is fast enough for full-body scans.
+
 [Output]: PMX file '[modelname]_cutScan.pmx'
 -- As opposed to usual, it will always count up instead of appending if '_cutScan' is already part of the filename
 
@@ -41,6 +47,9 @@ The smaller it is, the less calculations are performed and it will complete fast
 '''
 
 DEBUG = False          # Local debug
+RAY_MAX_DIST = 0.15    # Ray-cast scan: Ignore base surfaces further away than this (same limit as the nearest-neighbour scan)
+PARALLEL_SCAN_MIN_VERTS = 200000 # Scans testing at least this many vertices together run in a process pool
+SCAN_WORKERS = None    # Processes of that pool, None for one per CPU
 global_opt = { }       # Store argument info ## TODO: Switch to global_state of util
 OPT_MORE = "moreinfo"
 OPT_YES  = "all_yes"
@@ -63,9 +72,13 @@ def run(pmx, input_filename_pmx, moreinfo=False, _opt = {}):
 -- [1] Input manual bounding box (and cut out completely into new material) :: 1 material, 0 runs
 -- [2] Input manual bounding box (and scan against the base material)       :: 2 materials, 1 run
 -- [3] Full scan (Warning: this WILL take long depending on material size)  :: 2 materials, 1 run
+-- [4] Ray-cast scan along the vertex normals (any direction, no box needed) :: 2 materials, 1 run
 """
-	value = core.MY_GENERAL_INPUT_FUNC(lambda x: x in ['0','1','2','3'], message + " [0/1/2/3]?")
+	value = core.MY_GENERAL_INPUT_FUNC(lambda x: x in ['0','1','2','3','4'], message + " [0/1/2/3/4]?")
 	if value == "0": return run_kk_defaults(pmx, input_filename_pmx)
+	if value == "4":
+		__results = __run_raycast(pmx, moreinfo=moreinfo, options={ "affectPMX": True })
+		return __endCut(pmx, input_filename_pmx, __results)
 	#
 	#bounds = { "minY": 10.20, "maxZ": 0 }
 	bounds = { }
@@ -254,13 +267,16 @@ def run_kk_defaults(pmx, input_filename_pmx, _opt = {}):
 		results = cut_out_box_from_material(pmx, bounds, util.find_mat(pmx, body.name_jp))
 		#log_line.append(f"Isolated vertices of {body.name_jp} peaking through {outside.name_jp}")
 	else:
+		## Find everything first (both scans at once), then change the model in the same order as before
+		scans = [__prepare_scan(pmx, outside, new, bounds, options=options) for new in ([inside, body] if has_inside else [body])]
+		__detect_scans(pmx, scans)
 		if has_inside:
-			results = __run(pmx, outside, inside, bounds, options=options)
+			results = __apply_scan(pmx, scans[0], options)
 			log_line.append(f"Isolated vertices of {inside.name_jp} peaking through {outside.name_jp}")
 			log_line.append(results)
 			log_line.append("--------")
 			print("-------------------")
-		results = __run(pmx, outside, body, bounds, options=options)
+		results = __apply_scan(pmx, scans[-1], options)
 		log_line.append(f"Isolated vertices of {body.name_jp} peaking through {outside.name_jp}")
 	log_line.append(results)
 	return __endCut(pmx, input_filename_pmx, core.flatten(log_line))
@@ -271,7 +287,7 @@ def __run(pmx, base_mat=None, new_mat=None, new_bounds=None, moreinfo=False, opt
 	:param pmx      [Pmx]
 	:param base_mat [PmxMaterial] Protruded  Material (to calculate cut-worthyness)
 	:param new_mat  [PmxMaterial] Protruding Material (to cut off from)
-	
+
 	Options = {
 		"affectPMX":   False for simulation mode; default is True
 		"exceed":      Array of int (1 to 6) -- directions that ignore the bounding box
@@ -280,37 +296,42 @@ def __run(pmx, base_mat=None, new_mat=None, new_bounds=None, moreinfo=False, opt
 		"initial_hidden": When generating a new material, set True to hide it initially, else false.
 	}
 	The morph has to be added to the [Facial] frame manually for the time being.
+	-- Same as [__prepare_scan] + [__detect_scans] + [__apply_scan] for a single scan
 	"""
-	from kkpmx_core import ask_for_material, from_faces_get_vertices, from_material_get_faces, from_vertices_get_faces
-	from kkpmx_utils import find_mat, translate_name
-	import kkpmx_core as kklib
 	global_opt["moreinfo"] = _verbose() or moreinfo or DEBUG
-	
-	affectPMX = options.get("affectPMX", True)
-	##################################
-	import numpy as np
+	scan = __prepare_scan(pmx, base_mat, new_mat, new_bounds, moreinfo, options)
+	__detect_scans(pmx, [scan], moreinfo)
+	return __apply_scan(pmx, scan, options)
+
+def __prepare_scan(pmx, base_mat=None, new_mat=None, new_bounds=None, moreinfo=False, options={}):
+	"""
+	Asks for everything that is missing and calculates the bounding box of one scan, without touching the model.
+	Arguments are the same as for [__run].
+	Returns: dict { base_mat, new_mat, base_idx, new_idx, bounds } -- [__detect_scans] adds the results to it.
+	"""
+	from kkpmx_core import ask_for_material, from_faces_get_vertices, from_material_get_faces
+	from kkpmx_utils import find_mat
 	import kkpmx_utils as util
-	
-	
+	affectPMX = options.get("affectPMX", True)
+
 	##  Get sub mat lists
 	if new_mat is None:
 		new_mat = ask_for_material(pmx, ": Material that causes the bleed-through", default="cf_m_body", returnIdx=False)
 	##  Get main mat
 	if base_mat is None:
 		base_mat = ask_for_material(pmx, ": Material that received the bleed-through", default="cf_m_top_inner06", returnIdx=False)
-	
+
 	##  Collect all verts
 	mat_idx   = find_mat(pmx, base_mat.name_jp)
 	old_faces = from_material_get_faces(pmx, mat_idx, False, moreinfo=False) ## Never print the line here
 	old_verts = from_faces_get_vertices(pmx, old_faces, False, moreinfo=moreinfo)
 	if DEBUG: print(f"[D]>: Faces: {len(old_faces)} \\ Vertex: {len(old_verts)}")
-	old_idx_verts  = from_faces_get_vertices(pmx, old_faces, True, moreinfo=False)
 	bounds = get_bounding_box(pmx, base_mat, old_verts, moreinfo=moreinfo)
 	# Array in case I change it to allow multiple
 	if "exceed" not in options:
 		exceed = [ util.ask_direction("Any Direction to exceed/ignore bounds", allow_empty=True) ]
 	else: exceed = options.get("exceed", [])
-	
+
 	def formatBox(box): print(f"[ {box[0]:19.15f}, {box[1]:19.15f}, {box[2]:19.15f}]")
 	print("-- Bounding Box (X / Y / Z) of " + base_mat.name_jp)
 	formatBox(bounds[0])
@@ -354,151 +375,235 @@ def __run(pmx, base_mat=None, new_mat=None, new_bounds=None, moreinfo=False, opt
 		new_mat = pmx.materials[mat_idx2]
 	else:
 		mat_idx2 = find_mat(pmx, new_mat.name_jp)
-	
-	##  Their verts
-	faces = from_material_get_faces(pmx, mat_idx2, False)
-	new_verts = from_faces_get_vertices(pmx, faces, False)
-	idx_verts = from_faces_get_vertices(pmx, faces, True)  ## So that the mapping matches later on.
-	##  >> Filter out outside bounds
-	#print("----[Important] This will only calculate surface cuts within the bounding box of (minX,minY) to (maxX,maxY) of the base material.")## verify
-	#print("----[Important] >>> That means, it will find all surface cuts going along the Z-Axis, but may not work for X or Y Axis.")
-	#print("----[Stage] Filter out all vertices that are outside of the base mat ")
-	def filterer(v):# Note: used in Parsing loop instead
-		minX = v.pos[0] < bounds[0][0]
-		maxX = v.pos[0] > bounds[1][0]
-		minY = v.pos[1] < bounds[0][1]
-		maxY = v.pos[1] > bounds[1][1]
-		minZ = v.pos[2] < bounds[0][2]
-		maxZ = v.pos[2] > bounds[1][2]
-		return not(minX or minY or minZ or maxX or maxY or maxZ)
-	#verts = new_verts#list(filter(filterer, new_verts))
 
 	print(f">Searching for peaking vertices of '{new_mat.name_jp}' going through the surface of '{base_mat.name_jp}'")
 	if DEBUG: print(f">> Stats: moreinfo={moreinfo}, affectPMX={affectPMX}")
+	return { "base_mat": base_mat, "new_mat": new_mat, "base_idx": mat_idx, "new_idx": mat_idx2, "bounds": bounds }
 
-	print("\n----[Stage] Split the materials at the Z-Axis ")
+def __detect_scans(pmx, scans, moreinfo=False):
+	"""
+	Finds the peaking vertices of every scan from [__prepare_scan], without changing the model.
+	Both sides of all scans are independent, so they run at the same time (see [_run_scan_jobs]).
+	Adds to each scan:
+	- found      :: list[int] -- Vertices peaking through, positive X side first
+	- total      :: Amount of vertices in the protruding material
+	- no_overlap :: True if neither side had anything to compare against
+	"""
 	##** Split at Z Axis (X+ vs X-) :: Fixes X-Axis so that only one axis[Z] can be anything
-	def filterPos(v): return v.pos[0] > 0
-	def filterNeg(v): return v.pos[0] < 0
-	old_pos = list(filter(filterPos, old_verts))
-	old_neg = list(filter(filterNeg, old_verts))
-	new_pos = list(filter(filterPos, new_verts))
-	new_neg = list(filter(filterNeg, new_verts))
-	if DEBUG: print(f"[D]> Old: {len(old_pos)}+{len(old_neg)}, New: {len(new_pos)}+{len(new_neg)}")
-	
-	##** Rebuild mapping back
-	def remapper(list_of_verts):
-		"""
-		IN: List of verts
-		OUT: List:
-			  [0]: dict of { idx from POS, idx from [IN] }
-			  [1]: dict of { idx from NEG, idx from [IN] }
-		"""
-		filter_map = [ ]
-		filter_map_pos = []
-		filter_map_neg = []
-		for (idx,v) in enumerate(list_of_verts):
-			if v.pos[0] > 0: filter_map_pos.append(idx)
-			else: filter_map_neg.append(idx)
-		tmp = range(len(filter_map_pos))
-		filter_map.append(dict(zip(tmp, filter_map_pos)))
-		tmp = range(len(filter_map_neg))
-		filter_map.append(dict(zip(tmp, filter_map_neg)))
-		return filter_map
-	filter_map_old = remapper(old_verts)
-	filter_map_new = remapper(new_verts)
-	####################
-	
-	print("----[Stage] Calculate nearest_neighbors")
-	###  For each Vert, find its closest match in the base
-	
-	that_dist = [[],[]]
-	that_dist[0], that_list_pos = nearest_neighbors_scipy_KTree(old_pos, new_pos)
-	that_dist[1], that_list_neg = nearest_neighbors_scipy_KTree(old_neg, new_neg)
-	
-	flag__usePos = len(that_list_pos) > 0
-	flag__useNeg = len(that_list_neg) > 0
-	## Stop if both are empty
-	if not(flag__usePos or flag__useNeg):
-		print(">> Unable to find any overlap between these two materials. Terminated scan.")
-		return [f"-- No overlap found between '{new_mat.name_jp}' and '{base_mat.name_jp}'"]
-	elif not(flag__usePos and flag__useNeg): ## Report if either is empty
-		__tmp = "Left/Positive" if flag__useNeg else "Right/Negative"
-		print(f">> {__tmp} side contains no overlap, so it will be ignored")
-	
-	###############
-
-	##*** Rebuild a mapping between both
-	print("----[Stage] Zip the respective nearest_neighbors together with the mapping indices")
-	mapping_map = [[],[]]
-	def connector(sign, idx, that, __old, __new):
-#		__old_veclen    =        old_map[sign][that[idx]]
-		__old_map_idx   = filter_map_old[sign][that[idx]]
-		__old_do_filter = __old               [that[idx]]
-#		__old_no_filter = old_verts           [__old_map_idx]
-		
-#		__new_veclen    =        new_map[sign]     [idx] -  that_dist[sign][idx]
-		__new_map_idx   = filter_map_new[sign]     [idx]
-		__new_do_filter = __new                    [idx]
-#		__new_no_filter = verts               [__new_map_idx]
-		
-		mapping_map[sign].append({
-			'dist': that_dist[sign][idx],
-			'old': { 'vert':__old_do_filter, 'idx': __old_map_idx },
-			'new': { 'vert':__new_do_filter, 'idx': __new_map_idx }
-		})
-	for i in range(0,len(that_list_pos)): connector(0, i, that_list_pos, old_pos, new_pos)
-	for i in range(0,len(that_list_neg)): connector(1, i, that_list_neg, old_neg, new_neg)
-	
-	#for vert in <above verts>:
-	##  :	Check if visible
-	##  :	if False: continue
-	##  :	If True: Add all faces that use this vertex as array into a list
-	##  
-	print("----[Stage] Find the faces that cut through the surface, or are connected to such.")
-	if DEBUG: print("--[Note]: These Numbers represent the vector distance between the choosen vertices.")
-	print("--[Note]: The status-% is only a full number if the hits are evenly dividable.")
-	print("--[Note]: Read as: (Progress)% Left/Right Side: TimeStamp -- found: X vertices in 'tested'.")
-	__results = []
-	that_verts_list = []
-	parts = 10
-	left_size = 0
-	def parsingMap(sign):
-		cnt = 0
-		__breaker = len(mapping_map[sign])/parts
-		breaker = int(__breaker)
-		rmd = len(mapping_map[sign]) - (breaker * parts)
-		print("----[Sub] Parsing {} X-Axis: {} = {} x {} + {}".format("positive" if sign == 0 else "negative", len(mapping_map[sign]), parts, breaker, rmd))
-		signText = "Left" if sign == 0 else "Right"
-		for vert in mapping_map[sign]:
-			idx     = vert['new']['idx']
-			old_idx = vert['old']['idx']
-			if DEBUG: print(vert['dist'])
-			cnt += 1
-			if cnt % breaker == 0:
-				dt = str(datetime.datetime.now())
-				print("---- {:7.2%} ({} side): ---- {} -- found: {} in {}".format((cnt / __breaker) / parts, signText, dt, len(that_verts_list) - left_size, cnt))
-			if not filterer(pmx.verts[idx_verts[idx]]): continue
-			#print(vert['dist'])
-			if vert['dist'] > 0.15: continue
-			
-			#print("'{}' < '{}': idx={} {}".format(vert['old']['veclen'], vert['new']['veclen'], idx, pmx.verts[idx_verts[idx]].pos))
-			#print("old vert: " + str(vert['old']['vert'].pos))
-			#print("new vert: " + str(vert['new']['vert'].pos))
-			
-			isHidden = __find_sign_against_plane(pmx, old_vert=old_idx_verts[old_idx], new_vert=idx_verts[idx], mat_idx=mat_idx, moreinfo=moreinfo)
-			if not isHidden:
-				#print(">>>> VertIdx={}".format(idx_verts[idx]))
-				that_verts_list.append(idx_verts[idx])
-
-	if flag__usePos: parsingMap(0);
-	left_size = len(that_verts_list);
-	if flag__useNeg: parsingMap(1);
-	
-	__results.append("-- Found {} of {} vertices peaking through the surface ".format(len(that_verts_list), len(new_verts)))
+	##** -- [1] is X > 0, [-1] is X < 0; Vertices exactly on X = 0 are in neither
+	print("\n----[Stage] Split the materials at the Z-Axis and find the faces that cut through the surface")
+	positions = kkindex.get_vertex_positions(pmx)
+	faces = np.array(pmx.faces, dtype=np.int64).reshape(-1, 3)
+	jobs = []
+	base_points = []
+	for (no, scan) in enumerate(scans):
+		rng = kkindex.material_face_range(pmx, scan["base_idx"])
+		new_points = kkindex.get_material_points(pmx, scan["new_idx"])
+		scan["total"] = len(new_points.verts)
+		for side in ScanJob.SIDES:
+			jobs.append(ScanJob(no, side, rng.start, rng.stop, new_points.verts[new_points.side_mask(side)], scan["bounds"]))
+			base_points.append(kkindex.get_material_points(pmx, scan["base_idx"]))
+
+	start = time.perf_counter()
+	results = _run_scan_jobs(jobs, positions, faces, base_points)
+	if moreinfo: print(f"--- Scanned {len(jobs)} sides in {time.perf_counter() - start:.2f}s")
+
+	for (no, scan) in enumerate(scans):
+		mine = [(job, res) for (job, res) in zip(jobs, results) if job.scan == no]
+		scan["found"] = [v for (_, res) in mine for v in res["found"].tolist()]
+		scan["no_overlap"] = all(res["tested"] == 0 for (_, res) in mine)
+		if scan["no_overlap"]:
+			print(">> Unable to find any overlap between '{}' and '{}'. Terminated scan.".format(scan["new_mat"].name_jp, scan["base_mat"].name_jp))
+			continue
+		for (job, res) in mine:
+			if res["tested"] == 0:
+				print(f">> {job.label()} side of '{scan['new_mat'].name_jp}' contains no overlap, so it will be ignored")
+				continue
+			print("----[Sub] {} side of '{}': found {} in {} of {} vertices".format(job.label(), scan["new_mat"].name_jp,
+				len(res["found"]), len(res["pairs"][0]), res["tested"]))
+		if moreinfo:
+			pairs = [(o, n) for (_, res) in mine for (o, n) in zip(res["pairs"][0].tolist(), res["pairs"][1].tolist())]
+			planes = FacePlanes.from_material(pmx, scan["base_idx"])
+			print_plane_timing(pmx, planes, pairs, sum(res["secs"] for (_, res) in mine), scan["base_idx"])
+	return scans
+
+def __apply_scan(pmx, scan, options={}):
+	""" Moves the vertices found by [__detect_scans] for one scan into their own material """
+	if scan["no_overlap"]:
+		return [f"-- No overlap found between '{scan['new_mat'].name_jp}' and '{scan['base_mat'].name_jp}'"]
+	__results = ["-- Found {} of {} vertices peaking through the surface ".format(len(scan["found"]), scan["total"])]
+	return move_verts_to_new_material(pmx, scan["new_mat"], scan["found"], __results, options)
+
+class ScanJob:
+	"""
+	One side of one scan, with everything [_scan_side] needs that is not in the shared arrays.
+	- scan        :: Position of the scan in the list given to [__detect_scans]
+	- side        :: 1 for X > 0, -1 for X < 0 (same as [kkindex.MaterialPoints.side_mask])
+	- start, stop :: Face range of the base material
+	- new_verts   :: Vertices of the protruding material on that side
+	- bounds      :: Bounding box, only vertices within are tested
+	"""
+	SIDES = (1, -1)
+	def __init__(self, scan, side, start, stop, new_verts, bounds, max_dist=0.15):
+		self.scan      = scan
+		self.side      = side
+		self.start     = start
+		self.stop      = stop
+		self.new_verts = np.asarray(new_verts, dtype=np.int64)
+		self.bounds    = np.asarray(bounds, dtype=np.float64)
+		self.max_dist  = max_dist
+	def label(self) -> str: return "Left/Positive" if self.side > 0 else "Right/Negative"
+
+def _scan_side(positions, faces, job, base_points=None, workers=-1):
+	"""
+	Nearest-neighbour + plane test for one [ScanJob]. Only reads [positions] & [faces], so it can run anywhere.
+	:param base_points [MaterialPoints] Cached points of the base material, else they are collected from [faces]
+	Returns: dict {
+		found  :: np.ndarray[int] -- Vertices of [job.new_verts] that poke through
+		pairs  :: (base vertex, new vertex) arrays of every candidate that was tested against the planes
+		tested :: How many vertices had a nearest neighbour at all
+		secs   :: Time spent in the plane test
+	}
+	"""
+	points = positions[job.new_verts]
+	if base_points is not None:
+		dist, old_idx = base_points.query(points, job.side, workers)
+	else:
+		from scipy.spatial import cKDTree
+		base_verts = np.unique(faces[job.start:job.stop])
+		base_pos = positions[base_verts]
+		keep = (base_pos[:, 0] > 0) if job.side > 0 else (base_pos[:, 0] < 0)
+		if keep.any() and len(points):
+			dist, found = cKDTree(base_pos[keep]).query(points, workers=workers)
+			old_idx = base_verts[keep][found]
+		else: dist, old_idx = (np.zeros(0), np.zeros(0, dtype=np.int64))
+	empty = np.zeros(0, dtype=np.int64)
+	if len(dist) == 0: return { "found": empty, "pairs": (empty, empty), "tested": 0, "secs": 0.0 }
+
+	inside = np.all((points >= job.bounds[0]) & (points <= job.bounds[1]), axis=1)
+	keep = inside & (dist <= job.max_dist)
+	old_idx, new_idx = old_idx[keep], job.new_verts[keep]
+	start = time.perf_counter()
+	planes = FacePlanes(positions, faces[job.start:job.stop], job.start)
+	hidden = planes.is_hidden(old_idx, new_idx)
+	return { "found": new_idx[~hidden], "pairs": (old_idx, new_idx), "tested": len(dist), "secs": time.perf_counter() - start }
+
+def _scan_side_shared(arrays, job):
+	## Runs in a worker process: [arrays] are (name, shape, dtype) of the shared memory blocks with positions & faces
+	from multiprocessing import shared_memory
+	blocks = [shared_memory.SharedMemory(name=name) for (name, _, _) in arrays]
+	try:
+		positions, faces = [np.ndarray(shape, dtype=dtype, buffer=shm.buf) for (shm, (_, shape, dtype)) in zip(blocks, arrays)]
+		result = _scan_side(positions, faces, job, workers=1)
+		del positions, faces ## The buffers can't be closed while arrays still point into them
+		return result
+	finally:
+		for shm in blocks: shm.close()
+
+def _run_scan_jobs(jobs, positions, faces, base_points):
+	"""
+	Runs [_scan_side] for all [jobs] and returns their results in the same order.
+	Small scans run right here (each already uses all cores for the KD-tree), but if they test at least
+	[PARALLEL_SCAN_MIN_VERTS] vertices together, all jobs run at once in a process pool.
+	[positions] and [faces] are copied once into shared memory, so the workers don't need a copy of the model.
+	-- Always runs inline in a frozen build (.exe), until the pool is known to work there.
+	"""
+	def inline(): return [_scan_side(positions, faces, job, points) for (job, points) in zip(jobs, base_points)]
+	if len(jobs) < 2 or sum(len(job.new_verts) for job in jobs) < PARALLEL_SCAN_MIN_VERTS: return inline()
+	if getattr(sys, "frozen", False): return inline()
+
+	from concurrent.futures import ProcessPoolExecutor
+	from multiprocessing import shared_memory
+	blocks = []
+	try:
+		arrays = []
+		for arr in (positions, faces):
+			arr = np.ascontiguousarray(arr)
+			shm = shared_memory.SharedMemory(create=True, size=max(1, arr.nbytes))
+			blocks.append(shm)
+			np.ndarray(arr.shape, dtype=arr.dtype, buffer=shm.buf)[...] = arr
+			arrays.append((shm.name, arr.shape, arr.dtype.str))
+		workers = min(len(jobs), SCAN_WORKERS or os.cpu_count() or 1)
+		print(f"--- Running {len(jobs)} scans in {workers} processes")
+		with ProcessPoolExecutor(max_workers=workers) as pool:
+			return list(pool.map(_scan_side_shared, [arrays] * len(jobs), jobs))
+	except (OSError, RuntimeError) as err: ## Also catches a broken pool
+		print(f"[!] Scanning in parallel failed ({err.__class__.__name__}: {err}), continuing in this process instead")
+		return inline()
+	finally:
+		for shm in blocks:
+			shm.close()
+			shm.unlink()
 
+def __run_raycast(pmx, base_mat=None, new_mat=None, moreinfo=False, options={}):
+	"""
+	Same as [__run], but finds the vertices with [find_bleed_through_raycast] instead,
+	so it needs neither a bounding box nor a preferred direction.
+	
+	:param pmx      [Pmx]
+	:param base_mat [PmxMaterial] Protruded  Material (to calculate cut-worthyness)
+	:param new_mat  [PmxMaterial] Protruding Material (to cut off from)
+	
+	Options = {
+		"max_dist":    Ignore base surfaces further away from a vertex than this; default is [RAY_MAX_DIST]
+		-- Everything else is passed on to [move_verts_to_new_material]
+	}
+	"""
+	from kkpmx_core import ask_for_material, from_faces_get_vertices, from_material_get_faces
+	from kkpmx_utils import find_mat
+	global_opt["moreinfo"] = _verbose() or moreinfo or DEBUG
+	
+	if new_mat is None:
+		new_mat = ask_for_material(pmx, ": Material that causes the bleed-through", default="cf_m_body", returnIdx=False)
+	if base_mat is None:
+		base_mat = ask_for_material(pmx, ": Material that received the bleed-through", default="cf_m_top_inner06", returnIdx=False)
+	base_idx = find_mat(pmx, base_mat.name_jp)
+	new_idx  = find_mat(pmx, new_mat.name_jp)
+	max_dist = options.get("max_dist", RAY_MAX_DIST)
+	
+	print(f">Searching for peaking vertices of '{new_mat.name_jp}' going through the surface of '{base_mat.name_jp}'")
+	new_verts = from_faces_get_vertices(pmx, from_material_get_faces(pmx, new_idx, False, moreinfo=False), True)
+	that_verts_list = find_bleed_through_raycast(pmx, base_idx, new_verts, max_dist=max_dist, moreinfo=moreinfo)
+	
+	__results = ["-- Found {} of {} vertices peaking through the surface (ray-cast, max. distance {})".format(
+		len(that_verts_list), len(new_verts), max_dist)]
 	return move_verts_to_new_material(pmx, new_mat, that_verts_list, __results, options)
 
+def find_bleed_through_raycast(pmx, base_idx, vert_arr, max_dist=RAY_MAX_DIST, moreinfo=False, chunk=20000):
+	"""
+	Finds all vertices in [vert_arr] that poke through the surface of the material [base_idx].
+	From each vertex, a ray goes [max_dist] forward and backward along its normal. If the closest hit on
+	the base material is behind the vertex, the surface it is supposed to be covered by is beneath it instead.
+	Vertices without any hit (e.g. hands sticking out of a sleeve) are not under the base material at all and are kept.
+	
+	:param base_idx [int]       Index of the base material
+	:param vert_arr [list[int]] Vertex indices to test, usually all vertices of one material
+	:param chunk    [int]       How many rays are traced per batch
+	Returns: list[int] -- The subset of [vert_arr] that pokes through, in the same order
+	"""
+	start = time.perf_counter()
+	bvh = TriangleBVH.from_material(pmx, base_idx)
+	if moreinfo: print(f"----[Stage] Built BVH over {len(bvh.tri_order)} faces with {len(bvh.left)} nodes in {time.perf_counter() - start:.2f}s")
+	vert_arr = list(vert_arr)
+	if len(vert_arr) == 0 or len(bvh.tri_order) == 0: return []
+	origins = np.array([pmx.verts[i].pos for i in vert_arr], dtype=np.float64).reshape(-1, 3)
+	normals = np.array([pmx.verts[i].norm for i in vert_arr], dtype=np.float64).reshape(-1, 3)
+	length = np.linalg.norm(normals, axis=1)
+	usable = length > 1e-12 ## Vertices without a normal can't be tested
+	normals[usable] /= length[usable, None]
+	
+	poking = np.zeros(len(vert_arr), dtype=bool)
+	print(f"----[Stage] Cast {len(vert_arr)} rays against '{pmx.materials[base_idx].name_jp}'")
+	for first in range(0, len(vert_arr), chunk):
+		sl = slice(first, first + chunk)
+		hit = bvh.closest_hit(origins[sl], normals[sl], max_dist)
+		## Behind the vertex == the surface is below the skin; 0 means the vertex lies on the surface itself
+		poking[sl] = usable[sl] & (hit < -1e-7)
+		done = min(first + chunk, len(vert_arr))
+		print("---- {:7.2%}: ---- {} -- found: {} in {}".format(done / len(vert_arr), datetime.datetime.now(), int(poking[:done].sum()), done))
+	if moreinfo: print(f"--- Ray-cast done in {time.perf_counter() - start:.2f}s")
+	return [v for (v, p) in zip(vert_arr, poking.tolist()) if p]
+
 def move_verts_to_new_material(pmx, old_mat, that_verts_list, __results, options={}): ## Moves vertices & creates/extends the material
 	"""
 	:param pmx             [Pmx]
@@ -590,8 +695,7 @@ def move_verts_to_new_material(pmx, old_mat, that_verts_list, __results, options
 			pmx.faces += list(that_faces_list.values())
 		## When reusing the mat, we need to insert the faces at the correct position
 		else:
-			xx = [m.faces_ct for m in pmx.materials[:value]]
-			insert_idx = sum(xx, pmx.materials[value].faces_ct) ## int of last index
+			insert_idx = kkindex.material_face_start(pmx, value + 1) ## int of last index
 			pmx.faces = pmx.faces[:insert_idx] + list(that_faces_list.values()) + pmx.faces[insert_idx:]
 		
 	##  Refresh target.faces_ct
@@ -763,17 +867,18 @@ def nearest_neighbors_scipy_KTree(__data, __sample, doPrint=False):
 	"""
 	Both arguments are 'List[PmxVertex]'
 	Return: Tuple[np.ndarray[np.float64], np.ndarray[numpy.int64]]
+	-- For whole materials, [kkindex.get_material_points] keeps the tree around instead of building it each time.
 	"""
 	import numpy as np
-	from scipy.spatial import KDTree
+	from scipy.spatial import cKDTree
 	if len(__data) == 0 or len(__sample) == 0: return ([], [])
 	
 	limit = 5
-	data = list(map(lambda v: v.pos, __data))     ## Base
-	sample = list(map(lambda v: v.pos, __sample)) ## Find nearest_neighbor in base
+	data = np.array([v.pos for v in __data], dtype=np.float64)     ## Base
+	sample = np.array([v.pos for v in __sample], dtype=np.float64) ## Find nearest_neighbor in base
 	
-	kdtree = KDTree(data)
-	dist, points = kdtree.query(sample) ## k=2 gives the best 2 neighbours for [sample]
+	kdtree = cKDTree(data)
+	dist, points = kdtree.query(sample, workers=-1) ## k=2 gives the best 2 neighbours for [sample]
 	if doPrint:
 		zipped = list(zip(dist,points))
 		print("---- Org")
@@ -784,12 +889,239 @@ def nearest_neighbors_scipy_KTree(__data, __sample, doPrint=False):
 		print("\n".join([str(i) for i in zipped[0:limit]]))
 	return (dist, points)
 
+## https://stackoverflow.com/questions/15688232/check-which-side-of-a-plane-points-are-on
+class FacePlanes:
+	"""
+	The planes of all faces of one material as numpy arrays, to test many points against them at once.
+	- normals[i] :: cross(p1 - p0, p2 - p0) of face [start + i] -- Same orientation as sympy.Plane(p0, p1, p2)
+	- origins[i] :: p0 of that face
+	- offsets[i] :: normals[i] . origins[i], so that a point [q] is in front of the face if (n . q) > offset
+	- vf_faces[vf_start[v] .. vf_start[v+1]] :: Faces of this material that use vertex [v] (same as [kkindex.FaceIndex])
+	"""
+	## sympy calculates exactly, so a point lying on the plane (e.g. a corner of the face) gives 0 there,
+	## but float rounding leaves a tiny value. Treat everything closer than this (as sin of the angle) as on the plane.
+	EPSILON = 1e-9
+	def __init__(self, positions, faces, start=0):
+		"""
+		:param positions [np.ndarray] (V, 3) Positions of all vertices
+		:param faces     [np.ndarray] (F, 3) Faces of the material
+		:param start     [int]        Index of its first face in [pmx.faces]
+		"""
+		faces = np.asarray(faces, dtype=np.int64).reshape(-1, 3)
+		self.positions = positions
+		self.start = start
+		self.stop  = start + len(faces)
+		corners = positions[faces]
+		self.origins = corners[:, 0]
+		self.normals = np.cross(corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0])
+		self.offsets = np.einsum("ij,ij->i", self.normals, self.origins)
+		flat = faces.ravel()
+		## Stable sort keeps the faces of each vertex in ascending order
+		self.vf_faces = np.argsort(flat, kind="stable") // 3 + start
+		self.vf_start = np.zeros(len(positions) + 1, dtype=np.int64)
+		np.cumsum(np.bincount(flat, minlength=len(positions))[:len(positions)], out=self.vf_start[1:])
+	
+	@staticmethod
+	def from_material(pmx, mat_idx):
+		rng = kkindex.material_face_range(pmx, mat_idx)
+		faces = np.array(pmx.faces[rng.start:rng.stop], dtype=np.int64).reshape(-1, 3)
+		return FacePlanes(kkindex.get_vertex_positions(pmx), faces, rng.start)
+	
+	def faces_around(self, verts):
+		"""
+		All faces of the material that contain any of [verts], as two flat arrays of equal length
+		- [0] :: Position in [verts] that the face belongs to
+		- [1] :: Face index (absolute)
+		"""
+		verts = np.asarray(verts, dtype=np.int64)
+		starts = self.vf_start[verts]
+		lens = self.vf_start[verts + 1] - starts
+		owner = np.repeat(np.arange(len(verts)), lens)
+		## Concatenate all slices [start, start+len) without a python loop
+		offsets = np.repeat(starts - np.concatenate(([0], np.cumsum(lens)[:-1])), lens)
+		return owner, self.vf_faces[np.arange(int(lens.sum())) + offsets]
+	
+	def is_hidden(self, old_verts, new_verts):
+		"""
+		For each pair (old_verts[k], new_verts[k]): True if the vertex [new_verts[k]] is not in front of
+		any face around [old_verts[k]], so it does not poke through. Same answer as [__find_sign_against_plane].
+		Returns: np.ndarray[bool]
+		"""
+		if len(old_verts) == 0: return np.zeros(0, dtype=bool)
+		points = self.positions[np.asarray(new_verts, dtype=np.int64)]
+		owner, found = self.faces_around(old_verts)
+		local = found - self.start
+		## Same as sympy's Plane.equation(): n . (q - p0), which keeps more precision than (n . q) - offset
+		normals = self.normals[local]
+		delta   = points[owner] - self.origins[local]
+		side = np.einsum("ij,ij->i", normals, delta)
+		limit = self.EPSILON * np.linalg.norm(normals, axis=1) * np.linalg.norm(delta, axis=1)
+		visible = np.bincount(owner[side > limit], minlength=len(old_verts)) > 0
+		return ~visible
+
+class TriangleBVH:
+	"""
+	Bounding volume hierarchy over a set of triangles, traced with many rays at once.
+	Nodes are stored as flat arrays; [left] is -1 for leaves, which own tri_order[start : start + count].
+	- bmin, bmax   :: Corners of the box of each node
+	- left, right  :: Child node indices
+	- v0, e1, e2   :: First corner & both edges of each triangle, in [tri_order]
+	"""
+	LEAF_SIZE = 8
+	EDGE_EPSILON = 1e-9
+	
+	def __init__(self, corners, face_indices=None):
+		"""
+		:param corners      [np.ndarray] (N, 3, 3) -- Three corners of each triangle
+		:param face_indices [np.ndarray] (N,)      -- Face index of each triangle, only used for [tri_order]
+		"""
+		corners = np.asarray(corners, dtype=np.float64).reshape(-1, 3, 3)
+		count = len(corners)
+		if face_indices is None: face_indices = np.arange(count)
+		centers = corners.mean(axis=1)
+		tmin = corners.min(axis=1)
+		tmax = corners.max(axis=1)
+		order = np.arange(count)
+		bmin = []; bmax = []; left = []; right = []; start = []; size = []
+		## Iterative build, so deep trees can't hit the recursion limit: (node, first, last)
+		def new_node(lo, hi):
+			sub = order[lo:hi]
+			bmin.append(tmin[sub].min(axis=0) if hi > lo else np.zeros(3))
+			bmax.append(tmax[sub].max(axis=0) if hi > lo else np.zeros(3))
+			left.append(-1); right.append(-1); start.append(lo); size.append(hi - lo)
+			return len(left) - 1
+		stack = [(new_node(0, count), 0, count)]
+		while stack:
+			node, lo, hi = stack.pop()
+			if hi - lo <= self.LEAF_SIZE: continue
+			## Split at the median center along the longest side
+			sub = order[lo:hi]
+			axis = int(np.argmax(bmax[node] - bmin[node]))
+			mid = (hi - lo) // 2
+			part = np.argpartition(centers[sub, axis], mid)
+			order[lo:hi] = sub[part]
+			l = new_node(lo, lo + mid)
+			r = new_node(lo + mid, hi)
+			left[node] = l; right[node] = r
+			stack.append((l, lo, lo + mid))
+			stack.append((r, lo + mid, hi))
+		self.bmin  = np.array(bmin).reshape(-1, 3)
+		self.bmax  = np.array(bmax).reshape(-1, 3)
+		self.left  = np.array(left, dtype=np.int64)
+		self.right = np.array(right, dtype=np.int64)
+		self.start = np.array(start, dtype=np.int64)
+		self.count = np.array(size, dtype=np.int64)
+		self.tri_order = np.asarray(face_indices)[order]
+		ordered = corners[order]
+		self.v0 = ordered[:, 0]
+		self.e1 = ordered[:, 1] - ordered[:, 0]
+		self.e2 = ordered[:, 2] - ordered[:, 0]
+	
+	@staticmethod
+	def from_material(pmx, mat_idx):
+		""" BVH over all faces of one material """
+		rng = kkindex.material_face_range(pmx, mat_idx)
+		faces = np.array(pmx.faces[rng.start:rng.stop], dtype=np.int64).reshape(-1, 3)
+		used, local = np.unique(faces, return_inverse=True)
+		pos = np.array([pmx.verts[i].pos for i in used.tolist()], dtype=np.float64).reshape(-1, 3)
+		return TriangleBVH(pos[local.reshape(-1, 3)], np.arange(rng.start, rng.stop))
+	
+	def closest_hit(self, origins, directions, max_dist):
+		"""
+		Traces the segment [origin - max_dist * dir, origin + max_dist * dir] of every ray, all at once.
+		Returns: np.ndarray[float] -- Signed distance along [dir] to the closest hit, or NaN if nothing was hit
+		"""
+		origins = np.asarray(origins, dtype=np.float64).reshape(-1, 3)
+		directions = np.asarray(directions, dtype=np.float64).reshape(-1, 3)
+		best = np.full(len(origins), np.inf)  ## abs. distance of the closest hit so far
+		best_t = np.full(len(origins), np.nan)
+		if len(origins) == 0 or len(self.left) == 0: return best_t
+		## Zero components would give inf * 0 = NaN in the box test, so nudge them instead
+		safe = np.where(np.abs(directions) < 1e-12, 1e-12, directions)
+		inv = 1.0 / safe
+		## Breadth-first over (ray, node) pairs that are still worth looking at
+		rays = np.arange(len(origins))
+		nodes = np.zeros(len(origins), dtype=np.int64)
+		while len(rays):
+			t1 = (self.bmin[nodes] - origins[rays]) * inv[rays]
+			t2 = (self.bmax[nodes] - origins[rays]) * inv[rays]
+			near = np.minimum(t1, t2).max(axis=1)
+			far  = np.maximum(t1, t2).min(axis=1)
+			limit = np.minimum(best[rays], max_dist)
+			keep = (near <= far) & (far >= -limit) & (near <= limit)
+			rays = rays[keep]; nodes = nodes[keep]
+			leaf = self.left[nodes] < 0
+			if leaf.any(): self.__hit_leaves(rays[leaf], nodes[leaf], origins, directions, max_dist, best, best_t)
+			inner = ~leaf
+			rays  = np.concatenate((rays[inner], rays[inner]))
+			nodes = np.concatenate((self.left[nodes[inner]], self.right[nodes[inner]]))
+		return best_t
+	
+	def __hit_leaves(self, rays, nodes, origins, directions, max_dist, best, best_t):
+		## Expand every (ray, leaf) into (ray, triangle) and run Moeller-Trumbore on all of them
+		counts = self.count[nodes]
+		rays = np.repeat(rays, counts)
+		offsets = np.repeat(self.start[nodes] - np.concatenate(([0], np.cumsum(counts)[:-1])), counts)
+		tris = np.arange(int(counts.sum())) + offsets
+		d = directions[rays]
+		e1 = self.e1[tris]; e2 = self.e2[tris]
+		p = np.cross(d, e2)
+		det = np.einsum("ij,ij->i", e1, p)
+		valid = np.abs(det) > 1e-14
+		inv = np.zeros_like(det)
+		inv[valid] = 1.0 / det[valid]
+		s = origins[rays] - self.v0[tris]
+		u = np.einsum("ij,ij->i", s, p) * inv
+		q = np.cross(s, e1)
+		v = np.einsum("ij,ij->i", d, q) * inv
+		t = np.einsum("ij,ij->i", e2, q) * inv
+		## Small slack on the edges, so rays going exactly through a shared edge or corner can't slip through
+		eps = self.EDGE_EPSILON
+		hit = valid & (u >= -eps) & (v >= -eps) & (u + v <= 1 + eps) & (np.abs(t) <= max_dist)
+		if not hit.any(): return
+		rays = rays[hit]; t = t[hit]
+		## Keep only the closest hit per ray, then merge with what was found before
+		order = np.lexsort((np.abs(t), rays))
+		rays = rays[order]; t = t[order]
+		first = np.concatenate(([True], rays[1:] != rays[:-1]))
+		rays = rays[first]; t = t[first]
+		closer = np.abs(t) < best[rays]
+		best[rays[closer]] = np.abs(t[closer])
+		best_t[rays[closer]] = t[closer]
+
+def print_plane_timing(pmx, planes, pairs, numpy_secs, mat_idx, sample=10):
+	"""
+	Side-by-side timing of [FacePlanes.is_hidden] against the old per-vertex sympy test,
+	which is only run on the first [sample] pairs because it is that slow. Also checks that both agree.
+	"""
+	print("------\n> Plane test timing ({} vertices)".format(len(pairs)))
+	per_vert = (numpy_secs / len(pairs)) if pairs else 0
+	print(f"  numpy : {numpy_secs:8.3f}s total, {per_vert * 1000:8.4f}ms per vertex")
+	if not pairs: return
+	try: import sympy
+	except ImportError:
+		print("  sympy : (not installed, skipped)")
+		return
+	pairs = pairs[:sample]
+	start = time.perf_counter()
+	try: old = [__find_sign_against_plane(pmx, o, n, mat_idx, False) for (o, n) in pairs]
+	except ValueError as err: ## sympy refuses to build a plane from a degenerate face
+		print(f"  sympy : (failed: {err})")
+		return
+	sympy_secs = time.perf_counter() - start
+	new = planes.is_hidden([p[0] for p in pairs], [p[1] for p in pairs]).tolist()
+	diff = sum(1 for (a, b) in zip(old, new) if a != b)
+	per_vert_sympy = sympy_secs / len(pairs)
+	print(f"  sympy : {sympy_secs:8.3f}s for {len(pairs)}, {per_vert_sympy * 1000:8.4f}ms per vertex" +
+		(f" -- {per_vert_sympy / per_vert:.0f}x slower" if per_vert else ""))
+	print(f"  Different answers in sample: {diff}")
+
 ## https://docs.sympy.org/latest/modules/geometry/plane.html
 ## https://stackoverflow.com/questions/15688232/check-which-side-of-a-plane-points-are-on
-__plane_cache = {}
 def __find_sign_against_plane(pmx, old_vert, new_vert, mat_idx, moreinfo):
 	"""
 	Find all faces that contain [old_vert] and look if [new_vert] is in front of at least one of them.
+	-- Slow reference version of [FacePlanes.is_hidden], only used by [print_plane_timing] now.
 	"""
 	from kkpmx_core import from_vertices_get_faces
 	from sympy import Plane
@@ -797,13 +1129,8 @@ def __find_sign_against_plane(pmx, old_vert, new_vert, mat_idx, moreinfo):
 	if moreinfo: print("Find pos of {} against planes around {}".format(new_vert, old_vert))
 	faces = from_vertices_get_faces(pmx, vert_arr=[old_vert], mat_idx=mat_idx, returnIdx=False, debug=False, point=True)
 	
-	def getFromCache(face_idx):
-		if __plane_cache.__contains__(face_idx) == False:
-			face = faces[face_idx]
-			__plane_cache[face_idx] = Plane(tuple(face[0].pos), tuple(face[1].pos), tuple(face[2].pos))
-		return __plane_cache[face_idx]
-	for face in faces:
-		plane = getFromCache(face)
+	for face in faces.values():
+		plane = Plane(tuple(face[0].pos), tuple(face[1].pos), tuple(face[2].pos))
 		if plane.equation(x=new_point[0], y=new_point[1], z=new_point[2]) > 0:
 			if moreinfo: print(">> Point is on side B (visible)")
 			return False
@@ -0,0 +1,367 @@
+# Cazoo - 2026-10-18
+# This code is free to use, but I cannot be held responsible for damages that it may or may not cause.
+#####################
+### sys
+from bisect import insort
+from typing import List
+import numpy as np
+
+### Library -- Don't import any KKPMX files, so that every module (incl. kkpmx_utils) can use this
+import nuthouse01_core as core
+import nuthouse01_pmx_struct as pmxstruct
+###
+
+infotext = '''
+Lookup tables that are attached to a [Pmx] instance and rebuilt lazily.
+Every index remembers a cheap signature of the parts of the model it was built from,
+and is thrown away on the next request if that signature does not match anymore.
+
+-- If something edits the model in a way that keeps all counts the same (e.g. changing a face in-place),
+---- call [invalidate(pmx)] afterwards so that the next lookup starts fresh.
+-- Changes to [material.faces_ct] are always noticed (also by [get_face_index]), but reordering [pmx.materials] in-place is not.
+-- Moving vertices (assigning [vert.pos] or one of its items) is always noticed by [get_material_points] & [get_vertex_positions],
+---- but writing into the [PmxVertexStore.pos] array directly is not -- call [invalidate(pmx)] after that.
+-- Renaming anything is always noticed by [get_name_index], but rebuilds it -- use [rename_item] to update it in place instead.
+---- Swapping items of a named list (e.g. sorting [pmx.bones]) is only noticed if a found item lost its name.
+-- Changes to [bone.parent_idx] are always noticed by [get_bone_tree].
+'''
+
+## Attribute on the [Pmx] instance holding { name: (signature, index) }
+_CACHE_ATTR = "_kkpmx_index"
+
+class _IndexCache(dict):
+	## Copies & pickles of a model start out without any index (they would point at the original anyway)
+	def __reduce__(self): return (_IndexCache, ())
+
+def _get_cache(pmx) -> dict:
+	cache = getattr(pmx, _CACHE_ATTR, None)
+	if cache is None:
+		cache = _IndexCache()
+		setattr(pmx, _CACHE_ATTR, cache)
+	return cache
+
+def _get_or_build(pmx, name: str, signature, builder):
+	cache = _get_cache(pmx)
+	entry = cache.get(name)
+	if entry is not None and entry[0] == signature: return entry[1]
+	index = builder(pmx)
+	cache[name] = (signature, index)
+	return index
+
+def invalidate(pmx, name: str = None) -> None:
+	""" Drop the index [name] of this [pmx], or all of them if None """
+	cache = getattr(pmx, _CACHE_ATTR, None)
+	if cache is None: return
+	if name is None: cache.clear()
+	else: cache.pop(name, None)
+
+########################
+### Material Offsets ###
+########################
+
+def _build_material_offsets(pmx) -> np.ndarray:
+	counts = np.fromiter((m.faces_ct for m in pmx.materials), dtype=np.int64, count=len(pmx.materials))
+	offsets = np.zeros(len(counts) + 1, dtype=np.int64)
+	np.cumsum(counts, out=offsets[1:])
+	return offsets
+
+def _offsets_signature(pmx) -> tuple:
+	return (id(pmx.materials), len(pmx.materials), pmxstruct.get_faces_ct_version())
+
+def get_material_offsets(pmx) -> np.ndarray:
+	"""
+	Prefix sum over [faces_ct] of all materials, with one extra entry at the end.
+	- offsets[m] .. offsets[m+1] :: Range of face indices owned by material [m]
+	- offsets[-1]                :: Total amount of faces owned by any material
+	Checking if the cached table is still valid is O(1), so this is cheap to call in loops.
+	"""
+	return _get_or_build(pmx, "offsets", _offsets_signature(pmx), _build_material_offsets)
+
+def material_face_range(pmx, mat_idx: int) -> range:
+	""" Range of face indices owned by material [mat_idx] """
+	offsets = get_material_offsets(pmx)
+	return range(int(offsets[mat_idx]), int(offsets[mat_idx + 1]))
+
+def material_face_start(pmx, mat_idx: int) -> int:
+	""" Index of the first face of material [mat_idx], or the end of all faces if == len(pmx.materials) """
+	return int(get_material_offsets(pmx)[mat_idx])
+
+##################
+### Face Index ###
+##################
+
+class FaceIndex:
+	"""
+	CSR-style adjacency between faces and vertices.
+	- vf_faces[vf_start[v] .. vf_start[v+1]] :: Face indices that use vertex [v], ascending
+	Material ranges are taken from [get_material_offsets] so that they are never stale.
+	"""
+	def __init__(self, pmx):
+		self.pmx = pmx
+		faces = np.array(pmx.faces, dtype=np.int64).reshape(-1, 3)
+		flat = faces.ravel()
+		vert_ct = max(len(pmx.verts), int(flat.max()) + 1 if len(flat) else 0)
+		## Stable sort keeps the faces of each vertex in ascending order
+		order = np.argsort(flat, kind="stable")
+		self.vf_faces = order // 3
+		self.vf_start = np.zeros(vert_ct + 1, dtype=np.int64)
+		np.cumsum(np.bincount(flat, minlength=vert_ct), out=self.vf_start[1:])
+
+	def material_range(self, mat_idx: int) -> range:
+		return material_face_range(self.pmx, mat_idx)
+
+	def faces_of_vertices(self, vert_arr, mat_idx: int = -1) -> List[int]:
+		"""
+		Sorted unique list of face indices that contain at least one vertex of [vert_arr]
+		@param {mat_idx} Restrict to the faces of this material, negative for all
+		"""
+		verts = np.asarray(list(vert_arr), dtype=np.int64)
+		verts = verts[(verts >= 0) & (verts < len(self.vf_start) - 1)]
+		if len(verts) == 0: return []
+		starts = self.vf_start[verts]
+		lens = self.vf_start[verts + 1] - starts
+		total = int(lens.sum())
+		if total == 0: return []
+		## Concatenate all slices [start, start+len) without a python loop
+		offsets = np.repeat(starts - np.concatenate(([0], np.cumsum(lens)[:-1])), lens)
+		found = np.unique(self.vf_faces[np.arange(total) + offsets])
+		if mat_idx >= 0:
+			rng = self.material_range(mat_idx)
+			found = found[(found >= rng.start) & (found < rng.stop)]
+		return found.tolist()
+
+def _face_signature(pmx) -> tuple:
+	## Moving faces between materials keeps the list & its length (pop, then append), but always changes a faces_ct
+	return (id(pmx.faces), len(pmx.faces), len(pmx.verts), pmxstruct.get_faces_ct_version())
+
+def get_face_index(pmx) -> FaceIndex:
+	""" The [FaceIndex] of this model, rebuilt if faces or vertices changed since the last call """
+	return _get_or_build(pmx, "faces", _face_signature(pmx), FaceIndex)
+
+#######################
+### Vertex Positions ###
+#######################
+
+class VertexPositions:
+	"""
+	- pos :: np.ndarray (V, 3) -- Positions of all vertices, in order
+	A [PmxVertexStore] already has them as array, so that one is used directly.
+	"""
+	def __init__(self, pmx):
+		if isinstance(pmx.verts, pmxstruct.PmxVertexStore): self.pos = pmx.verts.pos
+		else: self.pos = np.array([v.pos for v in pmx.verts], dtype=np.float64).reshape(-1, 3)
+
+def _positions_signature(pmx) -> tuple:
+	return (id(pmx.verts), len(pmx.verts), pmxstruct.get_vert_pos_version())
+
+def get_vertex_positions(pmx) -> np.ndarray:
+	""" (V, 3) array of all vertex positions, rebuilt if vertices were added / removed or moved """
+	return _get_or_build(pmx, "positions", _positions_signature(pmx), VertexPositions).pos
+
+#######################
+### Material Points ###
+#######################
+
+class MaterialPoints:
+	"""
+	Positions of all vertices used by one material, with KD-trees over them that are built on first use.
+	- verts :: Vertex indices, sorted & unique (same as from_faces_get_vertices)
+	- pos   :: np.ndarray (N, 3) -- Their positions, in the same order
+	Trees exist for all points ([side=0]), or only those with X > 0 ([side=1]) or X < 0 ([side=-1]).
+	"""
+	def __init__(self, pmx, mat_idx: int):
+		rng = material_face_range(pmx, mat_idx)
+		faces = np.array(pmx.faces[rng.start:rng.stop], dtype=np.int64).reshape(-1, 3)
+		self.verts = np.unique(faces)
+		self.pos = np.array([pmx.verts[i].pos for i in self.verts.tolist()], dtype=np.float64).reshape(-1, 3)
+		self._trees = {}
+	
+	def side_mask(self, side: int = 0) -> np.ndarray:
+		""" Mask over [verts] for [side]: 0 = all, 1 = X > 0, -1 = X < 0 """
+		if side == 0: return np.ones(len(self.verts), dtype=bool)
+		return (self.pos[:, 0] > 0) if side > 0 else (self.pos[:, 0] < 0)
+	
+	def tree(self, side: int = 0):
+		""" [scipy.spatial.cKDTree] over the points of [side], and the indices into [verts] it was built from """
+		if side not in self._trees:
+			from scipy.spatial import cKDTree
+			local = np.flatnonzero(self.side_mask(side))
+			self._trees[side] = (cKDTree(self.pos[local]) if len(local) else None, local)
+		return self._trees[side]
+	
+	def query(self, points, side: int = 0, workers: int = -1):
+		"""
+		Nearest neighbour among the points of [side] for each of [points] (N, 3), searched in parallel.
+		Returns: (np.ndarray[float] distances, np.ndarray[int] vertex indices) -- both empty if [side] has no points
+		"""
+		tree, local = self.tree(side)
+		points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+		if tree is None or len(points) == 0: return (np.zeros(0), np.zeros(0, dtype=np.int64))
+		dist, found = tree.query(points, workers=workers)
+		return (dist, self.verts[local[found]])
+
+def get_material_points(pmx, mat_idx: int) -> MaterialPoints:
+	""" The [MaterialPoints] of material [mat_idx], rebuilt if its faces or any vertex changed """
+	signature = (_face_signature(pmx), _offsets_signature(pmx), _positions_signature(pmx))
+	return _get_or_build(pmx, "points:%d" % mat_idx, signature, lambda p: MaterialPoints(p, mat_idx))
+
+##################
+### Name Index ###
+##################
+
+## Lists of a [Pmx] that can be searched by name
+NAMED_LISTS = ["materials", "bones", "morphs", "frames", "rigidbodies", "joints"]
+
+class NameIndex:
+	"""
+	Index positions of all items in one named list of a model, by [.lower()] of their names.
+	- jp[name], en[name] :: Indices of all items with that name, ascending -- so duplicate names are kept
+	"""
+	def __init__(self, arr):
+		self.arr = arr
+		self.jp = {}
+		self.en = {}
+		for (i, item) in enumerate(arr):
+			self.jp.setdefault(item.name_jp.lower(), []).append(i)
+			self.en.setdefault(item.name_en.lower(), []).append(i)
+	
+	@staticmethod
+	def _first(bucket: List[int], start: int, stop: int):
+		for i in bucket:
+			if i >= stop: break
+			if i >= start: return i
+		return None
+	
+	def find(self, name: str, start: int = 0, stop: int = None):
+		"""
+		Index of the first item within [start, stop) whose JP name equals [name] (ignoring case),
+		otherwise the first one whose EN name does. None if there is neither.
+		"""
+		if stop is None: stop = len(self.arr)
+		key = name.lower()
+		i = self._first(self.jp.get(key, []), start, stop)
+		if i is None: i = self._first(self.en.get(key, []), start, stop)
+		return i
+	
+	def is_current_at(self, i: int, name: str) -> bool:
+		""" False if the item at [i] is not called [name] anymore, so the list must have been reordered """
+		item = self.arr[i]
+		key = name.lower()
+		return item.name_jp.lower() == key or item.name_en.lower() == key
+	
+	def move(self, i: int, old: tuple, new: tuple) -> None:
+		""" Item [i] was renamed from [old] to [new] -- both are (name_jp, name_en) """
+		for (names, prev, now) in [(self.jp, old[0], new[0]), (self.en, old[1], new[1])]:
+			(prev, now) = (prev.lower(), now.lower())
+			if prev == now: continue
+			bucket = names[prev]
+			bucket.remove(i)
+			if not bucket: del names[prev]
+			insort(names.setdefault(now, []), i)
+
+def _names_signature(pmx, attr: str) -> tuple:
+	arr = getattr(pmx, attr)
+	return (id(arr), len(arr), pmxstruct.get_names_version())
+
+def get_name_index(pmx, attr: str) -> NameIndex:
+	""" The [NameIndex] of the list [attr] (one of [NAMED_LISTS]), rebuilt if anything was added, removed or renamed """
+	return _get_or_build(pmx, "names:" + attr, _names_signature(pmx, attr), lambda pmx: NameIndex(getattr(pmx, attr)))
+
+def find_name(pmx, attr: str, name: str, start: int = 0, stop: int = None):
+	""" [NameIndex.find] on the list [attr], which is rebuilt once if the found item turns out to be outdated """
+	index = get_name_index(pmx, attr)
+	found = index.find(name, start, stop)
+	if found is None or index.is_current_at(found, name): return found
+	invalidate(pmx, "names:" + attr)
+	return get_name_index(pmx, attr).find(name, start, stop)
+
+def rename_item(pmx, attr: str, idx: int, name_jp: str = None, name_en: str = None) -> None:
+	"""
+	Set the names of item [idx] of the list [attr] (None keeps that one as is).
+	Updates its [NameIndex] in place instead of letting the next lookup rebuild it.
+	"""
+	cache = _get_cache(pmx)
+	entry = cache.get("names:" + attr)
+	is_current = entry is not None and entry[0] == _names_signature(pmx, attr)
+	item = getattr(pmx, attr)[idx]
+	old = (item.name_jp, item.name_en)
+	if name_jp is not None: item.name_jp = name_jp
+	if name_en is not None: item.name_en = name_en
+	if not is_current: return
+	entry[1].move(idx, old, (item.name_jp, item.name_en))
+	cache["names:" + attr] = (_names_signature(pmx, attr), entry[1])
+
+#################
+### Bone Tree ###
+#################
+
+class BoneTree:
+	"""
+	Hierarchy of [pmx.bones], with every parent_idx outside of the list counting as root.
+	- parent[b]   :: parent_idx of [b], or -1
+	- children[b] :: Direct children of [b], ascending
+	- order       :: All bones in pre-order, each root (and each list of children) ascending
+	- enter[b]    :: Position of [b] in [order] -- [b] and all its descendants are order[enter[b] : leave[b]]
+	- ordered     :: True if every bone comes after its parent
+	Bones in a loop are never reached from a root, so they have neither children nor descendants (enter = leave = -1).
+	"""
+	def __init__(self, pmx):
+		count = len(pmx.bones)
+		self.parent = [b.parent_idx if 0 <= b.parent_idx < count else -1 for b in pmx.bones]
+		self.children = [[] for _ in range(count)]
+		roots = []
+		for (b, p) in enumerate(self.parent):
+			if p == -1: roots.append(b)
+			else: self.children[p].append(b)
+		self.ordered = all(p < b for (b, p) in enumerate(self.parent))
+		self.order = []
+		self.enter = [-1] * count
+		self.leave = [-1] * count
+		stack = [(b, False) for b in reversed(roots)]
+		while stack:
+			(b, done) = stack.pop()
+			if done:
+				self.leave[b] = len(self.order)
+				continue
+			self.enter[b] = len(self.order)
+			self.order.append(b)
+			stack.append((b, True))
+			stack.extend((c, False) for c in reversed(self.children[b]))
+		self._ancestors = {}
+	
+	def is_descendant(self, bone: int, of: int) -> bool:
+		""" True if [of] is a (grand-)parent of [bone] -- O(1) """
+		return self.enter[of] < self.enter[bone] < self.leave[of]
+	
+	def descendants(self, bone: int) -> List[int]:
+		""" All (grand-)children of [bone], ascending """
+		if self.enter[bone] == -1: return []
+		return sorted(self.order[self.enter[bone] + 1 : self.leave[bone]])
+	
+	def ancestors(self, bone: int) -> tuple:
+		""" Parent, grandparent, ... of [bone] up to its root, nearest first """
+		chain = self._ancestors.get(bone)
+		if chain is not None: return chain
+		## Walk up to the first bone that already knows its chain, then fill in all on the way back down
+		path = []
+		b = bone
+		while b != -1 and b not in self._ancestors:
+			if len(path) > len(self.parent): return () ## Loop
+			path.append(b)
+			b = self.parent[b]
+		chain = self._ancestors.get(b, ())
+		if b != -1: chain = (b,) + chain
+		for b in reversed(path):
+			self._ancestors[b] = chain
+			chain = (b,) + chain
+		return self._ancestors[bone]
+
+def _bone_tree_signature(pmx) -> tuple:
+	return (id(pmx.bones), len(pmx.bones), pmxstruct.get_parents_version())
+
+def get_bone_tree(pmx) -> BoneTree:
+	""" The [BoneTree] of this model, rebuilt if bones were added, removed or got a different parent """
+	return _get_or_build(pmx, "bones", _bone_tree_signature(pmx), BoneTree)
+
+if __name__ == '__main__':
+	core.MY_PRINT_FUNC(infotext)
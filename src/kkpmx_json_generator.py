@@ -8,6 +8,7 @@ import os
 import nuthouse01_core as core
 import morph_scale
 import kkpmx_utils as util
+import kkpmx_index as kkindex
 from copy import deepcopy
 from kkpmx_utils import find_bone
 DEBUG = util.DEBUG or False
@@ -1003,11 +1004,11 @@ def generate_tree(pmx, tree, slots):
 		for idx,bone in bones:
 			if parent != -1: add idx to tree[parent]
 	"""
+	bone_tree = kkindex.get_bone_tree(pmx)
 	for (i,b) in enumerate(pmx.bones):
-		tree[i] = []
+		tree[i] = list(bone_tree.children[i])
 		if b.name_jp.startswith("ca_slot"): slots.append(i)
 		#if b.tail_usebonelink is False and b.tail != -1: tree[b.tail].append(i)
-		if b.parent_idx != -1: tree[b.parent_idx].append(i)
 
 def treePrinter(pmx, tree, _start):
 	def __treePrinter(start, indent="- ", lvl=0):
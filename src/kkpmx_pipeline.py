@@ -0,0 +1,269 @@
+# Cazoo - 2026-10-18
+# This code is free to use, but I cannot be held responsible for damages that it may or may not cause.
+#####################
+### sys
+import gc
+import os
+import pickle
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, Future
+from contextlib import contextmanager
+from typing import List
+
+### Library -- Don't import any KKPMX files, so that every module (incl. kkpmx_utils) can use this
+import nuthouse01_core as core
+import nuthouse01_pmx_parser as pmxlib
+###
+
+infotext = '''
+Keeps a [Pmx] in memory across several steps and only writes it to disk where it is actually needed.
+- Snapshots freeze the model as it is right now (as a compact pickle) and encode + write it in a background thread,
+---- so the next step can already modify the model while the file is being written.
+- Each snapshot stays in memory until the pipeline is finished, so the model can be rolled back to it.
+- Every stage is timed, and [finish()] prints a short report.
+
+-- All files are written one after another by a single worker thread; [write_pmx] itself is not thread-safe.
+-- Paths of files that are still being written are tracked, so that [wait_for(path)] can block until it is done
+---- and new file names can avoid them (see [pending_paths]).
+'''
+
+#############
+### Utils ###
+#############
+
+def freeze(pmx) -> bytes:
+	""" Deep, immutable copy of [pmx] that costs much less than copy.deepcopy. Use [thaw] to get a [Pmx] again. """
+	return pickle.dumps(pmx, protocol=pickle.HIGHEST_PROTOCOL)
+
+def thaw(blob: bytes):
+	""" Rebuild a fresh [Pmx] from the result of [freeze] """
+	## Same as in parse_pmx_vertices: Creating that many tiny objects makes the gc run all the time
+	gc_was_enabled = gc.isenabled()
+	gc.disable()
+	try:     return pickle.loads(blob)
+	finally:
+		if gc_was_enabled: gc.enable()
+
+##########################
+### Background Writing ###
+##########################
+
+class PendingPath(str):
+	"""
+	The path of a PMX file that is written in the background. It is a normal [str] in every other way, so it can be
+	returned wherever a file path was returned before.
+	- future :: Resolves to the path once the file is complete, or raises what [write_pmx] raised
+	"""
+	future: Future = None
+	def done(self) -> bool: return self.future.done()
+	def wait(self) -> str:
+		""" Block until the file is written, returns the plain path """
+		self.future.result()
+		return str(self)
+
+_writer = None
+## abspath -> Future of every file that is not finished yet
+_pending = {}
+_pending_lock = threading.Lock()
+
+def _get_writer() -> ThreadPoolExecutor:
+	global _writer
+	if _writer is None: _writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pmx_writer")
+	return _writer
+
+def _key(path: str) -> str: return os.path.normcase(os.path.abspath(path))
+
+def _write_frozen(blob: bytes, path: str, moreinfo: bool) -> str:
+	core.mute_this_thread()
+	try:
+		pmxlib.write_pmx(path, thaw(blob), moreinfo=moreinfo)
+	except Exception as err:
+		## Nobody might ever wait for this, so at least say so
+		core.mute_this_thread(False)
+		print(f"\n[!!] Writing '{path}' in the background failed: {err.__class__.__name__} {err}")
+		raise
+	finally:
+		core.mute_this_thread(False)
+	return path
+
+def write_frozen_in_background(blob: bytes, path: str, moreinfo=False) -> PendingPath:
+	"""
+	Encode & write a frozen model to [path] in the background writer thread.
+	Returns [path] as [PendingPath], which carries the Future of the write.
+	"""
+	key = _key(path)
+	def _forget(_):
+		with _pending_lock:
+			if _pending.get(key) is future: del _pending[key]
+	with _pending_lock:
+		future = _get_writer().submit(_write_frozen, blob, path, moreinfo)
+		_pending[key] = future
+	future.add_done_callback(_forget)
+	pending = PendingPath(path)
+	pending.future = future
+	return pending
+
+def write_in_background(pmx, path: str, moreinfo=False) -> PendingPath:
+	"""
+	Freeze [pmx] right now and write it to [path] in the background. Any changes made to [pmx] after
+	this returns do not end up in the file.
+	"""
+	return write_frozen_in_background(freeze(pmx), path, moreinfo)
+
+def wait_for(path: str) -> None:
+	""" If [path] is still being written in the background, block until it is done (raises if the write failed) """
+	with _pending_lock:
+		future = _pending.get(_key(path))
+	if future is not None: future.result()
+
+def wait_all() -> None:
+	""" Block until every background write is done """
+	with _pending_lock:
+		futures = list(_pending.values())
+	for future in futures: future.result()
+
+def pending_paths() -> List[str]:
+	""" Absolute paths of all files that are still being written (normcase'd, so compare them with [is_pending]) """
+	with _pending_lock:
+		return list(_pending.keys())
+
+def is_pending(path: str) -> bool:
+	""" True if [path] is still being written in the background """
+	with _pending_lock:
+		return _key(path) in _pending
+
+def get_unused_file_name(initial_name: str) -> str:
+	""" Same as [core.get_unused_file_name], but also skips files that do not exist yet because they are still pending """
+	return core.get_unused_file_name(os.path.abspath(initial_name), pending_paths())
+
+################
+### Pipeline ###
+################
+
+class Snapshot:
+	"""
+	One frozen state of the model.
+	- name   :: Name of the stage that it was taken after
+	- path   :: Target file, or None if it only exists in memory
+	- future :: Background write of [path], or None
+	"""
+	def __init__(self, name: str, blob: bytes, path: str = None, future: Future = None):
+		self.name = name
+		self.blob = blob
+		self.path = path
+		self.future = future
+	def done(self) -> bool:
+		return self.future is None or self.future.done()
+	def wait(self) -> str:
+		""" Block until the file is written, returns its path """
+		if self.future is not None: self.future.result()
+		return self.path
+	def load(self):
+		""" A fresh [Pmx] of this state """
+		return thaw(self.blob)
+
+class Pipeline:
+	"""
+	:param pmx                [Pmx]  : The model that all stages modify in-place
+	:param input_filename_pmx [str]  : The working directory + PMX File name, used for naming snapshot files
+	:param in_memory          [bool] : If False, only timing is recorded and [checkpoints] are ignored
+	:param checkpoints        [list] : Names of stages that write a snapshot once they are done
+	:param moreinfo           [bool] : Passed on to [write_pmx]
+	"""
+	def __init__(self, pmx, input_filename_pmx: str, in_memory: bool = True, checkpoints: List[str] = (), moreinfo = False):
+		self.pmx = pmx
+		self.input_filename_pmx = input_filename_pmx
+		self.in_memory = in_memory
+		self.checkpoints = set(checkpoints)
+		self.moreinfo = moreinfo
+		self.timings: List[tuple] = []
+		self.snapshots: List[Snapshot] = []
+		self._current = None
+
+	#### Stages
+	def begin_stage(self, name: str) -> None:
+		""" Ends the previous stage (if any) and starts timing the next one """
+		self.end_stage()
+		self._current = (name, time.perf_counter())
+
+	def end_stage(self) -> None:
+		if self._current is None: return
+		name, start = self._current
+		self._current = None
+		self.timings.append((name, time.perf_counter() - start))
+		if self.in_memory and name in self.checkpoints:
+			self.snapshot(name, "_" + _as_suffix(name))
+
+	@contextmanager
+	def stage(self, name: str):
+		""" with pipe.stage("name"): ... -- Same as begin_stage() + end_stage() around the block """
+		self.begin_stage(name)
+		try: yield self.pmx
+		finally: self.end_stage()
+
+	#### Snapshots
+	def snapshot(self, name: str, suffix: str = None) -> Snapshot:
+		"""
+		Freeze the current state of the model. If [suffix] is given, the state is also written to
+		'[model][suffix].pmx' in the background (never overwriting an existing file).
+		"""
+		blob = freeze(self.pmx)
+		path = future = None
+		if suffix is not None:
+			path = get_unused_file_name(self.input_filename_pmx[0:-4] + suffix + ".pmx")
+			path = write_frozen_in_background(blob, path, self.moreinfo)
+			future = path.future
+			print(f"> Writing snapshot '{os.path.basename(path)}' in the background...")
+		snap = Snapshot(name, blob, path, future)
+		self.snapshots.append(snap)
+		return snap
+
+	def get_snapshot(self, name: str = None) -> Snapshot:
+		""" The latest snapshot with this name, or the latest snapshot at all if None """
+		for snap in reversed(self.snapshots):
+			if name is None or snap.name == name: return snap
+		raise KeyError(f"No snapshot named '{name}'" if name else "No snapshot taken yet")
+
+	def rollback(self, name: str = None):
+		""" Replace [self.pmx] with a fresh copy of the given snapshot (see get_snapshot) and return it """
+		self.pmx = self.get_snapshot(name).load()
+		return self.pmx
+
+	def wait(self) -> None:
+		""" Block until all background writes are done """
+		for snap in self.snapshots:
+			try: snap.wait()
+			except Exception as err: print(f"[!!] Writing snapshot '{snap.path}' failed: {err}")
+
+	#### Finish
+	def finish(self, final_path: str = None) -> str:
+		"""
+		Ends the current stage, waits for all snapshots and writes [self.pmx] to [final_path] if given.
+		Prints the timing report and drops all snapshots from memory.
+		"""
+		self.end_stage()
+		self.wait()
+		if final_path is not None:
+			start = time.perf_counter()
+			pmxlib.write_pmx(final_path, self.pmx, moreinfo=self.moreinfo)
+			self.timings.append(("Write final model", time.perf_counter() - start))
+		self.report()
+		self.snapshots.clear()
+		return final_path
+
+	def report(self) -> None:
+		if not self.timings: return
+		width = max(len(t[0]) for t in self.timings)
+		print("------\n> Timing per stage\n------")
+		for name, secs in self.timings:
+			print(f"  {name:{width}} : {secs:8.2f}s")
+		print(f"  {'Total':{width}} : {sum(t[1] for t in self.timings):8.2f}s")
+		written = [s for s in self.snapshots if s.path]
+		if written: print(f"  Snapshots written: " + ", ".join(os.path.basename(s.path) for s in written))
+
+def _as_suffix(name: str) -> str:
+	return "".join(c if c.isalnum() else "_" for c in name).strip("_").lower()
+
+if __name__ == '__main__':
+	core.MY_PRINT_FUNC(infotext)
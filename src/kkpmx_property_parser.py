@@ -9,6 +9,7 @@ import copy   ## copy.deepcopy
 
 import kkpmx_core as kklib
 import kkpmx_utils as util
+from kkpmx_texture_jobs import TextureJobGraph, TextureCache
 
 try:
 	import nuthouse01_core as core
@@ -140,6 +141,7 @@ Additional notes:
 
 [Options] (manually):
 - Use Texture Cache (default: Yes)´-- Reuse Textures that share the same generation parameters. If, for some reason, you do not want that it can be turned off with this. Other than the increased amount of pictures, this shouldn't behave any different (if it does, please tell me)
+-- This also keeps all generated pictures in '#TextureCache' next to the model, so that the next run only copies them back if nothing they are made from has changed (not even the script).
 - Asks to skip pictures (default: No) -- You can skip regenerating the pictures if all files already exist as expected (otherwise it will list them as missing as usual)
 
 [Output]: PMX file '[modelname]_props.pmx'
@@ -157,6 +159,8 @@ pathColor  = r'.\extra\#Apply_ColorMap.py'
 pathBOver1 = r'.\extra\#Apply_Body_overtex1.py'
 pathOT_eye = r'.\extra\#Apply_overtex1__eyes.py'
 pathLine   = r'.\extra\#Apply_LineMap.py'
+## Generated images are kept in here (next to the model) to skip generating them again in the next run
+TEXTURE_CACHE_DIR = "#TextureCache"
 
 suffix_Col   = "_pyCol"
 suffix_Det   = "_pyDet"
@@ -177,6 +181,8 @@ state_UNITY = "unity"
 state_SKIN = "sharedskin"
 state_ONLY = "BODY_OR_EYE"
 state_MAPTEX = "mapMain"
+state_JOBS = "textureJobs"   ## [TextureJobGraph] of the current run
+state_PLANNED = "plannedTex" ## id(mat) -> Main texture that waits for its image
 def _verbose(): return local_state.get(state_info, True)
 def _useImg():  return local_state.get(OPT_IMG, True)
 
@@ -274,6 +280,9 @@ def __parse_json_file(pmx, data: dict, root: str):
 		local_state[OPT_IMG]   = not util.ask_yes_no("Skip images", "n")
 	
 	print(local_state)
+	cache = TextureCache(os.path.join(root, TEXTURE_CACHE_DIR)) if local_state[OPT_CACHE] else None
+	local_state[state_JOBS] = TextureJobGraph(cache)
+	local_state[state_PLANNED] = {}
 	
 	def set_name(_mat, _attr): ## Pick out the correct name based on options
 		_name = _mat.name_en if options[OPT_ENG] else _mat.name_jp
@@ -337,6 +346,7 @@ def __parse_json_file(pmx, data: dict, root: str):
 		if TEXTURES in attr: #@todo_note "TEXTURES can be used to use default names based on KK & BASE"
 			if base is None:
 				print("[err] Cannot process default textures without base path") #@todo_add[BASE] "BASE is required when using TEXTURES"
+				__run_texture_jobs()
 				return
 			base_mat = mat
 			if NO_FILES in attr: base_mat = pmx.materials[util.find_mat(pmx, attr[PARENT])] #@todo_ref "<< Inherit[A] >>"
@@ -385,17 +395,17 @@ def __parse_json_file(pmx, data: dict, root: str):
 				##-- This generates default paths for the supported textures
 				attr[texDict[tex]] = os.path.join(base, name + texSuffix[tex])
 				#print(f">> Generate: {attr[texDict[tex]]}")
-				if tex == t__Main and base_mat.tex_idx > -1:
+				if tex == t__Main and get_main_texture(pmx, base_mat) is not None:
 					tmp = texDict[tex]
 					if not os.path.exists(attr[tmp]):
-						attr[tmp] = os.path.join(root, pmx.textures[base_mat.tex_idx])
+						attr[tmp] = os.path.join(root, get_main_texture(pmx, base_mat))
 					#-- Record how often a given Texture is used, to avoid identical assets (with different colors) from overwriting each other
 					#local_state[state_MAPTEX].addOrInit(attr[tmp], 0, lambda v: v+1)
 					local_state[state_MAPTEX][attr[tmp]] += 1
 			##[If a MainTexture is set regardless, then always support that usecase regardless of Shader]
-			if t__Main not in attr and base_mat.tex_idx > -1:
+			if t__Main not in attr and get_main_texture(pmx, base_mat) is not None:
 				tmp = texDict[t__Main]
-				attr[tmp] = os.path.join(root, pmx.textures[base_mat.tex_idx])
+				attr[tmp] = os.path.join(root, get_main_texture(pmx, base_mat))
 				local_state[state_MAPTEX][attr[tmp]] += 1
 				
 		# Field: Add hair flag and keep track of duplicates
@@ -426,6 +436,8 @@ def __parse_json_file(pmx, data: dict, root: str):
 			print("--- Error while processing this Material")
 			for (k,v) in attr.items():
 				print(f"[{k}: {v}")
+			local_state.pop(state_JOBS, None) ## Nothing gets generated then
+			local_state.pop(state_PLANNED, None)
 			raise err
 		if TEST_BODY: break
 		if TEST_EYES and SECOND: break
@@ -437,6 +449,7 @@ def __parse_json_file(pmx, data: dict, root: str):
 		
 		## Clear texture cache after every run when reuse is disabled
 		if not local_state[OPT_CACHE]: local_state[ARGSTR] = {}
+	__run_texture_jobs()
 	#######
 	### Display summary for quick glance that something did not work
 	arr = []
@@ -461,6 +474,16 @@ def __parse_json_file(pmx, data: dict, root: str):
 	## Actually add arr to LogLines
 	return ["=========="] + arr + ["=========="]
 
+def __run_texture_jobs():
+	""" Generate all images collected by [call_img_scripts] at once, then apply the textures that waited for them """
+	jobs = local_state.get(state_JOBS, None)
+	if jobs is None: return
+	## Same error handling as [call_img_scripts]
+	try: jobs.run(inline=DEBUG, trace=DEBUG or util.FILEDEBUG, throw=DEBUG and THROWERROR)
+	finally:
+		local_state.pop(state_JOBS, None)
+		local_state.pop(state_PLANNED, None)
+
 #################
 #### Parsers ####
 #################
@@ -1061,7 +1084,7 @@ def process_color_and_detail(pmx, mat, attr):
 	elif t__Color in attr:
 		## Validate MainTex & void it if invalid
 		attr.setdefault(t__Main, None)
-		if attr[t__Main] and not os.path.exists(attr[t__Main]): attr[t__Main] = None
+		if attr[t__Main] and not texture_exists(attr[t__Main]): attr[t__Main] = None
 		## Check if there is no MainTex
 		noMain = attr[t__Main] in [None,""] and META in attr
 		#print("------ before handle_acc_color"); print(attr); print("-----")
@@ -1084,7 +1107,7 @@ def process_color_and_detail(pmx, mat, attr):
 		if noMain or ALTNAME in attr: ff = replFN(ff, attr[ALTNAME])
 		attr[t__MainCol] = re.sub(".png","",ff) + suffix_Col + ".png"
 		##-- Remove a non-generated entry due to errors
-		if attr[t__MainCol] and not os.path.exists(attr[t__MainCol]):
+		if attr[t__MainCol] and not texture_exists(attr[t__MainCol]):
 			if t__Reuse in attr: attr[t__MainCol] = attr[t__Reuse] ##<< replace if we reuse from a diff. slot
 			else: del attr[t__MainCol]
 		elif ARGSTR in attr: ## as 2nd condition since diff. slot will never do this tbh
@@ -1263,7 +1286,7 @@ def handle_acc_color(pmx, attr): ### @FIX: Add the slot name to avoid things bei
 	if NotFound(attr, t__Color): return
 	
 	main = attr.get(t__Main, None)
-	if main and not os.path.exists(main): main = None
+	if main and not texture_exists(main): main = None
 	attr[t__Main] = main
 	attr.setdefault(Color_2, [0,0,0,1])
 	attr.setdefault(Color_3, None)
@@ -1393,32 +1416,43 @@ def handle_acc_alpha(pmx, attr): ## Has @todo_add \\ @open: All the props affect
 #### Utility ####
 #################
 
+## target -> Module of the texture script
+_img_scripts = {
+	"color":  "extra.#Apply_ColorMap",
+	"detail": "extra.#Apply_DetailMap",
+	"body1":  "extra.#Apply_Body_overtex1",
+	"OT_eye": "extra.#Apply_overtex1__eyes",
+	"line":   "extra.#Apply_LineMap",
+}
+
 def call_img_scripts(args, target, isJson = []):
+	"""
+	Run the texture script [target] in this process. [args] is its command line (incl. the path to the script),
+	which the script parses once into its typed arguments before calling its [apply_*] function.
+	The modules stay imported, so their setup (and the images cached by [kkpmx_image_lib]) is shared between calls.
+	Returns the path of the written image, or None if it failed.
+	
+	While parsing the JSON file, the script is only added to the [TextureJobGraph] of this run instead,
+	which generates all images at once in the end. Then the path of the planned image is returned.
+	"""
 	if not _useImg(): return
-	if DEBUG or util.FILEDEBUG:
-		##- Causes scripts to run in Main context which adds proper stacktrace
-		try:
-			if DEBUG and util.FILEDEBUG: print(' '.join(['"' + os.path.abspath(args[0]) + '"'] + list(args[1:])))
-			os.system(' '.join(args))
-		except Exception as eee:
-			print(eee)
-			if not DEBUG and util.FILEDEBUG: print(' '.join(['"' + os.path.abspath(args[0]) + '"'] + list(args[1:])))
-			if THROWERROR: raise eee
-	else:
-		from unittest.mock import patch
-		import runpy, sys
-		try:
-			target_dict = { 
-				"color": "extra.#Apply_ColorMap",
-				"detail": "extra.#Apply_DetailMap",
-				"body1": "extra.#Apply_Body_overtex1",
-				"OT_eye": "extra.#Apply_overtex1__eyes",
-				"line": "extra.#Apply_LineMap",
-			}
-			if not target_dict.get(target): return
-			with patch.object(sys, 'argv', [x.strip('"') for x in args]):
-				runpy.run_module(target_dict.get(target))
-		except Exception as eee: print(eee)
+	if not _img_scripts.get(target): return
+	cmdline = ' '.join(['"' + os.path.abspath(args[0]) + '"'] + list(args[1:]))
+	if DEBUG and util.FILEDEBUG: print(cmdline)
+	try:
+		argv = [x.strip('"') for x in args]
+		jobs = local_state.get(state_JOBS, None)
+		if jobs is not None: return jobs.add(_img_scripts[target], argv).output
+		import importlib
+		module = importlib.import_module(_img_scripts[target])
+		return module.main(argv)
+	except Exception as eee:
+		print(eee)
+		if DEBUG and THROWERROR: raise eee
+		if DEBUG or util.FILEDEBUG:
+			import traceback
+			traceback.print_exc()
+			if not DEBUG: print(cmdline)
 
 def ask_to_rename_extra(base):
 	if not os.path.exists(base):
@@ -1499,32 +1533,57 @@ def set_new_texture(pmx, mat, attr, tex_names: list, tex_mode=tex_mode_main, ski
 	if skipped:
 		msgs["skipped"].append(tex_name)
 		return False
-	if not os.path.exists(tex_name):
+	jobs = local_state.get(state_JOBS, None)
+	copy_from = None
+	if not texture_exists(tex_name):
 		## Note: When doing [NO IMG], this collects all intermediate steps
 		# e.g. one for _pyDet, _pyLin, _pyOT1 -- But Textures are still inside
 		if not copyIfMissing:
 			msgs["no_files"].append(tex_name)
 			return False
-		util.copy_file(tex_names[0], tex_name)
-	if tex_name in pmx.textures:
-		tex_idx = pmx.textures.index(tex_name)
-	else:
-		tex_idx = len(pmx.textures)
-		pmx.textures.append(tex_name)
-	if isToonMode:
-		mat.toon_idx = tex_idx
-		mat.toon_mode = 0
-	elif isSphereMode:
-		mat.sph_idx = tex_idx
-		mat.sph_mode = 1
-	else:
-		mat.tex_idx = tex_idx
+		copy_from = tex_names[0]
+	
+	def apply(exists = True):
+		if not exists:
+			msgs["no_files"].append(tex_name)
+			return
+		if copy_from is not None: util.copy_file(copy_from, tex_name)
+		if tex_name in pmx.textures:
+			tex_idx = pmx.textures.index(tex_name)
+		else:
+			tex_idx = len(pmx.textures)
+			pmx.textures.append(tex_name)
+		if isToonMode:
+			mat.toon_idx = tex_idx
+			mat.toon_mode = 0
+		elif isSphereMode:
+			mat.sph_idx = tex_idx
+			mat.sph_mode = 1
+		else: mat.tex_idx = tex_idx
+	## While parsing, all textures are assigned in the end (in the same order), once all images exist
+	if jobs is not None:
+		jobs.defer(copy_from if copy_from is not None else tex_name, apply)
+		if not (isToonMode or isSphereMode): local_state[state_PLANNED][id(mat)] = tex_name
+	else: apply()
+	if not (isToonMode or isSphereMode):
 		attr[t__MainCol] = tex_name
 		if ARGSTR in attr:
 			tmp = attr[ARGSTR]
 			if tmp not in local_state[ARGSTR]: local_state[ARGSTR][tmp] = tex_name
 	return True
 
+def texture_exists(path):
+	""" Same as [os.path.exists], but also true for images that are going to be generated in this run """
+	jobs = local_state.get(state_JOBS, None)
+	if jobs is not None: return jobs.exists(path)
+	return os.path.exists(path)
+
+def get_main_texture(pmx, mat):
+	""" Path of the main texture of [mat] (incl. one that waits for its image), or None """
+	planned = local_state.get(state_PLANNED, {}).get(id(mat), None)
+	if planned is not None: return planned
+	return pmx.textures[mat.tex_idx] if mat.tex_idx > -1 else None
+
 def get_working_texture(attr):
 	if t__MainCol in attr:
 		if attr[t__MainCol] is not None:
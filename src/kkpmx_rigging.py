@@ -12,6 +12,7 @@ import nuthouse01_core as core
 import nuthouse01_pmx_struct as pmxstruct
 import morph_scale
 import kkpmx_utils as util
+import kkpmx_index as kkindex
 from kkpmx_utils import find_bone, find_mat, find_disp, find_morph, find_rigid
 from kkpmx_utils import Vector3, Matrix
 
@@ -1895,14 +1896,14 @@ def split_merged_materials(pmx, input_filename_pmx): #-- Find and split merged M
 	"""
 	printStage("split_merged_materials")
 	verbose = _verbose()
-	#### Get parental map of all bones
-	par_map = get_parent_map(pmx, range(len(pmx.bones)))
+	#### Get all children of each slot
 	slots = [i for (i,b) in enumerate(pmx.bones) if b.name_jp.startswith("ca_slot")]
+	child_map = get_children_map(pmx, slots, returnIdx=True, add_first=False)
 	slot_map = {}    ## dict of { "ca_slot": [slot, list of children] }
 	slot_names = {}  ## dict of { "ca_slot": "combined,name,of,children" }
 	## Build decendant map
 	for slot in slots:
-		children = [k for k in par_map.keys() if slot in par_map[k]]
+		children = child_map[slot]
 		slot_name = pmx.bones[slot].name_jp
 		if DEBUG: print(f"{slot_name}:[{slot}]: {children}")
 		slot_map[slot_name] = [slot] + children
@@ -2485,11 +2486,13 @@ def get_parent_map(pmx, bones):
 	@return:    Dict[int, List[int]]
 	"""
 	boneMap = { -1: [], 0: [] }
+	tree = kkindex.get_bone_tree(pmx)
 	try:
 		for bone in sorted(bones):
 			if bone in boneMap: continue
-			p = bone
-			while p not in boneMap: p = pmx.bones[p].parent_idx
+			p = -1
+			for a in tree.ancestors(bone):
+				if a in boneMap: p = a; break
 			if p not in [0,-1]: boneMap[bone] = boneMap[p] + [p]
 			else:               boneMap[bone] = []
 		del boneMap[-1]
@@ -2523,11 +2526,20 @@ def get_children_map(pmx, bones, returnIdx=False, add_first=True, find_all=True)
 	"""
 	if bones == None: bones = range(len(pmx.bones))
 	elif type(bones) is not list: bones = [bones]
-	par_map = get_parent_map(pmx, range(len(pmx.bones)) if find_all else bones) # Reusing Range causes an issue I think...
+	tree = kkindex.get_bone_tree(pmx)
+	if find_all and tree.ordered:
+		## Then [get_parent_map] lists all ancestors except bone 0, so the descendants are the same
+		def get_children(bone): return tree.descendants(bone) if bone > 0 else []
+	else:
+		par_map = get_parent_map(pmx, range(len(pmx.bones)) if find_all else bones) # Reusing Range causes an issue I think...
+		child_map = {}
+		for (k, parents) in par_map.items():
+			for p in parents: child_map.setdefault(p, []).append(k)
+		def get_children(bone): return list(child_map.get(bone, []))
 	bone_map = {}    ## dict of { "name": [bone, list of children] }
 	for bone in bones:
 		bone_key = pmx.bones[bone].name_jp
-		children = [k for k in par_map.keys() if bone in par_map[k]]
+		children = get_children(bone)
 		if returnIdx: bone_key = bone
 		if add_first: children = [bone] + children
 		bone_map[bone_key] = children
@@ -0,0 +1,326 @@
+# Cazoo - 2026-10-18
+# This code is free to use, but I cannot be held responsible for damages that it may or may not cause.
+#####################
+### sys
+import contextlib
+import hashlib
+import importlib
+import io
+import json
+import os
+import shutil
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from typing import List
+
+### Library -- Don't import any KKPMX files, so that starting a worker process stays cheap
+import nuthouse01_core as core
+###
+
+infotext = '''
+Collects the jobs of the texture scripts in [extra] first, and then runs all of them together in a process pool.
+- Every job knows which images it reads and which one it writes, so a job only waits for the jobs
+---- that write one of its inputs (or that must be done with a file before it is overwritten). All others run in parallel.
+- Adding a job with the same arguments as an earlier one returns that one instead.
+- Changes that need a generated image (e.g. pointing a material to it) can be deferred until [run] is done.
+- With a [TextureCache], every image is also stored under a hash of everything it was made from
+---- (the bytes of all input images, the other arguments, and the code of the script). If a later run asks for
+---- the same image, it is copied from there (or kept, if it is already in place) instead of being generated again.
+
+-- Each script must provide [parse_argv(argv)], which returns an object with [output_path()] and [inputs()],
+---- and [main(argv)], which generates the image.
+'''
+
+## Processes used by [TextureJobGraph.run], None for one per CPU
+TEXTURE_WORKERS = None
+## Least recently used images are dropped from a [TextureCache] once it holds more than this
+TEXTURE_CACHE_BYTES = 1024 * 1024 * 1024
+
+def _key(path: str) -> str: return os.path.normcase(os.path.abspath(path))
+
+_in_worker = False ## Set in the worker processes of [TextureJobGraph._run_pool]
+
+def _init_worker() -> None:
+	global _in_worker
+	_in_worker = True
+
+def _run_job(module: str, argv: List[str], trace: bool = False, throw: bool = False) -> str:
+	## Collect everything the script prints, so that the output of parallel jobs does not get mixed up
+	## [trace]: Also log the stack trace of an error -- [throw]: Print the log and raise the error instead of returning
+	out = io.StringIO()
+	error = None
+	with contextlib.redirect_stdout(out):
+		try:
+			mod = importlib.import_module(module)
+			## The other processes use the other CPUs already, so don't start a thread per CPU in each of them too
+			imglib = getattr(mod, "imglib", None)
+			if _in_worker and imglib is not None: imglib.BLEND_WORKERS = 1
+			mod.main(argv)
+		except Exception as err:
+			print(err)
+			if trace: print(traceback.format_exc(), end="")
+			error = err
+	if error is not None and throw:
+		print(out.getvalue(), end="")
+		raise error
+	return out.getvalue()
+
+class TextureJob:
+	"""
+	- module :: Module name of the script
+	- argv   :: Command line of the script, incl. the path to it
+	- output :: Path of the image it writes
+	- inputs :: Paths of the images it reads
+	- deps   :: Jobs that must be done before this one can start
+	- log    :: Everything the script printed, once it ran
+	"""
+	def __init__(self, module: str, argv: List[str], output: str, inputs: List[str]):
+		self.module = module
+		self.argv = argv
+		self.output = output
+		self.inputs = inputs
+		self.deps: List["TextureJob"] = []
+		self.done = False
+		self.log = None
+		self.cache_key = None      ## Set once it was looked up in a [TextureCache]
+		self.written_before = None ## st_mtime_ns of [output] before the job ran
+
+	def ok(self) -> bool:
+		""" True if the job ran and its image exists """
+		return self.done and os.path.exists(self.output)
+
+	def writes_input_of(self, job: "TextureJob") -> bool:
+		return _key(self.output) in [_key(x) for x in job.inputs]
+
+#####################
+### Texture Cache ###
+#####################
+
+_digests = {} ## (path, mtime_ns, size) -> sha256 of the file
+
+def _file_digest(path: str) -> str:
+	st = os.stat(path)
+	key = (_key(path), st.st_mtime_ns, st.st_size)
+	digest = _digests.get(key)
+	if digest is None:
+		sha = hashlib.sha256()
+		with open(path, "rb") as f:
+			for chunk in iter(lambda: f.read(1024 * 1024), b""): sha.update(chunk)
+		digest = sha.hexdigest()
+		_digests[key] = digest
+	return digest
+
+class TextureCache:
+	"""
+	Content-addressed storage of generated images in the folder [path], limited to [max_bytes].
+	- index.json :: { key: { "size": bytes, "used": unix time } } of every stored image
+	Counts hits & misses until [save], which also drops the least recently used images if too large.
+	"""
+	def __init__(self, path: str, max_bytes: int = None):
+		self.path = path
+		self.max_bytes = max_bytes if max_bytes is not None else TEXTURE_CACHE_BYTES
+		self.hits = self.misses = 0
+		self._code = {} ## module -> digest of the code of that script
+		self.entries = {}
+		try:
+			with open(os.path.join(path, "index.json"), "r", encoding="utf-8") as f:
+				self.entries = json.load(f).get("entries", {})
+		except (OSError, ValueError): pass
+
+	def _file(self, key: str) -> str: return os.path.join(self.path, key + ".png")
+
+	def _code_digest(self, module: str) -> str:
+		if module not in self._code:
+			mod = importlib.import_module(module)
+			sha = hashlib.sha256()
+			for file in [mod.__file__, getattr(getattr(mod, "imglib", None), "__file__", None)]:
+				if file is not None:
+					with open(file, "rb") as f: sha.update(f.read())
+			self._code[module] = sha.hexdigest()
+		return self._code[module]
+
+	def key(self, job: TextureJob) -> str:
+		"""
+		Hash of everything that [job] generates its image from -- Input images count by their content, not their path.
+		Raises OSError if an input is missing.
+		"""
+		inputs = set(_key(x) for x in job.inputs)
+		sha = hashlib.sha256()
+		sha.update(job.module.encode("utf-8"))
+		sha.update(self._code_digest(job.module).encode("utf-8"))
+		for arg in job.argv[1:]: ## [0] is the path of the script
+			if _key(arg) in inputs: arg = "file:" + _file_digest(arg)
+			sha.update(b"\0" + arg.encode("utf-8"))
+		return sha.hexdigest()
+
+	def fetch(self, key: str, path: str) -> bool:
+		""" Put the image stored for [key] at [path], if there is one. False (and counted as miss) otherwise """
+		src = self._file(key)
+		if key not in self.entries or not os.path.exists(src):
+			self.misses += 1
+			return False
+		try:
+			if not (os.path.exists(path) and _file_digest(path) == _file_digest(src)):
+				shutil.copyfile(src, path)
+		except OSError:
+			self.misses += 1
+			return False
+		self.entries[key]["used"] = time.time()
+		self.hits += 1
+		return True
+
+	def store(self, key: str, path: str) -> None:
+		""" Keep a copy of the image at [path] for [key] """
+		try:
+			os.makedirs(self.path, exist_ok=True)
+			shutil.copyfile(path, self._file(key))
+			self.entries[key] = { "size": os.path.getsize(path), "used": time.time() }
+		except OSError as err: print(f"[!] Could not store '{path}' in the texture cache: {err}")
+
+	def size(self) -> int: return sum(e["size"] for e in self.entries.values())
+
+	def save(self) -> None:
+		""" Drop the least recently used images until it fits into [max_bytes], then write the index """
+		total = self.size()
+		for key in sorted(self.entries, key=lambda k: self.entries[k]["used"]):
+			if total <= self.max_bytes: break
+			total -= self.entries.pop(key)["size"]
+			try: os.remove(self._file(key))
+			except OSError: pass
+		if not self.entries and not os.path.exists(self.path): return
+		try:
+			os.makedirs(self.path, exist_ok=True)
+			tmp = os.path.join(self.path, "index.json.tmp")
+			with open(tmp, "w", encoding="utf-8") as f: json.dump({ "entries": self.entries }, f)
+			os.replace(tmp, os.path.join(self.path, "index.json"))
+		except OSError as err: print(f"[!] Could not write the index of the texture cache: {err}")
+
+	def report(self) -> str:
+		return f"Texture cache: {self.hits} hits, {self.misses} misses ({len(self.entries)} images, {self.size() / 1024 / 1024:.1f} MB)"
+
+#################
+### Job Graph ###
+#################
+
+class TextureJobGraph:
+	"""
+	- jobs  :: All jobs in the order they were added
+	- cache :: [TextureCache] to take images from & store them in, or None
+	"""
+	def __init__(self, cache: TextureCache = None):
+		self.jobs: List[TextureJob] = []
+		self.cache = cache
+		self._by_argv = {}   ## (module, *argv) -> job
+		self._writer = {}    ## path -> last job that writes it
+		self._readers = {}   ## path -> jobs that read it since it was last written
+		self._deferred = []  ## (path, callback)
+
+	def add(self, module: str, argv: List[str]) -> TextureJob:
+		"""
+		Plan to run the script [module] with [argv]. Nothing is generated before [run].
+		Raises whatever [parse_argv] of the script raises for invalid arguments.
+		"""
+		key = (module, *argv)
+		job = self._by_argv.get(key)
+		if job is not None: return job
+		params = importlib.import_module(module).parse_argv(argv)
+		job = TextureJob(module, argv, params.output_path(), params.inputs())
+		deps = []
+		def depend(other):
+			if other is not None and other is not job and other not in deps: deps.append(other)
+		for path in job.inputs:
+			depend(self._writer.get(_key(path)))
+			self._readers.setdefault(_key(path), []).append(job)
+		out = _key(job.output)
+		depend(self._writer.get(out))
+		for reader in self._readers.pop(out, []): depend(reader)
+		self._writer[out] = job
+		job.deps = deps
+		self._by_argv[key] = job
+		self.jobs.append(job)
+		return job
+
+	def is_pending(self, path: str) -> bool:
+		""" True if a job that did not run yet will write [path] """
+		job = self._writer.get(_key(path))
+		return job is not None and not job.done
+
+	def exists(self, path: str) -> bool:
+		""" Same as [os.path.exists], but also true for images that will be generated """
+		return self.is_pending(path) or os.path.exists(path)
+
+	def defer(self, path: str, callback) -> None:
+		""" Call [callback(ok)] once [run] is done, with [ok] telling if [path] exists then """
+		self._deferred.append((path, callback))
+
+	def run(self, workers: int = None, inline: bool = False, trace: bool = False, throw: bool = False) -> None:
+		"""
+		Run all jobs that did not run yet, then call the deferred callbacks in the order they were added.
+		The jobs run in a process pool with [workers] processes (default: [TEXTURE_WORKERS]), unless [inline]
+		is set or there is only one. If the pool cannot be started (or breaks), the rest runs right here.
+		-- Always runs inline in a frozen build (.exe), until the pool is known to work there.
+		-- [trace]: Log the stack trace of errors in a script, not only their message
+		-- [throw]: Raise the error of a script that runs in this process instead of continuing with the next one
+		"""
+		todo = [job for job in self.jobs if not job.done]
+		if getattr(sys, "frozen", False): inline = True
+		if len(todo) > 1 and not inline:
+			try: self._run_pool(todo, workers, trace)
+			except (OSError, RuntimeError) as err: ## Also catches a broken pool
+				print(f"[!] Generating textures in parallel failed ({err.__class__.__name__}: {err}), continuing in this process instead")
+		for job in todo:
+			if job.done or self._skip_if_broken(job) or self._take_from_cache(job): continue
+			self._finish(job, _run_job(job.module, job.argv, trace, throw))
+		if self.cache is not None and todo:
+			self.cache.save()
+			print("--- " + self.cache.report())
+		deferred, self._deferred = self._deferred, []
+		for (path, callback) in deferred: callback(os.path.exists(path))
+
+	def _run_pool(self, todo: List[TextureJob], workers: int, trace: bool = False) -> None:
+		workers = min(len(todo), workers or TEXTURE_WORKERS or os.cpu_count() or 1)
+		print(f"--- Generating {len(todo)} textures in {workers} processes")
+		waiting = list(todo)
+		running = {}
+		with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+			while waiting or running:
+				for job in [job for job in waiting if all(dep.done for dep in job.deps)]:
+					waiting.remove(job)
+					if self._skip_if_broken(job) or self._take_from_cache(job): continue
+					running[pool.submit(_run_job, job.module, job.argv, trace)] = job
+				if not running: continue
+				(finished, _) = wait(running, return_when=FIRST_COMPLETED)
+				for future in finished:
+					self._finish(running.pop(future), future.result())
+
+	def _skip_if_broken(self, job: TextureJob) -> bool:
+		## Don't bother if an image that this job reads failed to generate
+		failed = [dep for dep in job.deps if dep.writes_input_of(job) and not dep.ok()]
+		if not failed: return False
+		self._finish(job, f"[!] Skipped '{os.path.basename(job.output)}' because '{os.path.basename(failed[0].output)}' failed to generate\n")
+		return True
+
+	def _take_from_cache(self, job: TextureJob) -> bool:
+		## Remembers the key and when the output was last written, so that [_finish] can store what is new
+		if self.cache is None: return False
+		try: job.cache_key = self.cache.key(job)
+		except OSError: return False ## Missing input, let the script complain about it
+		if not self.cache.fetch(job.cache_key, job.output):
+			job.written_before = os.stat(job.output).st_mtime_ns if os.path.exists(job.output) else None
+			return False
+		job.done = True
+		job.log = f"> Took '{os.path.basename(job.output)}' from the texture cache\n"
+		print(job.log, end="")
+		return True
+
+	def _finish(self, job: TextureJob, log: str) -> None:
+		job.done = True
+		job.log = log
+		print(log, end="")
+		if self.cache is None or job.cache_key is None or not os.path.exists(job.output): return
+		if os.stat(job.output).st_mtime_ns != job.written_before: self.cache.store(job.cache_key, job.output)
+
+if __name__ == '__main__':
+	core.MY_PRINT_FUNC(infotext)
@@ -13,6 +13,7 @@ import nuthouse01_core as core
 #import nuthouse01_pmx_parser as pmxlib
 #import nuthouse01_pmx_struct as pmxstruct
 import morph_scale
+import kkpmx_index as kkindex ## Only exception, as it does not import any KKPMX files either
 ### 
 
 ## Global Debug Flag
@@ -270,11 +271,20 @@ def copy_file(src, dst): # https://stackoverflow.com/questions/123198
 	from shutil import copyfile, copy2
 	#copyfile(src, dst)
 	if src == dst: return
-	try:    copy2(src, dst)
+	try:
+		## Either side could still be written in the background by [kkpmx_core.end]
+		import kkpmx_pipeline as kkpipe
+		kkpipe.wait_for(src)
+		kkpipe.wait_for(dst)
+		copy2(src, dst)
 	except:
 		if not os.path.exists(src):
 			print(f"[!!] <FileNotFound> Failed to copy '{src}' to '{dst}'")
 		else: print(f"[!!] Failed to copy '{src}' to '{dst}'")
+	## copy2 keeps the mtime of [src], so make sure the parse cache does not trust what it knew about [dst]
+	if dst.lower().endswith(".pmx"):
+		import nuthouse01_pmx_parser as pmxlib
+		pmxlib.forget_cached_pmx(dst)
 
 #def makeDebugPrinter(condition):
 #	if DEBUG or condition: return lambda x: print(x)
@@ -283,6 +293,72 @@ def throwIfDebug(isDebug, text):
 	if isDebug: raise Exception(text)
 	print(f"[W]: {text}")
 
+################
+### Textures ###
+################
+
+## Upper limit for the memory used by [get_texture_alpha] -- least recently used textures are dropped first
+TEXTURE_CACHE_BYTES = 512 * 1024 * 1024
+import threading
+from collections import OrderedDict
+_alpha_cache = OrderedDict() ## (path, mtime, size) -> alpha channel (or None)
+_alpha_cache_bytes = 0
+_alpha_cache_lock = threading.Lock()
+
+def read_image(path):
+	"""
+	cv2.imread(path, cv2.IMREAD_UNCHANGED), but also works for paths that are not ascii.
+	Returns None if the file could not be read.
+	"""
+	import cv2
+	img = None
+	if is_ascii(path): img = cv2.imread(path, cv2.IMREAD_UNCHANGED)
+	if img is None:
+		from numpy import fromfile, uint8
+		img = cv2.imdecode(fromfile(path, dtype=uint8), cv2.IMREAD_UNCHANGED)
+	return img
+
+def get_texture_alpha(path):
+	"""
+	Alpha channel (h, w) of the texture at [path]. Many materials share the same texture, so decoded ones are
+	kept in memory (up to [TEXTURE_CACHE_BYTES]) until the file changes. Safe to call from several threads.
+	The returned array is read-only because it is shared.
+	
+	Returns None if the texture has no alpha channel.
+	Raises OSError if it could not be read.
+	"""
+	global _alpha_cache_bytes
+	stat = os.stat(path)
+	key = (os.path.normcase(os.path.abspath(path)), stat.st_mtime_ns, stat.st_size)
+	with _alpha_cache_lock:
+		if key in _alpha_cache:
+			_alpha_cache.move_to_end(key)
+			return _alpha_cache[key]
+	try: img = read_image(path)
+	except Exception as err: raise OSError(f"{err.__class__.__name__}: {err}") from err
+	if img is None: raise OSError(f"Could not decode '{path}'")
+	alpha = None
+	if img.ndim == 3 and img.shape[2] >= 4:
+		alpha = img[:, :, 3].copy()
+		alpha.flags.writeable = False
+	size = 0 if alpha is None else alpha.nbytes
+	if size > TEXTURE_CACHE_BYTES: return alpha
+	with _alpha_cache_lock:
+		if key not in _alpha_cache:
+			_alpha_cache[key] = alpha
+			_alpha_cache_bytes += size
+		while _alpha_cache_bytes > TEXTURE_CACHE_BYTES:
+			_, old = _alpha_cache.popitem(last=False)
+			_alpha_cache_bytes -= 0 if old is None else old.nbytes
+	return alpha
+
+def clear_texture_cache():
+	""" Drop everything that [get_texture_alpha] keeps in memory """
+	global _alpha_cache_bytes
+	with _alpha_cache_lock:
+		_alpha_cache.clear()
+		_alpha_cache_bytes = 0
+
 ###############
 ### Globals ###
 ###############
@@ -381,14 +457,14 @@ def addOrExt(d,key,val):
 	d[key] = arr
 
 def unify_names(arr):
-	names = []
+	names = set()
 	for a in arr:
 		name = a.name_jp; idx = 0
 		while name in names:
 			idx = idx+1
 			name = a.name_jp + f"*{idx}"
 		a.name_jp = name
-		names.append(name)
+		names.add(name)
 
 class DictAppend(dict):
 	def __init__(self, initVal: int):
@@ -500,20 +576,34 @@ def get_unique_name(init: str, tabu: list, isFile = False) -> str:
 
 find_info = """ [pmx] instance -- Entity Name -- Flag to print error if not found (default True) -- idx to start at (default 0)"""
 
-def __find_in_pmxsublist(name, arr, e, idx):
+def __find_in_pmxsublist(pmx, attr, name, e, idx):
+	## Same results as [morph_scale.get_idx_in_pmxsublist], but names are looked up in [kkindex.get_name_index]
+	arr = getattr(pmx, attr)
 	if not is_number(idx) or idx < 0: idx = 0
 	if idx >= len(arr): return -1
 	idx = int(idx)
-	if idx > 0: arr = arr[idx : -1]
-	result = morph_scale.get_idx_in_pmxsublist(name, arr, e)
-	return -1 if result in [-1, None] else result + idx
-
-def find_bone (pmx,name,e=True,idx=0): return __find_in_pmxsublist(name, pmx.bones,e,idx)
-def find_mat  (pmx,name,e=True,idx=0): return __find_in_pmxsublist(name, pmx.materials,e,idx)
-def find_disp (pmx,name,e=True,idx=0): return __find_in_pmxsublist(name, pmx.frames,e,idx)
-def find_morph(pmx,name,e=True,idx=0): return __find_in_pmxsublist(name, pmx.morphs,e,idx)
-def find_rigid(pmx,name,e=True,idx=0): return __find_in_pmxsublist(name, pmx.rigidbodies,e,idx)
-def find_joint(pmx,name,e=True,idx=0): return __find_in_pmxsublist(name, pmx.joints,e,idx)
+	stop = len(arr) - 1 if idx > 0 else len(arr) ## idx > 0 used to search in [arr[idx : -1]]
+	if type(name) != str:
+		result = morph_scale.get_idx_in_pmxsublist(name, arr[idx : stop], e)
+		return -1 if result in [-1, None] else result + idx
+	if name == "": return -1
+	result = kkindex.find_name(pmx, attr, name, idx, stop)
+	if result is not None: return result
+	## Not found: Accept it as index into the searched range, just like before
+	try: result = int(name)
+	except ValueError:
+		if e: core.MY_PRINT_FUNC("unable to find matching item for input '%s'" % name)
+		return -1
+	if 0 <= result < stop - idx: return result + idx
+	core.MY_PRINT_FUNC("valid indexes are [0-'%d']" % (stop - idx - 1))
+	return -1
+
+def find_bone (pmx,name,e=True,idx=0): return __find_in_pmxsublist(pmx, "bones",      name,e,idx)
+def find_mat  (pmx,name,e=True,idx=0): return __find_in_pmxsublist(pmx, "materials",  name,e,idx)
+def find_disp (pmx,name,e=True,idx=0): return __find_in_pmxsublist(pmx, "frames",     name,e,idx)
+def find_morph(pmx,name,e=True,idx=0): return __find_in_pmxsublist(pmx, "morphs",     name,e,idx)
+def find_rigid(pmx,name,e=True,idx=0): return __find_in_pmxsublist(pmx, "rigidbodies",name,e,idx)
+def find_joint(pmx,name,e=True,idx=0): return __find_in_pmxsublist(pmx, "joints",     name,e,idx)
 find_bone.__doc__ = find_mat.__doc__ = find_disp.__doc__ = find_morph.__doc__ = find_rigid.__doc__ = find_joint.__doc__ = find_info
 ### Technically could also be just -- core.my_list_search(arr, lambda x: (x.name_jp == "name_jp" ... ))
 def find_all_in_sublist(name, arr, returnIdx=True):
@@ -565,9 +655,7 @@ def get_idx_and_name(pmx, nameOrIdx, errFlag=True):
 
 def rename_bone(pmx, org, newJP, newEN):
 	tmp = find_bone(pmx, org, False)
-	if tmp != -1:
-		if newJP is not None: pmx.bones[tmp].name_jp = newJP
-		if newEN is not None: pmx.bones[tmp].name_en = newEN
+	if tmp != -1: kkindex.rename_item(pmx, "bones", tmp, newJP, newEN)
 	return tmp
 
 def bind_bone(pmx, _arr, last_link=False): ##-- TODO_Test(again): [rigging]
@@ -744,12 +832,11 @@ def uniquefy_names(pmx, preAct = None):
 	## Short-circuit when no work needs to be done?
 	# x = [m.name_jp for m in pmx.materials]; if len(x) == len(set(x)): return
 	kk_re = re.compile(r" ?\(Instance\)_?(\([-0-9]*\))?")
-	names = []
+	names = set()
 	names_MECopy = {}
-	def apply(mat, suffix):
+	def apply(idx, mat, suffix):
 		oldName = mat.name_jp
-		mat.name_jp = "{}*{}".format(mat.name_jp, suffix)
-		mat.name_en = "{}*{}".format(mat.name_en, suffix)
+		kkindex.rename_item(pmx, "materials", idx, "{}*{}".format(mat.name_jp, suffix), "{}*{}".format(mat.name_en, suffix))
 		#print(f"{oldName} --> {mat.name_jp}")
 		
 	for (idx, name) in enumerate([m.name_jp for m in pmx.materials]):
@@ -762,15 +849,15 @@ def uniquefy_names(pmx, preAct = None):
 			m = re.match("(.+)\.(MECopy\d+)", mat.name_jp)
 			if m[1] in names_MECopy:
 				suffix = names_MECopy[m[1]]
-				apply(mat, suffix)
+				apply(idx, mat, suffix)
 				flag = True
 		if (not flag) and (name in names):
 			while True:
 				suffix += 1
 				if ("{}*{}".format(name, suffix)) not in names: break
 			names_MECopy[mat.name_jp] = suffix
-			apply(mat, suffix)
-		names.append(mat.name_jp)
+			apply(idx, mat, suffix)
+		names.add(mat.name_jp)
 		#yield (idx, mat)
 	######
 	pass #
@@ -79,12 +79,12 @@ def find_toolong_bonemorph(pmx: pmxstruct.Pmx):
 	# check for morphs with JP names that are too long and will not be successfully saved/loaded with VMD files
 	# for each morph, convert from string to bytes encoding to determine its length
 	# also checks that bone/morph names can be stored in shift_jis for VMD usage
-	core.set_encoding("shift_jis")
+	# (pass the encoding instead of core.set_encoding(), a PMX file might be written in the background right now)
 	toolong_list_bone = []
 	failct = 0
 	for d,b in enumerate(pmx.bones):
 		try:
-			bb = core.encode_string_with_escape(b.name_jp)
+			bb = core.encode_string_with_escape(b.name_jp, "shift_jis")
 			if len(bb) > 15:
 				toolong_list_bone.append("%d[%d]" % (d, len(bb)))
 		except UnicodeEncodeError as e:
@@ -97,7 +97,7 @@ def find_toolong_bonemorph(pmx: pmxstruct.Pmx):
 	toolong_list_morph = []
 	for d,m in enumerate(pmx.morphs):
 		try:
-			mb = core.encode_string_with_escape(m.name_jp)
+			mb = core.encode_string_with_escape(m.name_jp, "shift_jis")
 			if len(mb) > 15:
 				toolong_list_morph.append("%d[%d]" % (d, len(mb)))
 		except UnicodeEncodeError as e:
@@ -9,7 +9,8 @@ import csv
 import math
 import re
 import struct
-from os import path, listdir, getenv, makedirs
+import threading
+from os import path, listdir, getenv, makedirs, replace, remove, chmod, stat, getpid
 from sys import platform, version_info, version, exit
 
 
@@ -83,6 +84,9 @@ def basic_print(*args, is_progress=False) -> None:
 	:param is_progress: default false. if true, move the cursor to the beginning of THIS line after printing, so NEXT
 	print contents will overwrite this one.
 	"""
+	# background threads that muted themselves don't get to print anything
+	if _MUTED_THREADS and threading.get_ident() in _MUTED_THREADS:
+		return
 	the_string = ' '.join([str(x) for x in args])
 	# replace the print() function with this so i can replace this with the text redirector
 	if is_progress:
@@ -97,6 +101,18 @@ def basic_print(*args, is_progress=False) -> None:
 # global variable holding a function pointer that i can overwrite with a different function pointer when in GUI mode
 MY_PRINT_FUNC = basic_print
 
+# ids of the threads that should not print anything, see mute_this_thread()
+_MUTED_THREADS = set()
+def mute_this_thread(mute=True) -> None:
+	"""
+	Silence (or un-silence) everything the CURRENT thread prints with basic_print(). Meant for background threads,
+	like a PMX file being written while the main thread carries on, so their output doesn't get mixed into the rest.
+	
+	:param mute: true to silence, false to undo it
+	"""
+	if mute: _MUTED_THREADS.add(threading.get_ident())
+	else:    _MUTED_THREADS.discard(threading.get_ident())
+
 def pause_and_quit(message=None) -> None:
 	"""
 	CONSOLE FUNCTION: use input() to suspend until user presses ENTER, then die.
@@ -542,20 +558,47 @@ def write_bytes_to_binfile(dest_path:str, content:bytearray, quiet=False) -> Non
 	:param content: bytearray obj or bytes obj
 	:param quiet: by default, print the absolute path being written to. if this=True, don't do this.
 	"""
+	write_chunks_to_binfile(dest_path, [content], quiet=quiet)
+	return None
+
+def write_chunks_to_binfile(dest_path:str, chunks:Iterable[bytes], quiet=False) -> int:
+	"""
+	WRITE a BINARY file to disk from a sequence of bytes-like chunks, one after another.
+	The chunks can come from a generator, then each is written out as soon as it is made & the whole file never has
+	to exist in memory at once.
+	
+	:param dest_path: destination file path, as a string, relative from CWD or absolute
+	:param chunks: iterable of bytearray objs or bytes objs
+	:param quiet: by default, print the absolute path being written to. if this=True, don't do this.
+	:return: total number of bytes written
+	"""
 	dest_path = path.abspath(path.normpath(dest_path))
 	if not quiet:  # unless disabled, print the absolute path to the file being written
 		MY_PRINT_FUNC(dest_path)
 	if not path.exists(path.dirname(dest_path)):  # assert that the destination folder exists
 		MY_PRINT_FUNC("ERROR: unable to write binary file '%s', the containing folder(s) do not exist!" % dest_path)
 		raise RuntimeError()
+	# write into a temp file next to the destination & then rename it over the destination, so that nobody ever sees
+	# a half-written file (and a crash mid-write doesn't destroy the previous version)
+	temp_path = None
 	try:
-		with open(dest_path, "wb") as my_file:  # w = write, b = binary
-			my_file.write(content)  # plain old no-frills write
+		# unique per process & thread, and created with the normal permissions (unlike tempfile.mkstemp, which makes it private)
+		temp_path = "%s.%d.%d.tmp" % (dest_path, getpid(), threading.get_ident())
+		with open(temp_path, "xb") as my_file:  # x = create new, b = binary
+			my_file.writelines(chunks)  # plain old no-frills write
+			size = my_file.tell()
+		if path.exists(dest_path):  # overwriting a file keeps its permissions, same as writing into it directly
+			chmod(temp_path, stat(dest_path).st_mode & 0o7777)
+		replace(temp_path, dest_path)
+		temp_path = None
 	except IOError as e:
 		MY_PRINT_FUNC(e.__class__.__name__, e)
 		MY_PRINT_FUNC("ERROR: unable to write binary file '%s', maybe its a permissions issue?" % dest_path)
 		raise RuntimeError()
-	return None
+	finally:
+		# if anything went wrong (including whatever is producing the chunks), don't leave the temp file lying around
+		if temp_path is not None and path.exists(temp_path): remove(temp_path)
+	return size
 
 def read_binfile_to_bytes(src_path:str, quiet=False) -> bytearray:
 	"""
@@ -689,6 +732,34 @@ def binary_search_wherein(x: Any, a: Sequence[Any]) -> int:
 	"""
 	pos = bisect_left(a, x)  # find insertion position
 	return pos if pos != len(a) and a[pos] == x else -1  # don't walk off the end
+def delete_sorted_indices(a: list, del_idx: Sequence[int]) -> None:
+	"""
+	Remove every item at the indices in del_idx from list a, in-place. del_idx must be in ascending sorted order.
+	Popping one at a time shifts the whole tail of the list every time, which becomes quadratic when deleting
+	many items, so past a certain count the kept items are instead copied out in chunks & swapped back in.
+	"""
+	# containers with their own bulk delete (like PmxVertexStore) know best how to do it
+	if hasattr(a, "delete_many"):
+		a.delete_many(del_idx)
+		return
+	# a contiguous block (like all faces of one material) can be cut out directly
+	if isinstance(del_idx, range) and del_idx.step == 1:
+		del a[del_idx.start:del_idx.stop]
+		return
+	# for few deletions the memmove done by each pop is cheaper than copying the entire list
+	if len(del_idx) < 256:
+		for f in reversed(del_idx):
+			a.pop(f)
+		return
+	kept = []
+	prev = 0
+	for f in del_idx:
+		# copy the run of items between the previous deleted index and this one
+		kept.extend(a[prev:f])
+		prev = f + 1
+	kept.extend(a[prev:])
+	# slice-assign so that anything else holding a reference to this list sees the change
+	a[:] = kept
 
 
 ########################################################################################################################
@@ -1100,6 +1171,40 @@ UNPACKER_FAILED_TRANSLATE_FLAG = False
 # simple regex to find char "t" along with as many digits appear in front of it as possible
 t_fmt_pattern = r"\d*t"
 t_fmt_re = re.compile(t_fmt_pattern)
+# compiled struct.Struct objects & split-up "t" formats, keyed by the format string they were made from
+# the format strings are built from a handful of pieces (IDX_* etc) so these never grow very big
+_STRUCT_CACHE = {}
+_PACK_LAYOUT_CACHE = {}
+
+def get_struct(fmt: str) -> struct.Struct:
+	"""
+	Get the compiled little-endian struct.Struct for a format string (without the "<"), only compiled on first use.
+	Hot loops should fetch this once & call .pack()/.unpack_from() on it directly instead of going thru my_pack.
+	
+	:param fmt: string-type format argument for python "struct" lib, must not contain "t" atoms
+	:return: struct.Struct for "<" + fmt
+	"""
+	s = _STRUCT_CACHE.get(fmt)
+	if s is None:
+		s = struct.Struct("<" + fmt)
+		_STRUCT_CACHE[fmt] = s
+	return s
+
+def _get_pack_layout(fmt: str) -> tuple:
+	# internal use only: split fmt at its "t" atoms, only done once per format string
+	# returns (pieces_before_each_t_atom, t_atoms, piece_after_last_t_atom)
+	layout = _PACK_LAYOUT_CACHE.get(fmt)
+	if layout is None:
+		before = []
+		atoms = []
+		startfrom = 0
+		for t_atom in t_fmt_re.finditer(fmt):
+			before.append(fmt[startfrom:t_atom.start()])
+			atoms.append(t_atom.group())
+			startfrom = t_atom.end()
+		layout = (before, atoms, fmt[startfrom:])
+		_PACK_LAYOUT_CACHE[fmt] = layout
+	return layout
 
 
 # why do things with accessor functions? ¯\_(ツ)_/¯ cuz i want to
@@ -1109,16 +1214,21 @@ def reset_unpack():
 	UNPACKER_READFROM_BYTE = 0
 	UNPACKER_FAILED_TRANSLATE_DICT = {}
 def set_encoding(newencoding: str):
+	# this is shared by every thread, so only the PMX parser should change it (while holding its lock, a file might be
+	# written in the background); anything else should pass its encoding to encode/decode_*_with_escape() instead
 	global UNPACKER_ENCODING
 	UNPACKER_ENCODING = newencoding
 def get_readfrom_byte():
 	return UNPACKER_READFROM_BYTE
+def set_readfrom_byte(newpos: int):
+	global UNPACKER_READFROM_BYTE
+	UNPACKER_READFROM_BYTE = newpos
 def print_failed_decodes():
 	if len(UNPACKER_FAILED_TRANSLATE_DICT) != 0:
 		MY_PRINT_FUNC("List of all strings that failed to decode, plus their occurance rate")
 		MY_PRINT_FUNC(UNPACKER_FAILED_TRANSLATE_DICT)
 		
-def decode_bytes_with_escape(r: bytearray) -> str:
+def decode_bytes_with_escape(r: bytearray, encoding: str = None) -> str:
 	"""
 	Turns bytes into a string, with some special quirks. Reversible opposite of encode_string_with_escape().
 	In VMDs the text fields are truncated to a set # of bytes, so it's possible that they might be cut off
@@ -1129,20 +1239,22 @@ def decode_bytes_with_escape(r: bytearray) -> str:
 	All cases I tested require at most 1 escape char, but just to be safe it recursively calls as much as needed.
 	
 	:param r: bytearray object which represents a string through encoding UNPACKER_ENCODING
+	:param encoding: encoding to use instead of UNPACKER_ENCODING
 	:return: decoded string, possibly ending with escape char and hex digits
 	"""
 	global UNPACKER_FAILED_TRANSLATE_FLAG
+	if encoding is None: encoding = UNPACKER_ENCODING
 	try:
-		s = r.decode(UNPACKER_ENCODING)				# try to decode the whole string
+		s = r.decode(encoding)				# try to decode the whole string
 		return s
 	except UnicodeDecodeError:
 		UNPACKER_FAILED_TRANSLATE_FLAG = True
-		s = decode_bytes_with_escape(r[:-1])		# if it cant, decode everything but the last char
+		s = decode_bytes_with_escape(r[:-1], encoding)		# if it cant, decode everything but the last char
 		extra = r[-1]  								# this is the last byte that couldn't be decoded
 		s = "%s%s%x" % (s, UNPACKER_ESCAPE_CHAR, extra)
 		return s
 
-def encode_string_with_escape(a: str) -> bytearray:
+def encode_string_with_escape(a: str, encoding: str = None) -> bytearray:
 	"""
 	Turns a string into bytes, with some special quirks. Reversible opposite of decode_string_with_escape().
 	In VMDs the text fields are truncated to a set # of bytes, so it's possible that they might be cut off
@@ -1153,21 +1265,23 @@ def encode_string_with_escape(a: str) -> bytearray:
 	All cases I tested require at most 1 escape char, but just to be safe it recursively calls as much as needed.
 	
 	:param a: string that might contain my custom escape sequence
+	:param encoding: encoding to use instead of UNPACKER_ENCODING
 	:return: bytearray after encoding
 	"""
+	if encoding is None: encoding = UNPACKER_ENCODING
 	try:
 		if len(a) > 3:									# is it long enough to maybe contain an escape char?
 			if a[-3] == UNPACKER_ESCAPE_CHAR:			# check if 3rd from end is an escape char
-				n = encode_string_with_escape(a[0:-3])	# convert str before escape from str to bytearray
+				n = encode_string_with_escape(a[0:-3], encoding)	# convert str before escape from str to bytearray
 				n += bytearray.fromhex(a[-2:])			# convert hex after escape char to single byte and append
 				return n
-		return bytearray(a, UNPACKER_ENCODING)			# no escape char: convert from str to bytearray the standard way
+		return bytearray(a, encoding)			# no escape char: convert from str to bytearray the standard way
 	except UnicodeEncodeError:
 		# if the decode fails, I hope it is because the input string contains a fullwidth tilde, that's the only error i know how to handle
 		# NOTE: there are probably other things that can fail that I just dont know about yet
 		new_a = a.replace(u"\uFF5E", u"\u301c")			# replace "fullwidth tilde" with "wave dash", same as MMD does
 		try:
-			return bytearray(new_a, UNPACKER_ENCODING)	# no escape char: convert from str to bytearray the standard way
+			return bytearray(new_a, encoding)	# no escape char: convert from str to bytearray the standard way
 		except UnicodeEncodeError as e:
 			# overwrite the 'reason' field with the original string it was trying to encode
 			e.reason = a
@@ -1193,22 +1307,17 @@ def my_unpack(fmt:str, raw:bytearray) -> Any:
 	:return: if fmt specifies several variables, return all as list. if exactly one, return the variable without list wrapper.
 	"""
 	retlist = []
-	startfrom = 0
 	# first find where all "t" atoms in the format string are
-	t_atom_list = t_fmt_re.finditer(fmt)
-	for t_atom in t_atom_list:
+	fmt_before_list, t_atom_list, fmt_after = _get_pack_layout(fmt)
+	for fmt_before, fmt_t in zip(fmt_before_list, t_atom_list):
 		# fmt_before definitely does not contain t: parse as normal & return value
-		fmt_before = fmt[startfrom:t_atom.start()]  # fmt_before might be empty or blank, but that's handled inside the func
-		before_vars = _unpack_other(fmt_before, raw)
+		before_vars = _unpack_other(fmt_before, raw)  # fmt_before might be empty or blank, but that's handled inside the func
 		retlist.extend(before_vars)  # before_vars might be empty list but thats ok
 		# fmt_t contains a "t" atom, guaranteed not blank, it gets specially handled
-		fmt_t = fmt[t_atom.start():t_atom.end()]
 		t_str = _unpack_text(fmt_t, raw)
 		retlist.append(t_str)  # t_str guaranteed to exist and be a lone string
-		# repeat the process starting from the section after the "t" atom
-		startfrom = t_atom.end()
 	# when there are no more "t" atoms, all that remains gets handled by default unpacker
-	other_vars = _unpack_other(fmt[startfrom:], raw)
+	other_vars = _unpack_other(fmt_after, raw)
 	retlist.extend(other_vars)  # other_vars might be empty list but thats ok
 	# if it has length of 1, then de-listify it
 	if len(retlist) == 1: return retlist[0]
@@ -1227,9 +1336,9 @@ def _unpack_other(fmt:str, raw:bytearray) -> list:
 	if fmt == "" or fmt.isspace():
 		return []  # if fmt is emtpy then don't attempt to unpack
 	try:
-		autofmt = "<" + fmt
-		r = struct.unpack_from(autofmt, raw, UNPACKER_READFROM_BYTE)
-		UNPACKER_READFROM_BYTE += struct.calcsize(autofmt)	# increment the global read-from tracker
+		s = get_struct(fmt)
+		r = s.unpack_from(raw, UNPACKER_READFROM_BYTE)
+		UNPACKER_READFROM_BYTE += s.size	# increment the global read-from tracker
 	except Exception as e:
 		MY_PRINT_FUNC(e.__class__.__name__, e)
 		MY_PRINT_FUNC("unpack_other")
@@ -1308,13 +1417,14 @@ def my_pack(fmt: str, args_in: Any) -> bytearray:
 	else:
 		args = [args_in]					# if given lone arg, wrap it with a list
 	
+	# first find where all "t" atoms in the format string are (cached per format string)
+	fmt_before_list, t_atom_list, fmt_after = _get_pack_layout(fmt)
+	if not t_atom_list:
+		# no strings at all, which is most calls: skip straight to the packing
+		return _pack_other(fmt_after, args)
+	
 	retbytes = bytearray()
-	startfrom = 0
 	startfrom_args = 0
-	
-	# first find where all "t" atoms in the format string are
-	# (note: returns an iterator, to get its length I need to walk the whole thing and then convert to list)
-	t_atom_list = [t for t in t_fmt_re.finditer(fmt)]
 	# then find where all strings in the input args list are
 	str_idx_list = [d for d,a in enumerate(args) if isinstance(a, str)]
 	# assert that they are the same length
@@ -1322,20 +1432,17 @@ def my_pack(fmt: str, args_in: Any) -> bytearray:
 		raise RuntimeError("given format string '%s' references %d strings, found %d in args list" %
 						   (fmt, len(t_atom_list), len(str_idx_list)))
 	
-	for t_atom, str_idx in zip(t_atom_list, str_idx_list):
+	for fmt_before, fmt_t, str_idx in zip(fmt_before_list, t_atom_list, str_idx_list):
 		# fmt_before definitely does not contain t: parse as normal & return value
-		fmt_before = fmt[startfrom:t_atom.start()]  # fmt_before might be empty or blank, but that's handled inside the func
-		bytes_before = _pack_other(fmt_before, args[startfrom_args:str_idx])
+		bytes_before = _pack_other(fmt_before, args[startfrom_args:str_idx])  # fmt_before might be empty or blank, but that's handled inside the func
 		retbytes += bytes_before  # bytes_before might be empty but thats ok
 		# fmt_t contains a "t" atom, guaranteed not blank, it gets specially handled
-		fmt_t = fmt[t_atom.start():t_atom.end()]
 		bytes_t = _pack_text(fmt_t, args[str_idx])  # guaranteed to return non-empty
 		retbytes += bytes_t
 		# repeat the process starting from the section after the "t" atom
-		startfrom = t_atom.end()
 		startfrom_args = str_idx + 1
 	# when there are no more "t" atoms, all that remains gets handled by default packer
-	ret_other = _pack_other(fmt[startfrom:], args[startfrom_args:])
+	ret_other = _pack_other(fmt_after, args[startfrom_args:])
 	retbytes += ret_other
 
 	return retbytes
@@ -1352,8 +1459,7 @@ def _pack_other(fmt: str, args: list) -> bytearray:
 	if not args or fmt == "" or fmt.isspace():
 		return bytearray()  # if fmt is emtpy or args is empty then don't attempt to pack
 	try:
-		b = struct.pack("<" + fmt, *args)	# now do the actual packing
-		return bytearray(b)
+		return bytearray(get_struct(fmt).pack(*args))	# now do the actual packing
 	except Exception as e:
 		MY_PRINT_FUNC(e.__class__.__name__, e)
 		MY_PRINT_FUNC("pack_other")
@@ -1374,15 +1480,11 @@ def _pack_text(fmt: str, args: str) -> bytearray:
 	try:
 		n = encode_string_with_escape(args)		# convert str to bytearray
 		if fmt == "t":			# auto-text
-			# "t" means "i ##s" where ##=i. convert to bytearray, measure len, replace t with "i ##s"
-			autofmt = "<i" + str(len(n)) + "s"
-			autoargs = [len(n), n]
+			# "t" means "i ##s" where ##=i, so that's just the length followed by the bytes themselves
+			return bytearray(get_struct("i").pack(len(n))) + n
 		else:					# manual-text
-			autofmt = "<" + fmt[0:-1] + "s"		# simply replace trailing t with s
-			autoargs = [n]
-		
-		b = struct.pack(autofmt, *autoargs)		# now do the actual packing
-		return bytearray(b)
+			# simply replace trailing t with s, this pads with nulls or truncates to the given size
+			return bytearray(get_struct(fmt[0:-1] + "s").pack(n))
 	except Exception as e:
 		MY_PRINT_FUNC(e.__class__.__name__, e)
 		MY_PRINT_FUNC("pack_text")
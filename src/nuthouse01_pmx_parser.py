@@ -9,8 +9,20 @@
 
 # this file fully parses a PMX file and returns all of the data it contained, structured as a list of lists
 # first, system imports
-from typing import List
+from typing import List, Union, Tuple
+import gc
+import hashlib
+import json
 import math
+import os
+import pickle
+import struct
+import threading
+try:
+	# only needed for reading/writing the optional columnar vertex store
+	import numpy as np
+except ImportError:
+	np = None
 
 # second, wrap custom imports with a try-except to catch it if files are missing
 try:
@@ -54,6 +66,16 @@ ENCODE_PERCENT_MORPH = 0
 # flag to indicate whether more info is desired or not
 PMX_MOREINFO = False
 
+# persistent cache of parsed models, see "persistent parse cache" section below
+# when true, read_pmx() remembers every model it parses & skips the parsing next time if the file is unchanged
+PMX_CACHE_ENABLED = True
+# when the cache folder grows beyond this many bytes, the least recently used entries are deleted
+PMX_CACHE_MAX_BYTES = 512 * 1024 * 1024
+
+# reading & writing both go through the module-level state below (IDX_*, ENCODE_PERCENT_*, the unpacker position
+#    in core), so only one read_pmx/write_pmx may run at a time. this matters once files are written in the background.
+_PMX_IO_LOCK = threading.RLock()
+
 
 # how many extra vec4s each vertex has with it
 ADDL_VERTEX_VEC4 = 0
@@ -136,63 +158,146 @@ def parse_pmx_header(raw: bytearray) -> pmxstruct.PmxHeader:
 								comment_jp=comment_jp, comment_en=comment_en)
 	# return retme
 
-def parse_pmx_vertices(raw: bytearray) -> List[pmxstruct.PmxVertex]:
+def parse_pmx_vertices(raw: bytearray, columnar=False) -> Union[List[pmxstruct.PmxVertex], pmxstruct.PmxVertexStore]:
 	# first item is int, how many vertices
 	i = core.my_unpack("i", raw)
 	if PMX_MOREINFO: core.MY_PRINT_FUNC("...# of verts            =", i)
-	retme = []
+	# every vertex is [8f] [addl 4f]*N [b weighttype] [weights] [f edgescale], and only the weights vary in size
+	# so instead of 5+ my_unpack calls per vertex, first walk the weighttype tags to find runs of vertices that all
+	# have the same type, then decode each run in one go with a precompiled struct. this is MUCH faster on big models.
 	bdef1_fmt = IDX_BONE
 	bdef2_fmt = "2%s f" % IDX_BONE
 	bdef4_fmt = "4%s 4f" % IDX_BONE
 	sdef_fmt =  "2%s 10f" % IDX_BONE
 	qdef_fmt =  bdef4_fmt
-	for d in range(i):
-		# first, basic stuff
-		(posX, posY, posZ, normX, normY, normZ, u, v) = core.my_unpack("8f", raw)
-		# then, some number of vec4s (probably none)
-		addl_vec4s = []
-		for z in range(ADDL_VERTEX_VEC4):
-			this_vec4 = core.my_unpack("4f", raw) # already returns as a list of 4 floats, no need to unpack then repack
-			addl_vec4s.append(this_vec4)
-		weighttype = core.my_unpack("b", raw)
-		weights = []
-		weight_sdef = []
-		if weighttype == 0:
-			# BDEF1
-			b1 = core.my_unpack(bdef1_fmt, raw)
-			weights = [b1]
-		elif weighttype == 1:
-			# BDEF2
-			#(b1, b2, b1w) # already returns as a list of floats, no need to unpack then repack
-			weights = core.my_unpack(bdef2_fmt, raw)
-		elif weighttype == 2:
-			# BDEF4
-			#(b1, b2, b3, b4, b1w, b2w, b3w, b4w) # already returns as a list of floats, no need to unpack then repack
-			weights = core.my_unpack(bdef4_fmt, raw)
-		elif weighttype == 3:
-			# SDEF
-			#(b1, b2, b1w, c1, c2, c3, r01, r02, r03, r11, r12, r13)
-			(b1, b2, b1w, c1, c2, c3, r01, r02, r03, r11, r12, r13) = core.my_unpack(sdef_fmt, raw)
-			weights = [b1, b2, b1w]
-			weight_sdef = [[c1, c2, c3], [r01, r02, r03], [r11, r12, r13]]
-		elif weighttype == 4:
-			# it must be using QDEF, a type only for PMX v2.1 which I dont need to support so idgaf
-			# (b1, b2, b3, b4, b1w, b2w, b3w, b4w)
-			weights = core.my_unpack(qdef_fmt, raw)
+	head_fmt = "8f" + (" 4f" * ADDL_VERTEX_VEC4) + " b"
+	weight_fmts = {0: bdef1_fmt, 1: bdef2_fmt, 2: bdef4_fmt, 3: sdef_fmt, 4: qdef_fmt}
+	# weighttype -> struct for the entire vertex record
+	vert_structs = {k: struct.Struct("<" + head_fmt + " " + v + " f") for (k,v) in weight_fmts.items()}
+	# offset of the weighttype byte within one vertex record
+	tag_offset = struct.calcsize("<" + head_fmt) - 1
+	
+	# pass 1: scan the tags, collect runs as [weighttype, start_byte, count]
+	runs = []
+	pos = core.get_readfrom_byte()
+	try:
+		for d in range(i):
+			weighttype = struct.unpack_from("<b", raw, pos + tag_offset)[0]
+			if weighttype in vert_structs:
+				size = vert_structs[weighttype].size
+			else:
+				# invalid type: treat it like the old parser did, as having no weights at all
+				core.MY_PRINT_FUNC("invalid weight type for vertex", weighttype)
+				size = tag_offset + 1 + 4
+			# never merge vertices with an invalid type: their records are a different size than runs of that type expect
+			if runs and runs[-1][0] == weighttype and weighttype in vert_structs: runs[-1][2] += 1
+			else: runs.append([weighttype, pos, 1])
+			pos += size
+		if pos > len(raw): raise struct.error("vertex block runs past the end of the file")
+	except struct.error as e:
+		core.MY_PRINT_FUNC(e.__class__.__name__, e)
+		core.MY_PRINT_FUNC("parse_pmx_vertices")
+		raise RuntimeError("err=" + str(e) + "\nbytepos=" + str(pos))
+	
+	# pass 2: decode each run in bulk
+	if columnar:
+		retme = pmxstruct.PmxVertexStore(i)
+		_decode_vertex_runs_columnar(raw, runs, head_fmt, retme)
+		core.set_readfrom_byte(pos)
+		return retme
+	retme = []
+	view = memoryview(raw)
+	nvec = ADDL_VERTEX_VEC4
+	wstart = 9 + (4 * nvec)  # index of the first weight value within the unpacked tuple
+	# building 100k+ small lists makes the cyclic garbage collector kick in over & over for nothing (none of these can
+	# form cycles), which costs more than the actual decoding. so pause it while building & restore it afterwards
+	gc_was_enabled = gc.isenabled()
+	gc.disable()
+	try:
+		_decode_vertex_runs(raw, view, runs, vert_structs, head_fmt, nvec, wstart, retme)
+	finally:
+		if gc_was_enabled: gc.enable()
+	view.release()
+	core.set_readfrom_byte(pos)
+	return retme
+
+def _decode_vertex_runs(raw: bytearray, view: memoryview, runs: list, vert_structs: dict, head_fmt: str,
+						nvec: int, wstart: int, retme: List[pmxstruct.PmxVertex]) -> None:
+	# internal use only: helper for parse_pmx_vertices(), appends the decoded vertices of all runs onto retme
+	PosList = pmxstruct._PosList  # what PmxVertex.pos would turn the list into anyway, saves copying it
+	for (weighttype, start, count) in runs:
+		if weighttype in vert_structs:
+			vstruct = vert_structs[weighttype]
+			chunk = vstruct.iter_unpack(view[start:start + (count * vstruct.size)])
 		else:
-			core.MY_PRINT_FUNC("invalid weight type for vertex", weighttype)
-		# then there is one final float after the weight crap
-		edgescale = core.my_unpack("f", raw)
+			vstruct = struct.Struct("<" + head_fmt + " f")
+			chunk = [vstruct.unpack_from(raw, start)]  # runs of invalid types always have length 1, see pass 1
+		for r in chunk:
+			addl_vec4s = [list(r[8 + (4 * z):12 + (4 * z)]) for z in range(nvec)]
+			weight_sdef = []
+			if weighttype == 0:		weights = [r[wstart]]					# BDEF1
+			elif weighttype == 1:	weights = list(r[wstart:wstart + 3])	# BDEF2: (b1, b2, b1w)
+			elif weighttype == 2:	weights = list(r[wstart:wstart + 8])	# BDEF4: (b1, b2, b3, b4, b1w, b2w, b3w, b4w)
+			elif weighttype == 3:
+				# SDEF: (b1, b2, b1w, c1, c2, c3, r01, r02, r03, r11, r12, r13)
+				weights = list(r[wstart:wstart + 3])
+				weight_sdef = [list(r[wstart + 3:wstart + 6]), list(r[wstart + 6:wstart + 9]), list(r[wstart + 9:wstart + 12])]
+			elif weighttype == 4:	weights = list(r[wstart:wstart + 8])	# QDEF (v2.1 only), same layout as BDEF4
+			else:					weights = []
+			# assemble all the info into a struct for returning
+			thisvert = pmxstruct.PmxVertex(pos=PosList((r[0], r[1], r[2])), norm=[r[3], r[4], r[5]], uv=[r[6], r[7]],
+										   weighttype=weighttype, weight=weights, weight_sdef=weight_sdef,
+										   edgescale=r[-1], addl_vec4s=addl_vec4s)
+			retme.append(thisvert)
+		# display progress printouts, once per run instead of once per vertex
+		core.print_progress_oneline((start + (count * vstruct.size)) / len(raw))
 
-		# display progress printouts
-		core.print_progress_oneline(core.get_readfrom_byte() / len(raw))
-		# assemble all the info into a struct for returning
-		thisvert = pmxstruct.PmxVertex(pos=[posX, posY, posZ], norm=[normX, normY, normZ], uv=[u, v],
-									   weighttype=weighttype, weight=weights, weight_sdef=weight_sdef,
-									   edgescale=edgescale, addl_vec4s=addl_vec4s)
-		
-		retme.append(thisvert)
-	return retme
+# IDX_* format char -> numpy dtype of the same size
+_NP_IDX_DTYPES = {"B": "u1", "H": "<u2", "b": "i1", "h": "<i2", "i": "<i4"}
+
+def _vertex_run_dtype(weighttype: int, nvec: int):
+	# internal use only: numpy structured dtype for one vertex record with the given weighttype, must match the
+	# struct format strings used in parse_pmx_vertices() exactly. numpy packs these without any padding
+	bone_dt = _NP_IDX_DTYPES[IDX_BONE]
+	fields = [("head", "<f4", (8,))]
+	if nvec: fields.append(("addl", "<f4", (nvec, 4)))
+	fields.append(("wt", "i1"))
+	if weighttype == 0:
+		fields += [("bones", bone_dt, (1,))]
+	elif weighttype in (1, 3):
+		fields += [("bones", bone_dt, (2,)), ("weights", "<f4", (1,))]
+		if weighttype == 3: fields.append(("sdef", "<f4", (3, 3)))
+	elif weighttype in (2, 4):
+		fields += [("bones", bone_dt, (4,)), ("weights", "<f4", (4,))]
+	fields.append(("edge", "<f4"))
+	return np.dtype(fields)
+
+def _decode_vertex_runs_columnar(raw: bytearray, runs: list, head_fmt: str, store: pmxstruct.PmxVertexStore) -> None:
+	# internal use only: helper for parse_pmx_vertices(), fills the store straight from the file bytes
+	nvec = ADDL_VERTEX_VEC4
+	store._reserve(sum(r[2] for r in runs))
+	for (weighttype, start, count) in runs:
+		a = store._n
+		b = a + count
+		store._addl.extend([None] * count)
+		store._n = b
+		rec = np.frombuffer(raw, dtype=_vertex_run_dtype(weighttype, nvec), count=count, offset=start)
+		store._pos[a:b] = rec["head"][:, 0:3]
+		store._norm[a:b] = rec["head"][:, 3:6]
+		store._uv[a:b] = rec["head"][:, 6:8]
+		store._weighttype[a:b] = rec["wt"]
+		store._edgescale[a:b] = rec["edge"]
+		if "bones" in rec.dtype.names:
+			store._bones[a:b, :rec["bones"].shape[1]] = rec["bones"]
+		if "weights" in rec.dtype.names:
+			store._weights[a:b, :rec["weights"].shape[1]] = rec["weights"]
+		if "sdef" in rec.dtype.names:
+			store._sdef[a:b] = rec["sdef"]
+			store._has_sdef[a:b] = True
+		if nvec:
+			store._addl[a:b] = rec["addl"].astype(np.float64).tolist()
+		# display progress printouts, once per run instead of once per vertex
+		core.print_progress_oneline((start + (count * rec.dtype.itemsize)) / len(raw))
 
 def parse_pmx_surfaces(raw: bytearray) -> List[List[int]]:
 	# surfaces is just another name for faces
@@ -539,7 +644,10 @@ def encode_pmx_lookahead(thispmx: pmxstruct.Pmx) -> tuple:
 	# takes the ENTIRE pmx list-form as its input, not juse one section
 	# need to do some lookahead scanning before I can properly begin with the header and whatnot
 	# specifically i need to get the "addl vec4 per vertex" and count the # of each type of thing
-	addl_vec4s = max(len(v.addl_vec4s) for v in thispmx.verts)
+	if isinstance(thispmx.verts, pmxstruct.PmxVertexStore):
+		addl_vec4s = max([len(a) for a in thispmx.verts._addl if a] + [0])
+	else:
+		addl_vec4s = max(len(v.addl_vec4s) for v in thispmx.verts)
 	num_verts = len(thispmx.verts)
 	num_tex = len(thispmx.textures)
 	num_mat = len(thispmx.materials)
@@ -592,64 +700,99 @@ def encode_pmx_header(nice: pmxstruct.PmxHeader, lookahead: tuple) -> bytearray:
 	out += core.my_pack("t t t t", [nice.name_jp, nice.name_en, nice.comment_jp, nice.comment_en])
 	return out
 
-def encode_pmx_vertices(nice: List[pmxstruct.PmxVertex]) -> bytearray:
+def encode_pmx_vertices(nice: Union[List[pmxstruct.PmxVertex], pmxstruct.PmxVertexStore]) -> bytearray:
 	# first item is int, how many vertices
 	i = len(nice)
 	out = core.my_pack("i", i)
 	if PMX_MOREINFO: core.MY_PRINT_FUNC("...# of verts            =", i)
+	if isinstance(nice, pmxstruct.PmxVertexStore):
+		out += _encode_vertex_store(nice)
+		return out
 	# [posX, posY, posZ, normX, normY, normZ, u, v, addl_vec4s, weighttype, weights, edgescale]
+	# weights = vert[10]
+	# 0 = BDEF1 = [b1]
+	# 1 = BDEF2 = [b1, b2, b1w]
+	# 2 = BDEF4 = [b1, b2, b3, b4, b1w, b2w, b3w, b4w]
+	# 3 = sdef =  [b1, b2, b1w] + weight_sdef = [[c1, c2, c3], [r01, r02, r03], [r11, r12, r13]]
+	# 4 = qdef =  [b1, b2, b3, b4, b1w, b2w, b3w, b4w]  (only in pmx v2.1)
 	bdef1_fmt = IDX_BONE
 	bdef2_fmt = "2%s f" % IDX_BONE
 	bdef4_fmt = "4%s 4f" % IDX_BONE
 	sdef_fmt =  "2%s 10f" % IDX_BONE
 	qdef_fmt =  bdef4_fmt
+	nvec = ADDL_VERTEX_VEC4
+	head_fmt = "8f" + (" 4f" * nvec) + " b"
+	weight_fmts = {0: bdef1_fmt, 1: bdef2_fmt, 2: bdef4_fmt, 3: sdef_fmt, 4: qdef_fmt}
+	# weighttype -> struct for the entire vertex record, same as when parsing. invalid types are written without weights
+	vert_structs = {k: core.get_struct(head_fmt + " " + v + " f") for (k,v) in weight_fmts.items()}
+	bad_struct = core.get_struct(head_fmt + " f")
+	# every vertex record has a known size, so measure them all first & then pack straight into one preallocated buffer
+	sizes = [vert_structs.get(vert.weighttype, bad_struct).size for vert in nice]
+	start = len(out)
+	out.extend(bytes(sum(sizes)))
+	offset = start
+	# structure it like this so even if a user modifies the vec4s incorrectly it will still write fine
+	addl_pad = [[0, 0, 0, 0]] * nvec
 	for d, vert in enumerate(nice):
-		# first, basic stuff
-		packme = vert.pos + vert.norm + vert.uv  # concat these
-		out += core.my_pack("8f", packme)
-		# then, some number of vec4s (probably none)
-		# structure it like this so even if a user modifies the vec4s incorrectly it will still write fine
-		for z in range(ADDL_VERTEX_VEC4):
-			try:				out += core.my_pack("4f", vert.addl_vec4s[z])
-			except IndexError:	out += core.my_pack("4f", [0, 0, 0, 0])
-		
-		out += core.my_pack("b", vert.weighttype)
-		# weights = vert[10]
-		# 0 = BDEF1 = [b1]
-		# 1 = BDEF2 = [b1, b2, b1w]
-		# 2 = BDEF4 = [b1, b2, b3, b4, b1w, b2w, b3w, b4w]
-		# 3 = sdef =  [b1, b2, b1w] + weight_sdef = [[c1, c2, c3], [r01, r02, r03], [r11, r12, r13]]
-		# 4 = qdef =  [b1, b2, b3, b4, b1w, b2w, b3w, b4w]  (only in pmx v2.1)
-
-		if vert.weighttype == 0:
-			# BDEF1
-			out += core.my_pack(bdef1_fmt, vert.weight)
-		elif vert.weighttype == 1:
-			# BDEF2
-			# (b1, b2, b1w)
-			out += core.my_pack(bdef2_fmt, vert.weight)
-		elif vert.weighttype == 2:
-			# BDEF4
-			# (b1, b2, b3, b4, b1w, b2w, b3w, b4w)
-			out += core.my_pack(bdef4_fmt, vert.weight)
-		elif vert.weighttype == 3:
-			# SDEF
-			# ([b1, b2, b1w], [c1, c2, c3], [r01, r02, r03], [r11, r12, r13])
-			packme = vert.weight + core.flatten(vert.weight_sdef)
-			out += core.my_pack(sdef_fmt, packme)
-		elif vert.weighttype == 4:
-			# it must be using QDEF, a type only for PMX v2.1 which I dont need to support so idgaf
-			# (b1, b2, b3, b4, b1w, b2w, b3w, b4w)
-			out += core.my_pack(qdef_fmt, vert.weight)
-		else:
-			core.MY_PRINT_FUNC("invalid weight type for vertex", vert.weighttype)
-			
-		# then there is one final float after the weight crap
-		out += core.my_pack("f", vert.edgescale)
+		addl = [c for vec in (list(vert.addl_vec4s) + addl_pad)[:nvec] for c in vec] if nvec else ()
+		vstruct = vert_structs.get(vert.weighttype)
+		try:
+			if vstruct is None:
+				core.MY_PRINT_FUNC("invalid weight type for vertex", vert.weighttype)
+				bad_struct.pack_into(out, offset, *vert.pos, *vert.norm, *vert.uv, *addl, vert.weighttype, vert.edgescale)
+			elif vert.weighttype == 3:
+				# SDEF
+				# ([b1, b2, b1w], [c1, c2, c3], [r01, r02, r03], [r11, r12, r13])
+				vstruct.pack_into(out, offset, *vert.pos, *vert.norm, *vert.uv, *addl, vert.weighttype,
+								  *vert.weight, *core.flatten(vert.weight_sdef), vert.edgescale)
+			else:
+				vstruct.pack_into(out, offset, *vert.pos, *vert.norm, *vert.uv, *addl, vert.weighttype,
+								  *vert.weight, vert.edgescale)
+		except (struct.error, TypeError) as e:
+			core.MY_PRINT_FUNC(e.__class__.__name__, e)
+			core.MY_PRINT_FUNC("encode_pmx_vertices")
+			raise RuntimeError("err=" + str(e) + "\nvertex=" + str(d) + "\nargs=" + str(vert))
+		offset += sizes[d]
 		# display progress printouts
-		core.print_progress_oneline(ENCODE_PERCENT_VERT * d / i)
+		if not d & 0x3FF: core.print_progress_oneline(ENCODE_PERCENT_VERT * d / i)
 	return out
 
+def _encode_vertex_store(store: pmxstruct.PmxVertexStore) -> bytearray:
+	# internal use only: helper for encode_pmx_vertices(), packs each run of same-weighttype vertices in one go
+	out = bytearray()
+	n = len(store)
+	if n == 0: return out
+	nvec = ADDL_VERTEX_VEC4
+	wt = store.weighttype
+	# same range check that struct.pack would do for us otherwise
+	bone_info = np.iinfo(_NP_IDX_DTYPES[IDX_BONE])
+	if (store.bones.min() < bone_info.min or store.bones.max() > bone_info.max):
+		raise RuntimeError("bone index out of range for index type '%s' while encoding vertices" % IDX_BONE)
+	bounds = [0] + (np.flatnonzero(wt[1:] != wt[:-1]) + 1).tolist() + [n]
+	for a, b in zip(bounds[:-1], bounds[1:]):
+		weighttype = int(wt[a])
+		if not (0 <= weighttype <= 4):
+			core.MY_PRINT_FUNC("invalid weight type for vertex", weighttype)
+		rec = np.zeros(b - a, dtype=_vertex_run_dtype(weighttype, nvec))
+		rec["head"][:, 0:3] = store.pos[a:b]
+		rec["head"][:, 3:6] = store.norm[a:b]
+		rec["head"][:, 6:8] = store.uv[a:b]
+		if nvec:
+			# structure it like this so even if a user modifies the vec4s incorrectly it will still write fine
+			for d, addl in enumerate(store._addl[a:b]):
+				for z, vec in enumerate((addl or [])[:nvec]): rec["addl"][d, z] = vec
+		rec["wt"] = weighttype
+		if "bones" in rec.dtype.names:
+			rec["bones"] = store.bones[a:b, :rec["bones"].shape[1]]
+		if "weights" in rec.dtype.names:
+			rec["weights"] = store.weights[a:b, :rec["weights"].shape[1]]
+		if "sdef" in rec.dtype.names:
+			rec["sdef"] = store.sdef[a:b]
+		rec["edge"] = store.edgescale[a:b]
+		out += rec.tobytes()
+		# display progress printouts
+		core.print_progress_oneline(ENCODE_PERCENT_VERT * b / n)
+	return out
 def encode_pmx_surfaces(nice: list) -> bytearray:
 	# surfaces is just another name for faces
 	# first item is int, how many !vertex indices! there are, NOT the actual number of faces
@@ -657,11 +800,21 @@ def encode_pmx_surfaces(nice: list) -> bytearray:
 	i = len(nice)
 	out = core.my_pack("i", i * 3)
 	if PMX_MOREINFO: core.MY_PRINT_FUNC("...# of faces            =", i)
+	face_struct = core.get_struct("3" + IDX_VERT)
+	# every face is the same size, so pack straight into one preallocated buffer
+	offset = len(out)
+	out.extend(bytes(face_struct.size * i))
 	for d, face in enumerate(nice):
 		# each entry is a group of 3 vertex indeces that make a face
-		out += core.my_pack("3" + IDX_VERT, face)
+		try:
+			face_struct.pack_into(out, offset, *face)
+		except (struct.error, TypeError) as e:
+			core.MY_PRINT_FUNC(e.__class__.__name__, e)
+			core.MY_PRINT_FUNC("encode_pmx_surfaces")
+			raise RuntimeError("err=" + str(e) + "\nfmt=3" + IDX_VERT + "\nface=" + str(d) + "\nargs=" + str(face))
+		offset += face_struct.size
 		# display progress printouts
-		core.print_progress_oneline(ENCODE_PERCENT_VERT + (ENCODE_PERCENT_FACE * d / i))
+		if not d & 0xFFF: core.print_progress_oneline(ENCODE_PERCENT_VERT + (ENCODE_PERCENT_FACE * d / i))
 	return out
 
 def encode_pmx_textures(nice: list) -> bytearray:
@@ -782,46 +935,59 @@ def encode_pmx_morphs(nice: List[pmxstruct.PmxMorph]) -> bytearray:
 	fmt_morph_uv = "%s 4f" % IDX_VERT
 	fmt_morph_mat = "%s b 4f 3f    f 3f 4f f    4f 4f 4f" % IDX_MAT
 	fmt_morph_impulse = "%s b 3f 3f" % IDX_RB
+	# morph items are by far the most numerous thing after verts & faces, so pack them with precompiled structs
+	pack_group = core.get_struct(fmt_morph_group).pack
+	pack_flip = core.get_struct(fmt_morph_flip).pack
+	pack_vert = core.get_struct(fmt_morph_vert).pack
+	pack_bone = core.get_struct(fmt_morph_bone).pack
+	pack_uv = core.get_struct(fmt_morph_uv).pack
+	pack_mat = core.get_struct(fmt_morph_mat).pack
+	pack_impulse = core.get_struct(fmt_morph_impulse).pack
 	for d, morph in enumerate(nice):
 		# (name_jp, name_en, panel, morphtype, itemcount)
 		out += core.my_pack(fmt_morph, [morph.name_jp, morph.name_en, morph.panel, morph.morphtype, len(morph.items)])
-		
-		for z in morph.items:
-			# for each morph in the group morph, or vertex in the vertex morph, or bone in the bone morph....
-			# what to unpack varies on morph type, 9 possibilities + some for v2.1
-			if morph.morphtype == 0:  # group
-				z: pmxstruct.PmxMorphItemGroup
-				out += core.my_pack(fmt_morph_group, [z.morph_idx, z.value])
-			elif morph.morphtype == 1:  # vertex
-				z: pmxstruct.PmxMorphItemVertex
-				out += core.my_pack(fmt_morph_vert, [z.vert_idx, *z.move])
-			elif morph.morphtype == 2:  # bone
-				z: pmxstruct.PmxMorphItemBone
-				(rotqW, rotqX, rotqY, rotqZ) = core.euler_to_quaternion(z.rot)
-				# (bone_idx, transX, transY, transZ, rotqX, rotqY, rotqZ, rotqW)
-				out += core.my_pack(fmt_morph_bone, [z.bone_idx, *z.move, rotqX, rotqY, rotqZ, rotqW])
-			elif 3 <= morph.morphtype <= 7:  # UV
-				z: pmxstruct.PmxMorphItemUV
-				# what these values do depends on the UV layer they are affecting, but the docs dont say what...
-				# oh well, i dont need to use them so i dont care :)
-				out += core.my_pack(fmt_morph_uv, [z.vert_idx, *z.move])
-			elif morph.morphtype == 8:  # material
-				z: pmxstruct.PmxMorphItemMaterial
-				# (mat_idx, is_add, diffR, diffG, diffB, diffA, specR, specG, specB) = core.unpack(IDX_MAT+"b 4f 3f", raw)
-				# (specpower, ambR, ambG, ambB, edgeR, edgeG, edgeB, edgeA, edgesize) = core.unpack("f 3f 4f f", raw)
-				# (texR, texG, texB, texA, sphR, sphG, sphB, sphA, toonR, toonG, toonB, toonA) = core.unpack("4f 4f 4f", raw)
-				packme = [z.mat_idx, z.is_add, *z.diffRGB, z.alpha, *z.specRGB, z.specpower, *z.ambRGB, *z.edgeRGB,
-						  z.edgealpha, z.edgesize, *z.texRGBA, *z.sphRGBA, *z.toonRGBA]
-				out += core.my_pack(fmt_morph_mat, packme)
-			elif morph.morphtype == 9:  # (2.1 only) flip
-				z: pmxstruct.PmxMorphItemFlip
-				out += core.my_pack(fmt_morph_flip, [z.morph_idx, z.value])
-			elif morph.morphtype == 10:  # (2.1 only) impulse
-				z: pmxstruct.PmxMorphItemImpulse
-				# (rb_idx, is_local, movX, movY, movZ, rotX, rotY, rotZ)
-				out += core.my_pack(fmt_morph_impulse, [z.rb_idx, z.is_local, *z.move, *z.rot])
-			else:
-				core.MY_PRINT_FUNC("unsupported morph type value", morph.morphtype)
+		try:
+			for z in morph.items:
+				# for each morph in the group morph, or vertex in the vertex morph, or bone in the bone morph....
+				# what to unpack varies on morph type, 9 possibilities + some for v2.1
+				if morph.morphtype == 0:  # group
+					z: pmxstruct.PmxMorphItemGroup
+					out += pack_group(z.morph_idx, z.value)
+				elif morph.morphtype == 1:  # vertex
+					z: pmxstruct.PmxMorphItemVertex
+					out += pack_vert(z.vert_idx, *z.move)
+				elif morph.morphtype == 2:  # bone
+					z: pmxstruct.PmxMorphItemBone
+					(rotqW, rotqX, rotqY, rotqZ) = core.euler_to_quaternion(z.rot)
+					# (bone_idx, transX, transY, transZ, rotqX, rotqY, rotqZ, rotqW)
+					out += pack_bone(z.bone_idx, *z.move, rotqX, rotqY, rotqZ, rotqW)
+				elif 3 <= morph.morphtype <= 7:  # UV
+					z: pmxstruct.PmxMorphItemUV
+					# what these values do depends on the UV layer they are affecting, but the docs dont say what...
+					# oh well, i dont need to use them so i dont care :)
+					out += pack_uv(z.vert_idx, *z.move)
+				elif morph.morphtype == 8:  # material
+					z: pmxstruct.PmxMorphItemMaterial
+					# (mat_idx, is_add, diffR, diffG, diffB, diffA, specR, specG, specB) = core.unpack(IDX_MAT+"b 4f 3f", raw)
+					# (specpower, ambR, ambG, ambB, edgeR, edgeG, edgeB, edgeA, edgesize) = core.unpack("f 3f 4f f", raw)
+					# (texR, texG, texB, texA, sphR, sphG, sphB, sphA, toonR, toonG, toonB, toonA) = core.unpack("4f 4f 4f", raw)
+					packme = [z.mat_idx, z.is_add, *z.diffRGB, z.alpha, *z.specRGB, z.specpower, *z.ambRGB, *z.edgeRGB,
+							  z.edgealpha, z.edgesize, *z.texRGBA, *z.sphRGBA, *z.toonRGBA]
+					out += pack_mat(*packme)
+				elif morph.morphtype == 9:  # (2.1 only) flip
+					z: pmxstruct.PmxMorphItemFlip
+					out += pack_flip(z.morph_idx, z.value)
+				elif morph.morphtype == 10:  # (2.1 only) impulse
+					z: pmxstruct.PmxMorphItemImpulse
+					# (rb_idx, is_local, movX, movY, movZ, rotX, rotY, rotZ)
+					out += pack_impulse(z.rb_idx, z.is_local, *z.move, *z.rot)
+				else:
+					core.MY_PRINT_FUNC("unsupported morph type value", morph.morphtype)
+		except (struct.error, TypeError) as e:
+			core.MY_PRINT_FUNC(e.__class__.__name__, e)
+			core.MY_PRINT_FUNC("encode_pmx_morphs")
+			# repackage the error to add additional info and throw it again to be caught at a higher level
+			raise RuntimeError("err=" + str(e) + "\nmorph=" + str(d) + "\nmorphtype=" + str(morph.morphtype))
 		
 		# display progress printouts
 		core.print_progress_oneline(ENCODE_PERCENT_VERTFACE + (ENCODE_PERCENT_MORPH * d / i))
@@ -918,14 +1084,171 @@ def encode_pmx_softbodies(nice: List[pmxstruct.PmxSoftBody]) -> bytearray:
 
 
 ########################################################################################################################
+# persistent parse cache
+# parsed models are pickled into a folder in the persistent storage dir, named by the sha1 of the file contents.
+# an index file maps each source path to the [size, mtime, sha1] it had when last seen, so an unchanged file
+#    doesn't even need to be read & hashed again. a file with new size/mtime is hashed, so a file that was copied or
+#    touched but not changed still finds its entry.
+# every hit updates the mtime of the entry, eviction deletes the entries with the oldest mtime first.
+# NOTE: the pickles are only ever read back by this same script, don't put files from other people in there.
+########################################################################################################################
+
+PMX_CACHE_FOLDER = "pmx_cache"
+_PMX_CACHE_INDEX = "index.json"
+# bump this whenever the structure of the Pmx objects changes, so that old pickles are ignored
+_PMX_CACHE_VERSION = 4
+
+def _cache_dir() -> str:
+	cachedir = os.path.join(core.get_persistient_storage_path(), PMX_CACHE_FOLDER)
+	os.makedirs(cachedir, exist_ok=True)
+	return cachedir
+
+def _cache_entry_path(digest: str, columnar: bool) -> str:
+	return os.path.join(_cache_dir(), "%s%s.v%d.pickle" % (digest, "_col" if columnar else "", _PMX_CACHE_VERSION))
+
+def _cache_read_index() -> dict:
+	try:
+		with open(os.path.join(_cache_dir(), _PMX_CACHE_INDEX), "rt", encoding="utf-8") as f:
+			return json.load(f)
+	except (IOError, ValueError):
+		return {}
+
+def _cache_write_index(index: dict) -> None:
+	target = os.path.join(_cache_dir(), _PMX_CACHE_INDEX)
+	try:
+		with open(target + ".tmp", "wt", encoding="utf-8") as f:
+			json.dump(index, f)
+		os.replace(target + ".tmp", target)
+	except IOError:
+		pass
+
+def _cache_stat(pmx_filename: str) -> Tuple[str, list]:
+	# returns (abspath, [size, mtime]) of the source file
+	abspath = os.path.abspath(os.path.normpath(pmx_filename))
+	st = os.stat(abspath)
+	return abspath, [st.st_size, st.st_mtime_ns]
 
-def read_pmx(pmx_filename: str, moreinfo=False) -> pmxstruct.Pmx:
+def _cache_load(digest: str, columnar: bool) -> Union[pmxstruct.Pmx, None]:
+	entry = _cache_entry_path(digest, columnar)
+	if not os.path.isfile(entry): return None
+	try:
+		# unpickling builds many tiny objects, same reason as in parse_pmx_vertices to turn off the gc
+		gc_was_enabled = gc.isenabled()
+		gc.disable()
+		try:
+			with open(entry, "rb") as f:
+				retme = pickle.load(f)
+		finally:
+			if gc_was_enabled: gc.enable()
+		# this counts as "using" it, for the eviction order
+		os.utime(entry)
+		return retme
+	except Exception as e:
+		# a broken entry is just a miss, get rid of it
+		if PMX_MOREINFO: core.MY_PRINT_FUNC("Warning: dropping unreadable cache entry: %s %s" % (e.__class__.__name__, e))
+		try: os.remove(entry)
+		except OSError: pass
+		return None
+
+def _cache_store(digest: str, columnar: bool, pmx: pmxstruct.Pmx) -> None:
+	entry = _cache_entry_path(digest, columnar)
+	try:
+		with open(entry + ".tmp", "wb") as f:
+			pickle.dump(pmx, f, protocol=pickle.HIGHEST_PROTOCOL)
+		os.replace(entry + ".tmp", entry)
+	except Exception as e:
+		if PMX_MOREINFO: core.MY_PRINT_FUNC("Warning: unable to write cache entry: %s %s" % (e.__class__.__name__, e))
+		try: os.remove(entry + ".tmp")
+		except OSError: pass
+		return
+	_cache_evict(keep=entry)
+
+def _cache_evict(keep: str="") -> None:
+	# delete the least recently used entries until the folder fits within PMX_CACHE_MAX_BYTES again
+	# the entry that was just written is never deleted, even if it alone is bigger than the limit
+	cachedir = _cache_dir()
+	entries = []
+	total = 0
+	for name in os.listdir(cachedir):
+		full = os.path.join(cachedir, name)
+		if not name.endswith(".pickle"): continue
+		try: st = os.stat(full)
+		except OSError: continue
+		total += st.st_size
+		if full != keep: entries.append((st.st_mtime_ns, st.st_size, full))
+	entries.sort()
+	for mtime, size, full in entries:
+		if total <= PMX_CACHE_MAX_BYTES: break
+		try: os.remove(full)
+		except OSError: continue
+		total -= size
+
+def forget_cached_pmx(pmx_filename: str) -> None:
+	"""
+	Remove the remembered [size, mtime, sha1] of this file from the cache index, so that the next read_pmx() of it
+	hashes the file again. Called by write_pmx() whenever it overwrites a file.
+	"""
+	index = _cache_read_index()
+	abspath = os.path.abspath(os.path.normpath(pmx_filename))
+	if index.pop(abspath, None) is not None:
+		_cache_write_index(index)
+
+def clear_pmx_cache() -> None:
+	""" Delete everything in the persistent parse cache. """
+	cachedir = _cache_dir()
+	for name in os.listdir(cachedir):
+		try: os.remove(os.path.join(cachedir, name))
+		except OSError: pass
+
+def _cache_lookup(pmx_filename: str, columnar: bool) -> Tuple[Union[pmxstruct.Pmx, None], Union[bytearray, None], str]:
+	"""
+	Returns (cached pmx or None, file bytes if they had to be read or None, sha1 of the file).
+	"""
+	abspath, stamp = _cache_stat(pmx_filename)
+	index = _cache_read_index()
+	known = index.get(abspath)
+	# if size & mtime are the same as last time, trust the hash from last time
+	if known is not None and known[0:2] == stamp:
+		retme = _cache_load(known[2], columnar)
+		if retme is not None:
+			return retme, None, known[2]
+	# otherwise, read the file & hash it
+	pmx_bytes = core.read_binfile_to_bytes(pmx_filename)
+	digest = hashlib.sha1(pmx_bytes).hexdigest()
+	index[abspath] = stamp + [digest]
+	_cache_write_index(index)
+	return _cache_load(digest, columnar), pmx_bytes, digest
+
+########################################################################################################################
+
+def read_pmx(pmx_filename: str, moreinfo=False, columnar=False, use_cache=None) -> pmxstruct.Pmx:
+	"""
+	:param columnar: if true, pmx.verts is a PmxVertexStore (numpy-backed) instead of a list of PmxVertex
+	:param use_cache: if true, use the persistent parse cache. if None, use PMX_CACHE_ENABLED.
+	"""
+	with _PMX_IO_LOCK:
+		return _read_pmx(pmx_filename, moreinfo, columnar, use_cache)
+
+def _read_pmx(pmx_filename: str, moreinfo: bool, columnar: bool, use_cache) -> pmxstruct.Pmx:
 	global PMX_MOREINFO
 	PMX_MOREINFO = moreinfo
 	pmx_filename_clean = core.get_clean_basename(pmx_filename) + ".pmx"
+	if use_cache is None: use_cache = PMX_CACHE_ENABLED
 	# assumes the calling function already verified correct file extension
 	core.MY_PRINT_FUNC("Begin reading PMX file '%s'" % pmx_filename_clean)
-	pmx_bytes = core.read_binfile_to_bytes(pmx_filename)
+	pmx_bytes = None
+	digest = ""
+	if use_cache:
+		try:
+			retme, pmx_bytes, digest = _cache_lookup(pmx_filename, columnar)
+		except OSError:
+			# something is wrong with the file, let the normal read path report it properly
+			retme, digest = None, ""
+		if retme is not None:
+			core.MY_PRINT_FUNC("Done reading PMX file '%s' (unchanged, loaded from cache)" % pmx_filename_clean)
+			return retme
+	if pmx_bytes is None:
+		pmx_bytes = core.read_binfile_to_bytes(pmx_filename)
 	core.MY_PRINT_FUNC("...total size   = %s" % core.prettyprint_file_size(len(pmx_bytes)))
 	core.MY_PRINT_FUNC("Begin parsing PMX file '%s'" % pmx_filename_clean)
 	core.reset_unpack()
@@ -933,7 +1256,7 @@ def read_pmx(pmx_filename: str, moreinfo=False) -> pmxstruct.Pmx:
 	A = parse_pmx_header(pmx_bytes)
 	if PMX_MOREINFO: core.MY_PRINT_FUNC("...PMX version  = v%s" % str(A.ver))
 	core.MY_PRINT_FUNC("...model name   = JP:'%s' / EN:'%s'" % (A.name_jp, A.name_en))
-	B = parse_pmx_vertices(pmx_bytes)
+	B = parse_pmx_vertices(pmx_bytes, columnar=columnar)
 	C = parse_pmx_surfaces(pmx_bytes)
 	D = parse_pmx_textures(pmx_bytes)
 	E = parse_pmx_materials(pmx_bytes)
@@ -966,10 +1289,16 @@ def read_pmx(pmx_filename: str, moreinfo=False) -> pmxstruct.Pmx:
 						  rbodies=I,
 						  joints=J,
 						  sbodies=K)
+	if use_cache and digest:
+		_cache_store(digest, columnar, retme)
 	return retme
 
 
 def write_pmx(pmx_filename: str, pmx: pmxstruct.Pmx, moreinfo=False) -> None:
+	with _PMX_IO_LOCK:
+		return _write_pmx(pmx_filename, pmx, moreinfo)
+
+def _write_pmx(pmx_filename: str, pmx: pmxstruct.Pmx, moreinfo: bool) -> None:
 	global PMX_MOREINFO
 	PMX_MOREINFO = moreinfo
 	pmx_filename_clean = core.get_clean_basename(pmx_filename) + ".pmx"
@@ -982,7 +1311,6 @@ def write_pmx(pmx_filename: str, pmx: pmxstruct.Pmx, moreinfo=False) -> None:
 	
 	# arg "pmx" is the same structure created by "read_pmx()"
 	# assume the object is perfect, no sanity-checking needed
-	output_bytes = bytearray()
 	global ENCODE_PERCENT_VERT
 	global ENCODE_PERCENT_FACE
 	global ENCODE_PERCENT_VERTFACE
@@ -998,27 +1326,32 @@ def write_pmx(pmx_filename: str, pmx: pmxstruct.Pmx, moreinfo=False) -> None:
 	ENCODE_PERCENT_VERTFACE = ENCODE_PERCENT_VERT + ENCODE_PERCENT_FACE
 	ENCODE_PERCENT_MORPH = total_morph / ALLPROGRESSIZE
 	
-	core.print_progress_oneline(0)
-	lookahead = encode_pmx_lookahead(pmx)
-	output_bytes += encode_pmx_header(pmx.header, lookahead)
-	output_bytes += encode_pmx_vertices(pmx.verts)
-	output_bytes += encode_pmx_surfaces(pmx.faces)
-	output_bytes += encode_pmx_textures(pmx.textures)
-	output_bytes += encode_pmx_materials(pmx.materials)
-	output_bytes += encode_pmx_bones(pmx.bones)
-	output_bytes += encode_pmx_morphs(pmx.morphs)
-	output_bytes += encode_pmx_dispframes(pmx.frames)
-	output_bytes += encode_pmx_rigidbodies(pmx.rigidbodies)
-	output_bytes += encode_pmx_joints(pmx.joints)
-	if pmx.header == 2.1:
-		# if version==2.1, parse soft bodies
-		output_bytes += encode_pmx_softbodies(pmx.softbodies)
-
-	# done encoding!!
+	def encode_sections():
+		# each section is encoded only when the writer asks for it & is written out right away, so only one section
+		# (usually the vertices) is ever held in memory instead of the whole file, twice
+		# note: the header must go first, it decides the IDX_* sizes that all the other sections use
+		core.print_progress_oneline(0)
+		lookahead = encode_pmx_lookahead(pmx)
+		yield encode_pmx_header(pmx.header, lookahead)
+		yield encode_pmx_vertices(pmx.verts)
+		yield encode_pmx_surfaces(pmx.faces)
+		yield encode_pmx_textures(pmx.textures)
+		yield encode_pmx_materials(pmx.materials)
+		yield encode_pmx_bones(pmx.bones)
+		yield encode_pmx_morphs(pmx.morphs)
+		yield encode_pmx_dispframes(pmx.frames)
+		yield encode_pmx_rigidbodies(pmx.rigidbodies)
+		yield encode_pmx_joints(pmx.joints)
+		if pmx.header == 2.1:
+			# if version==2.1, parse soft bodies
+			yield encode_pmx_softbodies(pmx.softbodies)
+		# done encoding!!
 
 	core.MY_PRINT_FUNC("Begin writing PMX file '%s'" % pmx_filename_clean)
-	core.MY_PRINT_FUNC("...total size   = %s" % core.prettyprint_file_size(len(output_bytes)))
-	core.write_bytes_to_binfile(pmx_filename, output_bytes)
+	total_size = core.write_chunks_to_binfile(pmx_filename, encode_sections())
+	core.MY_PRINT_FUNC("...total size   = %s" % core.prettyprint_file_size(total_size))
+	# whatever the cache remembered about this path is outdated now
+	if PMX_CACHE_ENABLED: forget_cached_pmx(pmx_filename)
 	core.MY_PRINT_FUNC("Done writing PMX file '%s'" % pmx_filename_clean)
 	# done with everything!
 	return None
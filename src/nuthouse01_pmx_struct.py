@@ -6,6 +6,11 @@
 # first, system imports
 from typing import List, Union
 from abc import ABC, abstractmethod
+try:
+	# only needed for the optional PmxVertexStore
+	import numpy as np
+except ImportError:
+	np = None
 
 # second, wrap custom imports with a try-except to catch it if files are missing
 try:
@@ -55,6 +60,31 @@ class _BasePmx(ABC):
 			if self is thing: return d
 		return None
 
+# counts every assignment to the name_jp / name_en of any material, bone, morph, frame, body, joint or softbody,
+#    so that lookup tables built from the names of a model can tell if they are still up to date without rescanning
+_NAMES_VERSION = 0
+def get_names_version() -> int:
+	return _NAMES_VERSION
+
+# base class of everything that has a name_jp & name_en that can be searched for
+class _NamedPmx(_BasePmx):
+	@property
+	def name_jp(self) -> str:
+		return self._name_jp
+	@name_jp.setter
+	def name_jp(self, value: str):
+		global _NAMES_VERSION
+		_NAMES_VERSION += 1
+		self._name_jp = value
+	@property
+	def name_en(self) -> str:
+		return self._name_en
+	@name_en.setter
+	def name_en(self, value: str):
+		global _NAMES_VERSION
+		_NAMES_VERSION += 1
+		self._name_en = value
+
 
 class PmxHeader(_BasePmx):
 	# [ver, name_jp, name_en, comment_jp, comment_en]
@@ -73,6 +103,23 @@ class PmxHeader(_BasePmx):
 		return [self.ver, self.name_jp, self.name_en, self.comment_jp, self.comment_en]
 
 
+# counts every change to the position of any vertex (assigning PmxVertex.pos, or one of its items), so that lookup
+#    tables built from vertex positions (like KD-trees) can tell if they are still up to date without rescanning
+# NOTE: writing into the PmxVertexStore.pos array directly is not counted!
+_VERT_POS_VERSION = 0
+def get_vert_pos_version() -> int:
+	return _VERT_POS_VERSION
+def _bump_vert_pos_version():
+	global _VERT_POS_VERSION
+	_VERT_POS_VERSION += 1
+
+# list that counts every change of one of its items in get_vert_pos_version(), used for PmxVertex.pos
+class _PosList(list):
+	__slots__ = ()
+	def __setitem__(self, k, v):
+		_bump_vert_pos_version()
+		list.__setitem__(self, k, v)
+
 class PmxVertex(_BasePmx):
 	# note: this block is the order of args in the old system, does not represent order of args in .list() member
 	# [posX, posY, posZ, normX, normY, normZ, u, v, addl_vec4s, weighttype, weights, edgescale]
@@ -112,15 +159,324 @@ class PmxVertex(_BasePmx):
 		self.weight = weight
 		self.weight_sdef = weight_sdef
 		self.addl_vec4s = addl_vec4s
+	@property
+	def pos(self) -> List[float]:
+		return self._pos
+	@pos.setter
+	def pos(self, value: List[float]):
+		_bump_vert_pos_version()
+		self._pos = value if isinstance(value, _PosList) else _PosList(value)
 	def list(self) -> list:
 		return [self.pos, self.norm, self.uv, self.edgescale,
 				self.weighttype, self.weight, self.weight_sdef, self.addl_vec4s]
 
+########
+# optional columnar storage for vertices
+# on big models the list-of-PmxVertex approach spends hundreds of MB on tiny python lists. PmxVertexStore keeps
+#    all the per-vertex data in numpy arrays instead (one row per vertex), and hands out PmxVertexView objects that
+#    behave like a PmxVertex, so "vert.pos[0]" or "vert.weight[4] = x" still work the same.
+# NOTE: a view is bound to a vertex INDEX, not an object! if you delete/insert vertices before it, the view now
+#    refers to a different vertex. if you need to keep a vertex around, use copy.deepcopy(view) or view.detach().
+# NOTE: requires numpy. "read_pmx(..., columnar=True)" gives you one, "PmxVertexStore.from_list(pmx.verts)" converts.
+########
+
+# weighttype -> where each item of the PmxVertex.weight list lives: ("b", col) = bone index, ("w", col) = weight
+_WEIGHT_LAYOUT = {
+	0: [("b", 0)],
+	1: [("b", 0), ("b", 1), ("w", 0)],
+	2: [("b", 0), ("b", 1), ("b", 2), ("b", 3), ("w", 0), ("w", 1), ("w", 2), ("w", 3)],
+	3: [("b", 0), ("b", 1), ("w", 0)],
+	4: [("b", 0), ("b", 1), ("b", 2), ("b", 3), ("w", 0), ("w", 1), ("w", 2), ("w", 3)],
+}
+# length of the weight list -> the same thing, used when a whole new list is assigned
+_WEIGHT_LAYOUT_BY_LEN = {1: _WEIGHT_LAYOUT[0], 3: _WEIGHT_LAYOUT[1], 8: _WEIGHT_LAYOUT[2]}
+
+class _PmxRowProxy:
+	# list-like proxy for one fixed-length row of one of the store's arrays, like pos/norm/uv or one row of sdef
+	# looks up the array every time because the store may have reallocated it since this proxy was made
+	__slots__ = ("_store", "_field", "_idx")
+	def __init__(self, store, field: str, idx):
+		self._store = store
+		self._field = field
+		self._idx = idx
+	def _row(self): return getattr(self._store, self._field)[self._idx]
+	def __len__(self) -> int: return self._row().shape[0]
+	def __getitem__(self, k):
+		r = self._row()[k]
+		return r.tolist() if isinstance(k, slice) else r.item()
+	def __setitem__(self, k, v):
+		if self._field == "_pos": _bump_vert_pos_version()
+		self._row()[k] = v
+	def __iter__(self): return iter(self._row().tolist())
+	def __eq__(self, other):
+		try: return list(self) == list(other)
+		except TypeError: return False
+	def __add__(self, other): return list(self) + list(other)
+	def __radd__(self, other): return list(other) + list(self)
+	def __repr__(self) -> str: return repr(list(self))
+	def __copy__(self) -> list: return list(self)
+	def __deepcopy__(self, memo) -> list: return list(self)
+	def copy(self) -> list: return list(self)
+	def index(self, v) -> int: return list(self).index(v)
+	def count(self, v) -> int: return list(self).count(v)
+
+class _PmxWeightProxy(_PmxRowProxy):
+	# list-like proxy for PmxVertex.weight, the length & meaning of each item depends on the current weighttype
+	__slots__ = ()
+	def __init__(self, store, idx: int):
+		super().__init__(store, "", idx)
+	def _layout(self) -> list: return _WEIGHT_LAYOUT.get(int(self._store._weighttype[self._idx]), [])
+	def _get(self, slot):
+		if slot[0] == "b": return int(self._store._bones[self._idx, slot[1]])
+		return float(self._store._weights[self._idx, slot[1]])
+	def _set(self, slot, v):
+		if slot[0] == "b": self._store._bones[self._idx, slot[1]] = v
+		else:              self._store._weights[self._idx, slot[1]] = v
+	def __len__(self) -> int: return len(self._layout())
+	def __getitem__(self, k):
+		if isinstance(k, slice): return [self._get(s) for s in self._layout()[k]]
+		return self._get(self._layout()[k])
+	def __setitem__(self, k, v):
+		if isinstance(k, slice):
+			for s, vv in zip(self._layout()[k], v): self._set(s, vv)
+		else: self._set(self._layout()[k], v)
+	def __iter__(self): return iter([self._get(s) for s in self._layout()])
+
+
+class PmxVertexView(PmxVertex):
+	# stand-in for a PmxVertex that lives inside a PmxVertexStore, see notes above
+	def __init__(self, store: 'PmxVertexStore', idx: int):
+		# NOTE: intentionally not calling super().__init__, all attributes are properties that go to the store
+		self._store = store
+		self._idx = idx
+	@property
+	def pos(self): return _PmxRowProxy(self._store, "_pos", self._idx)
+	@pos.setter
+	def pos(self, v):
+		_bump_vert_pos_version()
+		self._store._pos[self._idx] = list(v)
+	@property
+	def norm(self): return _PmxRowProxy(self._store, "_norm", self._idx)
+	@norm.setter
+	def norm(self, v): self._store._norm[self._idx] = list(v)
+	@property
+	def uv(self): return _PmxRowProxy(self._store, "_uv", self._idx)
+	@uv.setter
+	def uv(self, v): self._store._uv[self._idx] = list(v)
+	@property
+	def edgescale(self): return float(self._store._edgescale[self._idx])
+	@edgescale.setter
+	def edgescale(self, v): self._store._edgescale[self._idx] = v
+	@property
+	def weighttype(self): return int(self._store._weighttype[self._idx])
+	@weighttype.setter
+	def weighttype(self, v): self._store._weighttype[self._idx] = v
+	@property
+	def weight(self): return _PmxWeightProxy(self._store, self._idx)
+	@weight.setter
+	def weight(self, v): self._store._set_weight(self._idx, list(v))
+	@property
+	def weight_sdef(self):
+		if not self._store._has_sdef[self._idx]: return []
+		return [_PmxRowProxy(self._store, "_sdef", (self._idx, z)) for z in range(3)]
+	@weight_sdef.setter
+	def weight_sdef(self, v): self._store._set_sdef(self._idx, v)
+	@property
+	def addl_vec4s(self):
+		a = self._store._addl[self._idx]
+		if a is None:  # only materialize the list when somebody actually asks for it
+			a = self._store._addl[self._idx] = []
+		return a
+	@addl_vec4s.setter
+	def addl_vec4s(self, v): self._store._addl[self._idx] = v
+	def list(self) -> list:
+		return [list(self.pos), list(self.norm), list(self.uv), self.edgescale,
+				self.weighttype, list(self.weight), [list(r) for r in self.weight_sdef], self.addl_vec4s]
+	def __eq__(self, other) -> bool:
+		if not isinstance(other, PmxVertex): return False
+		return self.list() == other.list()
+	def idx_within(self, L: List) -> Union[int, None]:
+		if L is self._store: return self._idx
+		for d, thing in enumerate(L):
+			if self == thing: return d
+		return None
+	def detach(self) -> PmxVertex:
+		""" Return a normal PmxVertex holding a copy of the current values """
+		(pos, norm, uv, edgescale, weighttype, weight, weight_sdef, addl_vec4s) = self.list()
+		return PmxVertex(pos=pos, norm=norm, uv=uv, edgescale=edgescale, weighttype=weighttype, weight=weight,
+						 weight_sdef=weight_sdef, addl_vec4s=[list(a) for a in addl_vec4s])
+	def __copy__(self) -> PmxVertex: return self.detach()
+	def __deepcopy__(self, memo) -> PmxVertex: return self.detach()
+
+
+class PmxVertexStore:
+	"""
+	List-compatible container of vertices that keeps everything in numpy arrays, see notes above.
+	The arrays can be used directly for bulk work, trimmed to the current length:
+	  pos (N,3), norm (N,3), uv (N,2), edgescale (N), weighttype (N), bones (N,4), weights (N,4), sdef (N,3,3)
+	bones/weights hold the "weight" list split by meaning (see _WEIGHT_LAYOUT), unused columns are 0.
+	"""
+	def __init__(self, capacity: int=0):
+		if np is None:
+			raise RuntimeError("PmxVertexStore needs numpy, please install it or use a normal list instead")
+		self._n = 0
+		self._alloc(max(capacity, 16))
+	def _alloc(self, cap: int) -> None:
+		def grow(name, shape, dtype):
+			new = np.zeros((cap,) + shape, dtype=dtype)
+			old = getattr(self, name, None)
+			if old is not None: new[:self._n] = old[:self._n]
+			setattr(self, name, new)
+		grow("_pos", (3,), np.float64)
+		grow("_norm", (3,), np.float64)
+		grow("_uv", (2,), np.float64)
+		grow("_edgescale", (), np.float64)
+		grow("_weighttype", (), np.int8)
+		grow("_bones", (4,), np.int32)
+		grow("_weights", (4,), np.float64)
+		grow("_sdef", (3,3), np.float64)
+		grow("_has_sdef", (), np.bool_)
+		if not hasattr(self, "_addl"): self._addl = []  # plain list, None = no extra vec4s
+		self._cap = cap
+	def _reserve(self, need: int) -> None:
+		if need > self._cap: self._alloc(max(need, self._cap * 2))
+	
+	#### bulk access to the arrays
+	pos        = property(lambda self: self._pos[:self._n])
+	norm       = property(lambda self: self._norm[:self._n])
+	uv         = property(lambda self: self._uv[:self._n])
+	edgescale  = property(lambda self: self._edgescale[:self._n])
+	weighttype = property(lambda self: self._weighttype[:self._n])
+	bones      = property(lambda self: self._bones[:self._n])
+	weights    = property(lambda self: self._weights[:self._n])
+	sdef       = property(lambda self: self._sdef[:self._n])
+	has_sdef   = property(lambda self: self._has_sdef[:self._n])
+	
+	#### per-row setters
+	def _set_weight(self, idx: int, w: list) -> None:
+		self._bones[idx] = 0
+		self._weights[idx] = 0
+		for slot, v in zip(_WEIGHT_LAYOUT_BY_LEN.get(len(w), []), w):
+			if slot[0] == "b": self._bones[idx, slot[1]] = v
+			else:              self._weights[idx, slot[1]] = v
+	def _set_sdef(self, idx: int, sdef) -> None:
+		if sdef:
+			self._sdef[idx] = [list(r) for r in sdef]
+			self._has_sdef[idx] = True
+		else:
+			self._sdef[idx] = 0
+			self._has_sdef[idx] = False
+	def _write_row(self, idx: int, v: PmxVertex) -> None:
+		_bump_vert_pos_version()
+		self._pos[idx] = list(v.pos)
+		self._norm[idx] = list(v.norm)
+		self._uv[idx] = list(v.uv)
+		self._edgescale[idx] = v.edgescale
+		self._weighttype[idx] = v.weighttype
+		self._set_weight(idx, list(v.weight))
+		self._set_sdef(idx, v.weight_sdef)
+		addl = v.addl_vec4s
+		self._addl[idx] = [list(a) for a in addl] if addl else None
+	
+	#### conversion
+	@classmethod
+	def from_list(cls, verts: List[PmxVertex]) -> 'PmxVertexStore':
+		store = cls(len(verts))
+		store.extend(verts)
+		return store
+	def to_list(self) -> List[PmxVertex]:
+		return [PmxVertexView(self, d).detach() for d in range(self._n)]
+	def list(self) -> list:
+		return [PmxVertexView(self, d).list() for d in range(self._n)]
+	
+	#### list interface
+	def __len__(self) -> int: return self._n
+	def __iter__(self):
+		for d in range(self._n): yield PmxVertexView(self, d)
+	def _norm_idx(self, idx: int) -> int:
+		if idx < 0: idx += self._n
+		if not (0 <= idx < self._n): raise IndexError("vertex index out of range")
+		return idx
+	def __getitem__(self, idx):
+		if isinstance(idx, slice): return [PmxVertexView(self, d) for d in range(*idx.indices(self._n))]
+		return PmxVertexView(self, self._norm_idx(idx))
+	def __setitem__(self, idx, v) -> None:
+		if isinstance(idx, slice):
+			for d, vv in zip(range(*idx.indices(self._n)), v): self._write_row(d, vv)
+			return
+		idx = self._norm_idx(idx)
+		if isinstance(v, PmxVertexView): v = v.detach()  # in case it points at a row of this store
+		self._write_row(idx, v)
+	def append(self, v: PmxVertex) -> None:
+		if isinstance(v, PmxVertexView): v = v.detach()
+		self._reserve(self._n + 1)
+		self._addl.append(None)
+		self._n += 1
+		self._write_row(self._n - 1, v)
+	def extend(self, verts) -> None:
+		verts = list(verts)
+		self._reserve(self._n + len(verts))
+		for v in verts: self.append(v)
+	def insert(self, idx: int, v: PmxVertex) -> None:
+		if isinstance(v, PmxVertexView): v = v.detach()
+		idx = min(max(idx + self._n if idx < 0 else idx, 0), self._n)
+		self.append(v)  # make room at the end, then rotate it into place
+		if idx != self._n - 1:
+			order = np.r_[0:idx, self._n - 1, idx:self._n - 1]
+			self._take(order)
+	def pop(self, idx: int=-1) -> PmxVertex:
+		idx = self._norm_idx(idx)
+		ret = PmxVertexView(self, idx).detach()
+		self.delete_many([idx])
+		return ret
+	def __delitem__(self, idx) -> None:
+		if isinstance(idx, slice): self.delete_many(list(range(*idx.indices(self._n))))
+		else: self.delete_many([self._norm_idx(idx)])
+	def delete_many(self, idx_list) -> None:
+		""" Remove all given vertex indices in one pass, the rest keep their relative order """
+		keep = np.ones(self._n, dtype=np.bool_)
+		keep[np.asarray(list(idx_list), dtype=np.int64)] = False
+		self._take(np.flatnonzero(keep))
+	def remap_bones(self, bone_lookup) -> None:
+		""" Replace every weighted bone index b with bone_lookup[b], bones with 0 weight become bone 0 """
+		n = self._n
+		lookup = np.asarray(bone_lookup, dtype=np.int32)
+		t = self._weighttype[:n]
+		w = self._weights[:n]
+		# find which of the 4 bone slots are in use & have weight, same rules as in _prune_unused_bones
+		used = np.zeros((n, 4), dtype=np.bool_)
+		used[t == 0, 0] = True
+		two = (t == 1) | (t == 3)
+		used[two, 0] = w[two, 0] != 0
+		used[two, 1] = w[two, 0] != 1
+		four = (t == 2) | (t == 4)
+		used[four] = w[four] != 0
+		b = self._bones[:n]
+		b[:] = np.where(used, lookup[b], 0)
+	def _take(self, order) -> None:
+		# rebuild all columns from the rows given in order (any permutation or subset of 0..n-1)
+		_bump_vert_pos_version()
+		for name in ("_pos", "_norm", "_uv", "_edgescale", "_weighttype", "_bones", "_weights", "_sdef", "_has_sdef"):
+			arr = getattr(self, name)
+			arr[:len(order)] = arr[:self._n][order]
+		self._addl = [self._addl[d] for d in order.tolist()]
+		self._n = len(order)
+	def __eq__(self, other) -> bool:
+		try: return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+		except TypeError: return False
+	def __repr__(self) -> str: return "PmxVertexStore(%d verts)" % self._n
+
 # face is just a list of ints, no struct needed
 
 # tex is just a string, no struct needed
 
-class PmxMaterial(_BasePmx):
+# counts every assignment to PmxMaterial.faces_ct of any material, so that lookup tables built from the faces_ct
+#    of a model (like the face offset of each material) can tell if they are still up to date without rescanning
+_FACES_CT_VERSION = 0
+def get_faces_ct_version() -> int:
+	return _FACES_CT_VERSION
+
+class PmxMaterial(_NamedPmx):
 	def __init__(self,
 				 name_jp: str, name_en: str,
 				 diffRGB: List[float],
@@ -163,6 +519,14 @@ class PmxMaterial(_BasePmx):
 		# flaglist = [no_backface_culling, cast_ground_shadow, cast_shadow, receive_shadow, use_edge, vertex_color,
 		# 			draw_as_points, draw_as_lines]
 		self.flaglist = flaglist
+	@property
+	def faces_ct(self) -> int:
+		return self._faces_ct
+	@faces_ct.setter
+	def faces_ct(self, value: int):
+		global _FACES_CT_VERSION
+		_FACES_CT_VERSION += 1
+		self._faces_ct = value
 	def list(self) -> list:
 		return [self.name_jp, self.name_en, self.diffRGB, self.specRGB, self.ambRGB, self.alpha, self.specpower,
 				self.edgeRGB, self.edgealpha, self.edgesize,
@@ -170,6 +534,12 @@ class PmxMaterial(_BasePmx):
 				self.comment, self.faces_ct, self.flaglist,
 				]
 
+# counts every assignment to PmxBone.parent_idx of any bone, so that lookup tables built from the bone hierarchy
+#    of a model can tell if they are still up to date without rescanning
+_PARENTS_VERSION = 0
+def get_parents_version() -> int:
+	return _PARENTS_VERSION
+
 class PmxBoneIkLink(_BasePmx):
 	# NOTE: to represent "no limits", the min and max should be None or omitted
 	def __init__(self,
@@ -187,7 +557,7 @@ class PmxBoneIkLink(_BasePmx):
 	def list(self) -> list:
 		return [self.idx, self.limit_min, self.limit_max]
 
-class PmxBone(_BasePmx):
+class PmxBone(_NamedPmx):
 	# note: this block is the order of args in the old system, does not represent order of args in .list() member
 	# thisbone = [name_jp, name_en, posX, posY, posZ, parent_idx, deform_layer, deform_after_phys,  # 0-7
 	# 			rotateable, translateable, visible, enabled,  # 8-11
@@ -268,6 +638,14 @@ class PmxBone(_BasePmx):
 		self.ik_numloops = ik_numloops
 		self.ik_angle = ik_angle
 		self.ik_links = ik_links
+	@property
+	def parent_idx(self) -> int:
+		return self._parent_idx
+	@parent_idx.setter
+	def parent_idx(self, value: int):
+		global _PARENTS_VERSION
+		_PARENTS_VERSION += 1
+		self._parent_idx = value
 	def list(self) -> list:
 		return [self.name_jp, self.name_en, self.pos, self.parent_idx, self.deform_layer, self.deform_after_phys,
 				self.has_rotate, self.has_translate, self.has_visible, self.has_enabled,
@@ -382,7 +760,7 @@ class PmxMorphItemImpulse(_BasePmx):
 		return [self.rb_idx, self.is_local, self.move, self.rot]
 
 
-class PmxMorph(_BasePmx):
+class PmxMorph(_NamedPmx):
 	# thismorph = [name_jp, name_en, panel, morphtype, these_items]
 	def __init__(self,
 				 name_jp: str, name_en: str,
@@ -418,7 +796,7 @@ class PmxMorph(_BasePmx):
 				]
 
 
-class PmxFrame(_BasePmx):
+class PmxFrame(_NamedPmx):
 	# thisframe = [name_jp, name_en, is_special, these_items]
 	def __init__(self, 
 				 name_jp: str, name_en: str, 
@@ -435,7 +813,7 @@ class PmxFrame(_BasePmx):
 	def list(self) -> list:
 		return [self.name_jp, self.name_en, self.is_special, self.items]
 		
-class PmxRigidBody(_BasePmx):
+class PmxRigidBody(_NamedPmx):
 	# note: this block is the order of args in the old system, does not represent order of args in .list() member
 	# thisbody = [name_jp, name_en, bone_idx, group, nocollide_mask, shape, sizeX, sizeY, sizeZ, posX, posY, posZ,
 	# 			rotX, rotY, rotZ, mass, move_damp, rot_damp, repel, friction, physmode]
@@ -484,7 +862,7 @@ class PmxRigidBody(_BasePmx):
 				]
 
 
-class PmxJoint(_BasePmx):
+class PmxJoint(_NamedPmx):
 	# note: this block is the order of args in the old system, does not represent order of args in .list() member
 	# thisjoint = [name_jp, name_en, jointtype, rb1_idx, rb2_idx, posX, posY, posZ,
 	# 			 rotX, rotY, rotZ, posminX, posminY, posminZ, posmaxX, posmaxY, posmaxZ,
@@ -532,7 +910,7 @@ class PmxJoint(_BasePmx):
 				self.rotmin, self.rotmax, self.rotspring,
 				]
 
-class PmxSoftBody(_BasePmx):
+class PmxSoftBody(_NamedPmx):
 	# i don't plan to support v2.1 so I'm not gonna try to hard to understand the meaning of these data fields
 	# this is mostly to consume the data so there are no bytes left over when done parsing a file to trigger warnings
 	# note: this is also untested because i dont care about it lol
@@ -602,7 +980,7 @@ class Pmx(_BasePmx):
 	# [A, B, C, D, E, F, G, H, I, J, K]
 	def __init__(self,
 				 header: PmxHeader,
-				 verts: List[PmxVertex],
+				 verts: Union[List[PmxVertex], 'PmxVertexStore'],
 				 faces: List[List[int]],
 				 texes: List[str],
 				 mats: List[PmxMaterial],